@@ -0,0 +1,28 @@
+"""add messages keyset index
+
+Revision ID: 2d9f6b3a8c17
+Revises: 7c2a9e4d1b58
+Create Date: 2026-10-17 20:40:12.318406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2d9f6b3a8c17'
+down_revision: Union[str, Sequence[str], None] = '7c2a9e4d1b58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_messages_chat_id_created_at_id', 'messages', ['chat_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_messages_chat_id_created_at_id', table_name='messages')
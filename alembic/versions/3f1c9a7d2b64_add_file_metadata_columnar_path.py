@@ -0,0 +1,28 @@
+"""add file_metadata columnar_path
+
+Revision ID: 3f1c9a7d2b64
+Revises: e8b9dab4acc9
+Create Date: 2026-10-17 09:12:41.218305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c9a7d2b64'
+down_revision: Union[str, Sequence[str], None] = 'e8b9dab4acc9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('file_metadata', sa.Column('columnar_path', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('file_metadata', 'columnar_path')
@@ -0,0 +1,28 @@
+"""add ingestion_jobs owner
+
+Revision ID: 4e7a2c9d1f60
+Revises: b6e3f0a91d42
+Create Date: 2026-10-17 22:41:09.318274
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4e7a2c9d1f60'
+down_revision: Union[str, Sequence[str], None] = 'b6e3f0a91d42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('ingestion_jobs', sa.Column('owner', sa.String(length=128), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('ingestion_jobs', 'owner')
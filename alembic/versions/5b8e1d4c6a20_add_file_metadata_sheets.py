@@ -0,0 +1,28 @@
+"""add file_metadata sheets
+
+Revision ID: 5b8e1d4c6a20
+Revises: c7d05e3a9f12
+Create Date: 2026-10-17 12:41:09.384517
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b8e1d4c6a20'
+down_revision: Union[str, Sequence[str], None] = 'c7d05e3a9f12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('file_metadata', sa.Column('sheets', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('file_metadata', 'sheets')
@@ -0,0 +1,28 @@
+"""add dashboards keyset index
+
+Revision ID: 7c2a9e4d1b58
+Revises: d41f7b2e8c93
+Create Date: 2026-10-17 14:05:31.662190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c2a9e4d1b58'
+down_revision: Union[str, Sequence[str], None] = 'd41f7b2e8c93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_dashboards_user_id_created_at_id', 'dashboards', ['user_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_dashboards_user_id_created_at_id', table_name='dashboards')
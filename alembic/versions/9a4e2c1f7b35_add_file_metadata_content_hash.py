@@ -0,0 +1,28 @@
+"""add file_metadata content_hash
+
+Revision ID: 9a4e2c1f7b35
+Revises: 3f1c9a7d2b64
+Create Date: 2026-10-17 10:02:17.604913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a4e2c1f7b35'
+down_revision: Union[str, Sequence[str], None] = '3f1c9a7d2b64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('file_metadata', sa.Column('content_hash', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('file_metadata', 'content_hash')
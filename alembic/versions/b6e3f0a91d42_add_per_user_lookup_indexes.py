@@ -0,0 +1,32 @@
+"""add per-user lookup indexes
+
+Revision ID: b6e3f0a91d42
+Revises: 2d9f6b3a8c17
+Create Date: 2026-10-17 21:12:47.905531
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6e3f0a91d42'
+down_revision: Union[str, Sequence[str], None] = '2d9f6b3a8c17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_chats_user_id_created_at_active', 'chats', ['user_id', 'created_at'], unique=False, postgresql_where=sa.text('is_active = 1'))
+    op.create_index('ix_chats_user_id_created_at_deleted', 'chats', ['user_id', 'created_at'], unique=False, postgresql_where=sa.text('is_active = 0'))
+    op.create_index('ix_file_metadata_chat_id_uploaded_at', 'file_metadata', ['chat_id', 'uploaded_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_file_metadata_chat_id_uploaded_at', table_name='file_metadata')
+    op.drop_index('ix_chats_user_id_created_at_deleted', table_name='chats', postgresql_where=sa.text('is_active = 0'))
+    op.drop_index('ix_chats_user_id_created_at_active', table_name='chats', postgresql_where=sa.text('is_active = 1'))
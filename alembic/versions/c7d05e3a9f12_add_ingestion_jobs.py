@@ -0,0 +1,47 @@
+"""add ingestion_jobs
+
+Revision ID: c7d05e3a9f12
+Revises: 9a4e2c1f7b35
+Create Date: 2026-10-17 11:20:53.771042
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7d05e3a9f12'
+down_revision: Union[str, Sequence[str], None] = '9a4e2c1f7b35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'ingestion_jobs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('chat_id', sa.Integer(), nullable=True),
+        sa.Column('source', sa.String(length=16), nullable=False),
+        sa.Column('file_name', sa.String(), nullable=False),
+        sa.Column('status', sa.String(length=16), nullable=False),
+        sa.Column('progress', sa.Integer(), nullable=False),
+        sa.Column('error', sa.String(), nullable=True),
+        sa.Column('file_metadata_id', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['chat_id'], ['chats.id'], ondelete='SET NULL'),
+        sa.ForeignKeyConstraint(['file_metadata_id'], ['file_metadata.id'], ondelete='SET NULL'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_ingestion_jobs_id'), 'ingestion_jobs', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_ingestion_jobs_id'), table_name='ingestion_jobs')
+    op.drop_table('ingestion_jobs')
@@ -0,0 +1,32 @@
+"""add dashboard data_path
+
+Revision ID: d41f7b2e8c93
+Revises: 5b8e1d4c6a20
+Create Date: 2026-10-17 13:22:47.105832
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd41f7b2e8c93'
+down_revision: Union[str, Sequence[str], None] = '5b8e1d4c6a20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('dashboards', sa.Column('data_path', sa.String(), nullable=True))
+    op.add_column('dashboards', sa.Column('data_columns', sa.JSON(), nullable=True))
+    op.add_column('dashboards', sa.Column('data_num_rows', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('dashboards', 'data_num_rows')
+    op.drop_column('dashboards', 'data_columns')
+    op.drop_column('dashboards', 'data_path')
@@ -1,21 +1,35 @@
-from db import SessionLocal
+from db import session_scope
 from models.user import User
-from utils.auth import get_password_hash, verify_password
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from utils.auth import get_password_hash_async, verify_password_async
+from utils.jwt import invalidate_user
 from fastapi import HTTPException
 
-def change_password(email: str, old_password: str, new_password: str):
-    db = SessionLocal()
-    try:
+def _find_user(email: str, db: Session = None):
+    with session_scope(db) as db:
         user = db.query(User).filter(User.email == email).first()
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-            
-        if not verify_password(old_password, user.password):
-            raise HTTPException(status_code=401, detail="Invalid old password")
-            
-        user.password = get_password_hash(new_password)
+        # End the read transaction so no connection is held while bcrypt runs
         db.commit()
+        return user
+
+def _set_password(user_id: int, hashed_password: str, db: Session = None):
+    with session_scope(db) as db:
+        # Already in the session's identity map when it found the user
+        user = db.get(User, user_id)
+        user.password = hashed_password
+        db.commit()
+        invalidate_user(user.email)
+
+async def change_password(email: str, old_password: str, new_password: str, db: Session = None):
+    user = await run_in_threadpool(_find_user, email, db)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+        
+    if not await verify_password_async(old_password, user.password):
+        raise HTTPException(status_code=401, detail="Invalid old password")
         
-        return {"message": "Password updated successfully"}
-    finally:
-        db.close()
\ No newline at end of file
+    hashed_password = await get_password_hash_async(new_password)
+    await run_in_threadpool(_set_password, user.id, hashed_password, db)
+    
+    return {"message": "Password updated successfully"}
@@ -1,146 +1,221 @@
+import base64
+import json
+from datetime import datetime
 from typing import List
 
 from fastapi import HTTPException
 
-from db import SessionLocal
+from sqlalchemy import bindparam, insert, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from db import async_session_scope, session_scope
 from models.chat import Chat
 from models.file_metadata import FileMetadata
 from models.message import Message
 
 
-def update_chat_is_active(user_id: int, chat_id: int, is_active: int):
-    db = SessionLocal()
-    try:
+async def _get_active_chat(db: AsyncSession, user_id: int, chat_id: int):
+    # Primary-key lookup; answered from the identity map while the chat is loaded
+    chat = await db.get(Chat, chat_id)
+    if not chat or chat.user_id != user_id or chat.is_active != 1:
+        raise HTTPException(status_code=404, detail="Chat not found")
+    return chat
+
+
+async def update_chat_is_active(
+    user_id: int,
+    chat_id: int,
+    is_active: int,
+    db: AsyncSession = None,
+):
+    async with async_session_scope(db) as db:
         chat = (
-            db.query(Chat).filter(Chat.id == chat_id, Chat.user_id == user_id).first()
-        )
+            await db.execute(
+                select(Chat).where(Chat.id == chat_id, Chat.user_id == user_id)
+            )
+        ).scalar_one_or_none()
         if not chat:
             raise HTTPException(status_code=404, detail="Chat not found")
         chat.is_active = is_active
-        db.commit()
-        db.refresh(chat)
+        await db.commit()
+        await db.refresh(chat)
         return {"id": chat.id, "is_active": chat.is_active}
-    finally:
-        db.close()
 
 
-def create_chat(user_id: int, title: str):
-    db = SessionLocal()
-    try:
+async def create_chat(user_id: int, title: str, db: AsyncSession = None):
+    async with async_session_scope(db) as db:
         chat = Chat(user_id=user_id, title=title)
         db.add(chat)
-        db.commit()
-        db.refresh(chat)
+        await db.commit()
+        await db.refresh(chat)
         return {"id": chat.id, "title": chat.title, "created_at": chat.created_at}
-    finally:
-        db.close()
 
 
-def list_chats(user_id: int):
-    db = SessionLocal()
-    try:
-        chats = (
-            db.query(Chat)
-            .filter(Chat.user_id == user_id, Chat.is_active == 1)
+async def _list_chats_by_state(db, user_id: int, is_active: int):
+    chats = (
+        await db.execute(
+            select(Chat)
+            .where(
+                Chat.user_id == user_id,
+                # Inlined, not bound: a generic prepared plan can't use the
+                # per-state partial indexes on chats
+                Chat.is_active == bindparam("is_active", is_active, literal_execute=True),
+            )
             .order_by(Chat.created_at.desc())
-            .all()
         )
-        # Deduplicate by chat id (should not be needed, but extra safety)
-        seen = set()
-        unique_chats = []
-        for c in chats:
-            if c.id not in seen:
-                seen.add(c.id)
-                unique_chats.append(c)
-        return [
-            {
-                "id": c.id,
-                "title": c.title,
-                "created_at": c.created_at,
-                "is_active": c.is_active,
-            }
-            for c in unique_chats
-        ]
-    finally:
-        db.close()
+    ).scalars()
+    # Deduplicate by chat id (should not be needed, but extra safety)
+    seen = set()
+    unique_chats = []
+    for c in chats:
+        if c.id not in seen:
+            seen.add(c.id)
+            unique_chats.append(c)
+    return [
+        {
+            "id": c.id,
+            "title": c.title,
+            "created_at": c.created_at,
+            "is_active": c.is_active,
+        }
+        for c in unique_chats
+    ]
+
+
+async def list_chats(user_id: int, db: AsyncSession = None):
+    async with async_session_scope(db) as db:
+        return await _list_chats_by_state(db, user_id, 1)
 
 
 # NEW: List deleted chats (is_active == 0)
-def list_deleted_chats(user_id: int):
-    db = SessionLocal()
-    try:
-        chats = (
-            db.query(Chat)
-            .filter(Chat.user_id == user_id, Chat.is_active == 0)
-            .order_by(Chat.created_at.desc())
-            .all()
-        )
-        # Deduplicate by chat id (extra safety)
-        seen = set()
-        unique_chats = []
-        for c in chats:
-            if c.id not in seen:
-                seen.add(c.id)
-                unique_chats.append(c)
-        return [
-            {
-                "id": c.id,
-                "title": c.title,
-                "created_at": c.created_at,
-                "is_active": c.is_active,
-            }
-            for c in unique_chats
-        ]
-    finally:
-        db.close()
-
-
-def add_message(user_id: int, chat_id: int, text: str, sender: str):
-    db = SessionLocal()
-    try:
-        chat = (
-            db.query(Chat)
-            .filter(Chat.id == chat_id, Chat.user_id == user_id, Chat.is_active == 1)
-            .first()
+async def list_deleted_chats(user_id: int, db: AsyncSession = None):
+    async with async_session_scope(db) as db:
+        return await _list_chats_by_state(db, user_id, 0)
+
+
+async def add_messages(
+    user_id: int,
+    chat_id: int,
+    messages: List[dict],
+    db: AsyncSession = None,
+):
+    """Append ``[{"text", "sender"}, ...]`` to a chat with one INSERT and one commit."""
+    async with async_session_scope(db) as db:
+        await _get_active_chat(db, user_id, chat_id)
+        rows = await db.execute(
+            insert(Message).returning(
+                Message.id,
+                Message.sender,
+                Message.text,
+                Message.created_at,
+                sort_by_parameter_order=True,
+            ),
+            [
+                {"chat_id": chat_id, "sender": m["sender"], "text": m["text"]}
+                for m in messages
+            ],
         )
-        if not chat:
-            raise HTTPException(status_code=404, detail="Chat not found")
-        msg = Message(chat_id=chat_id, sender=sender, text=text)
-        db.add(msg)
-        db.commit()
-        db.refresh(msg)
-        return {
-            "id": msg.id,
-            "sender": msg.sender,
-            "text": msg.text,
-            "created_at": msg.created_at,
-        }
-    finally:
-        db.close()
+        created = [row._asdict() for row in rows]
+        await db.commit()
+        return created
 
 
-def get_messages(user_id: int, chat_id: int):
-    db = SessionLocal()
+async def add_message(
+    user_id: int,
+    chat_id: int,
+    text: str,
+    sender: str,
+    db: AsyncSession = None,
+):
+    created = await add_messages(
+        user_id, chat_id, [{"text": text, "sender": sender}], db=db
+    )
+    return created[0]
+
+
+def _encode_message_cursor(created_at, message_id):
+    payload = {"c": created_at.isoformat(), "i": message_id}
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def _decode_message_cursor(cursor):
     try:
-        chat = (
-            db.query(Chat)
-            .filter(Chat.id == chat_id, Chat.user_id == user_id, Chat.is_active == 1)
-            .first()
-        )
-        if not chat:
-            raise HTTPException(status_code=404, detail="Chat not found")
-        messages = (
-            db.query(Message)
-            .filter(Message.chat_id == chat_id)
-            .order_by(Message.created_at)
-            .all()
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(payload["c"]), int(payload["i"])
+    except Exception:
+        raise HTTPException(status_code=400, detail="Malformed cursor")
+
+
+async def get_messages(
+    user_id: int,
+    chat_id: int,
+    limit: int = None,
+    before: str = None,
+    after: str = None,
+    db: AsyncSession = None,
+):
+    """Oldest-first page of a chat's messages; returns (messages, before_cursor, after_cursor).
+
+    Without ``limit`` the whole history is returned. With it, the newest
+    ``limit`` messages older than ``before`` (or the newest overall), or the
+    oldest ``limit`` newer than ``after``. ``before_cursor`` is set while older
+    messages remain; ``after_cursor`` marks the last message returned.
+    """
+    if before and after:
+        raise HTTPException(status_code=400, detail="Pass either before or after, not both")
+    async with async_session_scope(db) as db:
+        await _get_active_chat(db, user_id, chat_id)
+        query = select(
+            Message.id, Message.sender, Message.text, Message.created_at
+        ).where(Message.chat_id == chat_id)
+        # Keyset on (created_at, id); a row comparison lets the planner seek
+        # ix_messages_chat_id_created_at_id instead of filtering the whole chat.
+        # A question and its answer share created_at; id keeps them in order
+        position = tuple_(Message.created_at, Message.id)
+        if after:
+            query = query.where(position > tuple_(*_decode_message_cursor(after)))
+        elif before:
+            query = query.where(position < tuple_(*_decode_message_cursor(before)))
+        newest_first = limit is not None and not after
+        if newest_first:
+            query = query.order_by(Message.created_at.desc(), Message.id.desc())
+        else:
+            query = query.order_by(Message.created_at, Message.id)
+        if limit is not None:
+            query = query.limit(limit + 1)
+        rows = (await db.execute(query)).all()
+
+        has_more = limit is not None and len(rows) > limit
+        if has_more:
+            rows = rows[:limit]
+        if newest_first:
+            rows.reverse()
+        messages = [row._asdict() for row in rows]
+        if not messages:
+            return messages, None, after
+        older_remain = has_more if newest_first else bool(after)
+        before_cursor = (
+            _encode_message_cursor(rows[0].created_at, rows[0].id) if older_remain else None
         )
-        return [
-            {"id": m.id, "sender": m.sender, "text": m.text, "created_at": m.created_at}
-            for m in messages
-        ]
-    finally:
-        db.close()
+        after_cursor = _encode_message_cursor(rows[-1].created_at, rows[-1].id)
+        return messages, before_cursor, after_cursor
+
+
+def file_metadata_to_dict(f):
+    return {
+        "id": f.id,
+        "file_name": f.file_name,
+        "file_size": f.file_size,
+        "file_type": f.file_type,
+        "columns": f.columns,
+        "num_rows": f.num_rows,
+        "num_columns": f.num_columns,
+        "summary_stats": f.summary_stats,
+        "bucket_path": f.bucket_path,
+        "table_names": f.table_names,
+        "sheets": f.sheets,
+        "uploaded_at": f.uploaded_at,
+    }
 
 
 def add_file_metadata(
@@ -155,9 +230,12 @@ def add_file_metadata(
     summary_stats: dict,
     bucket_path: str,
     table_names: list = None,
+    columnar_path: str = None,
+    content_hash: str = None,
+    sheets: dict = None,
+    db: Session = None,
 ):
-    db = SessionLocal()
-    try:
+    with session_scope(db) as db:
         file_meta = FileMetadata(
             user_id=user_id,
             chat_id=chat_id,
@@ -169,59 +247,25 @@ def add_file_metadata(
             num_columns=num_columns,
             summary_stats=summary_stats,
             bucket_path=bucket_path,
+            columnar_path=columnar_path,
+            content_hash=content_hash,
             table_names=table_names,
+            sheets=sheets,
         )
         db.add(file_meta)
         db.commit()
         db.refresh(file_meta)
-        return {
-            "id": file_meta.id,
-            "file_name": file_meta.file_name,
-            "file_size": file_meta.file_size,
-            "file_type": file_meta.file_type,
-            "columns": file_meta.columns,
-            "num_rows": file_meta.num_rows,
-            "num_columns": file_meta.num_columns,
-            "summary_stats": file_meta.summary_stats,
-            "bucket_path": file_meta.bucket_path,
-            "table_names": file_meta.table_names,
-            "uploaded_at": file_meta.uploaded_at,
-        }
-    finally:
-        db.close()
+        return file_metadata_to_dict(file_meta)
 
 
-def list_file_metadata(user_id: int, chat_id: int):
-    db = SessionLocal()
-    try:
-        chat = (
-            db.query(Chat)
-            .filter(Chat.id == chat_id, Chat.user_id == user_id, Chat.is_active == 1)
-            .first()
-        )
-        if not chat:
-            raise HTTPException(status_code=404, detail="Chat not found")
+async def list_file_metadata(user_id: int, chat_id: int, db: AsyncSession = None):
+    async with async_session_scope(db) as db:
+        await _get_active_chat(db, user_id, chat_id)
         files = (
-            db.query(FileMetadata)
-            .filter(FileMetadata.chat_id == chat_id)
-            .order_by(FileMetadata.uploaded_at)
-            .all()
-        )
-        return [
-            {
-                "id": f.id,
-                "file_name": f.file_name,
-                "file_size": f.file_size,
-                "file_type": f.file_type,
-                "columns": f.columns,
-                "num_rows": f.num_rows,
-                "num_columns": f.num_columns,
-                "summary_stats": f.summary_stats,
-                "bucket_path": f.bucket_path,
-                "table_names": f.table_names,
-                "uploaded_at": f.uploaded_at,
-            }
-            for f in files
-        ]
-    finally:
-        db.close()
+            await db.execute(
+                select(FileMetadata)
+                .where(FileMetadata.chat_id == chat_id)
+                .order_by(FileMetadata.uploaded_at)
+            )
+        ).scalars()
+        return [file_metadata_to_dict(f) for f in files]
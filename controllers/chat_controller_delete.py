@@ -1,13 +1,14 @@
 from fastapi import HTTPException
-from db import SessionLocal
+from sqlalchemy.orm import Session
+from db import session_scope
 from models.chat import Chat
 from models.message import Message
 from models.file_metadata import FileMetadata
+from services.dataset_cache import dataset_cache
 
 
-def delete_chat_permanently(user_id: int, chat_id: int):
-    db = SessionLocal()
-    try:
+def delete_chat_permanently(user_id: int, chat_id: int, db: Session = None):
+    with session_scope(db) as db:
         chat = (
             db.query(Chat).filter(Chat.id == chat_id, Chat.user_id == user_id).first()
         )
@@ -17,10 +18,16 @@ def delete_chat_permanently(user_id: int, chat_id: int):
         # Delete all messages for this chat
         db.query(Message).filter(Message.chat_id == chat_id).delete()
         # Delete all files for this chat
+        file_ids = [
+            fid
+            for (fid,) in db.query(FileMetadata.id).filter(
+                FileMetadata.chat_id == chat_id
+            )
+        ]
         db.query(FileMetadata).filter(FileMetadata.chat_id == chat_id).delete()
 
         db.delete(chat)
         db.commit()
+        for fid in file_ids:
+            dataset_cache.invalidate(fid)
         return {"detail": "Chat permanently deleted"}
-    finally:
-        db.close()
@@ -1,11 +1,16 @@
+import base64
+import json
+from datetime import datetime
 from fastapi import HTTPException
-from db import SessionLocal
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+from db import session_scope
 from models.dashboard import Dashboard, SharedDashboard
+from services.shared_dashboard_cache import shared_dashboard_cache
 
 
-def delete_dashboard_permanently(user_id: int, dashboard_id: int):
-    db = SessionLocal()
-    try:
+def delete_dashboard_permanently(user_id: int, dashboard_id: int, db: Session = None):
+    with session_scope(db) as db:
         dashboard = (
             db.query(Dashboard)
             .filter(Dashboard.id == dashboard_id, Dashboard.user_id == user_id)
@@ -16,13 +21,14 @@ def delete_dashboard_permanently(user_id: int, dashboard_id: int):
         db.delete(dashboard)
         db.commit()
         return {"detail": "Dashboard permanently deleted"}
-    finally:
-        db.close()
 
 
-def delete_shared_dashboard_permanently(user_id: int, shared_dashboard_id: int):
-    db = SessionLocal()
-    try:
+def delete_shared_dashboard_permanently(
+    user_id: int,
+    shared_dashboard_id: int,
+    db: Session = None,
+):
+    with session_scope(db) as db:
         shared_dashboard = (
             db.query(SharedDashboard)
             .filter(
@@ -33,8 +39,56 @@ def delete_shared_dashboard_permanently(user_id: int, shared_dashboard_id: int):
         )
         if not shared_dashboard:
             raise HTTPException(status_code=404, detail="Shared dashboard not found")
+        code = shared_dashboard.code
         db.delete(shared_dashboard)
         db.commit()
+        shared_dashboard_cache.invalidate(code)
         return {"detail": "Shared dashboard permanently deleted"}
-    finally:
-        db.close()
+
+
+def _encode_dashboard_cursor(created_at, dashboard_id):
+    payload = {"c": created_at.isoformat(), "i": dashboard_id}
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def _decode_dashboard_cursor(cursor):
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(payload["c"]), int(payload["i"])
+    except Exception:
+        raise HTTPException(status_code=400, detail="Malformed cursor")
+
+
+def list_dashboard_summaries(
+    user_id: int,
+    limit: int,
+    cursor: str = None,
+    db: Session = None,
+):
+    """Newest-first page of (id, name, timestamps); returns (summaries, next_cursor)."""
+    with session_scope(db) as db:
+        query = db.query(
+            Dashboard.id,
+            Dashboard.dashboard_name,
+            Dashboard.created_at,
+            Dashboard.updated_at,
+        ).filter(Dashboard.user_id == user_id)
+        if cursor:
+            # Keyset: resume strictly after the last row of the previous page
+            created_at, dashboard_id = _decode_dashboard_cursor(cursor)
+            query = query.filter(
+                or_(
+                    Dashboard.created_at < created_at,
+                    and_(Dashboard.created_at == created_at, Dashboard.id < dashboard_id),
+                )
+            )
+        rows = (
+            query.order_by(Dashboard.created_at.desc(), Dashboard.id.desc())
+            .limit(limit + 1)
+            .all()
+        )
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = _encode_dashboard_cursor(rows[-1].created_at, rows[-1].id)
+        return [row._asdict() for row in rows], next_cursor
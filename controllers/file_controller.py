@@ -1,11 +1,12 @@
 from fastapi import HTTPException
-from db import SessionLocal
+from sqlalchemy.orm import Session
+from db import session_scope
 from models.file_metadata import FileMetadata
+from services.dataset_cache import dataset_cache
 
 
-def delete_file_permanently(user_id: int, file_id: int):
-    db = SessionLocal()
-    try:
+def delete_file_permanently(user_id: int, file_id: int, db: Session = None):
+    with session_scope(db) as db:
         file = (
             db.query(FileMetadata)
             .filter(FileMetadata.id == file_id, FileMetadata.user_id == user_id)
@@ -15,6 +16,5 @@ def delete_file_permanently(user_id: int, file_id: int):
             raise HTTPException(status_code=404, detail="File not found")
         db.delete(file)
         db.commit()
+        dataset_cache.invalidate(file_id)
         return {"detail": "File permanently deleted"}
-    finally:
-        db.close()
@@ -0,0 +1,91 @@
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+from db import session_scope
+from models.file_metadata import FileMetadata
+from models.ingestion_job import IngestionJob
+from controllers.chat_controller import file_metadata_to_dict
+from utils.process import owner_is_gone, process_owner
+
+
+def create_job(
+    user_id: int,
+    source: str,
+    file_name: str,
+    chat_id: int = None,
+    db: Session = None,
+):
+    with session_scope(db) as db:
+        job = IngestionJob(
+            user_id=user_id,
+            chat_id=chat_id,
+            source=source,
+            file_name=file_name,
+            owner=process_owner(),
+        )
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        return job.id
+
+
+def update_job(job_id: int, db: Session = None, **fields):
+    with session_scope(db) as db:
+        db.query(IngestionJob).filter(IngestionJob.id == job_id).update(fields)
+        db.commit()
+
+
+def fail_orphaned_jobs(db: Session = None):
+    """Fail queued/running jobs whose API process on this host has exited.
+
+    The worker pool dies with that process, so those jobs would otherwise stay
+    queued or running forever. Jobs owned by other hosts are reconciled when
+    those hosts restart. Returns the number of jobs failed.
+    """
+    with session_scope(db) as db:
+        jobs = (
+            db.query(IngestionJob.id, IngestionJob.owner)
+            .filter(IngestionJob.status.in_(("queued", "running")))
+            .all()
+        )
+        # Jobs created before owners were recorded can only be orphans by now
+        orphaned = [job.id for job in jobs if not job.owner or owner_is_gone(job.owner)]
+        if orphaned:
+            db.query(IngestionJob).filter(IngestionJob.id.in_(orphaned)).update(
+                {"status": "failed", "error": "Interrupted by a server restart"},
+                synchronize_session=False,
+            )
+            db.commit()
+        return len(orphaned)
+
+
+def get_job(user_id: int, job_id: int, db: Session = None):
+    with session_scope(db) as db:
+        job = (
+            db.query(IngestionJob)
+            .filter(IngestionJob.id == job_id, IngestionJob.user_id == user_id)
+            .first()
+        )
+        if not job:
+            raise HTTPException(status_code=404, detail="Job not found")
+        result = {
+            "id": job.id,
+            "source": job.source,
+            "file_name": job.file_name,
+            "chat_id": job.chat_id,
+            "status": job.status,
+            "progress": job.progress,
+            "error": job.error,
+            "file_metadata_id": job.file_metadata_id,
+            "created_at": job.created_at,
+            "updated_at": job.updated_at,
+            "file": None,
+        }
+        if job.file_metadata_id:
+            file_meta = (
+                db.query(FileMetadata)
+                .filter(FileMetadata.id == job.file_metadata_id)
+                .first()
+            )
+            if file_meta:
+                result["file"] = file_metadata_to_dict(file_meta)
+        return result
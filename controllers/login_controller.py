@@ -1,25 +1,38 @@
 from datetime import datetime
-from db import SessionLocal
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from db import session_scope
 from models.user import User
-from utils.auth import verify_password
-from utils.jwt import create_access_token
+from utils.auth import verify_password_async
+from utils.jwt import create_access_token, invalidate_user, user_token_claims
 
-def login_user(email: str, password: str):
-    db = SessionLocal()
-    try:
+def _find_user(email: str, db: Session = None):
+    with session_scope(db) as db:
         user = db.query(User).filter(User.email == email).first()
-        if not user or not verify_password(password, user.password):
-            return {"error": "Invalid email or password"}
-        
+        # End the read transaction so no connection is held while bcrypt runs
+        db.commit()
+        return user
+
+def _record_login(user_id: int, db: Session = None):
+    with session_scope(db) as db:
+        # Already in the session's identity map when it found the user
+        user = db.get(User, user_id)
         user.last_login = datetime.utcnow()
         db.commit()
-        db.refresh(user)
-        
-        access_token = create_access_token(data={"sub": user.email})
-        return {
-            "access_token": access_token,
-            "token_type": "bearer",
-            "user": {"id": user.id, "name": user.name, "email": user.email}
-        }
-    finally:
-        db.close()
\ No newline at end of file
+        invalidate_user(user.email)
+        return user
+
+async def login_user(email: str, password: str, db: Session = None):
+    # Database work runs on the threadpool, bcrypt on the hashing pool
+    user = await run_in_threadpool(_find_user, email, db)
+    if not user or not await verify_password_async(password, user.password):
+        return {"error": "Invalid email or password"}
+
+    user = await run_in_threadpool(_record_login, user.id, db)
+
+    access_token = create_access_token(data=user_token_claims(user))
+    return {
+        "access_token": access_token,
+        "token_type": "bearer",
+        "user": {"id": user.id, "name": user.name, "email": user.email}
+    }
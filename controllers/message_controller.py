@@ -1,16 +1,14 @@
 from fastapi import HTTPException
-from db import SessionLocal
+from sqlalchemy.orm import Session
+from db import session_scope
 from models.message import Message
 
 
-def delete_message_permanently(user_id: int, message_id: int):
-    db = SessionLocal()
-    try:
+def delete_message_permanently(user_id: int, message_id: int, db: Session = None):
+    with session_scope(db) as db:
         message = db.query(Message).filter(Message.id == message_id).first()
         if not message:
             raise HTTPException(status_code=404, detail="Message not found")
         db.delete(message)
         db.commit()
         return {"detail": "Message permanently deleted"}
-    finally:
-        db.close()
@@ -1,11 +1,15 @@
 from fastapi import HTTPException
-from db import SessionLocal
+from sqlalchemy.orm import Session
+from db import session_scope
 from models.shared_chat import SharedChat
 
 
-def delete_shared_chat_permanently(user_id: int, shared_chat_id: int):
-    db = SessionLocal()
-    try:
+def delete_shared_chat_permanently(
+    user_id: int,
+    shared_chat_id: int,
+    db: Session = None,
+):
+    with session_scope(db) as db:
         shared_chat = (
             db.query(SharedChat).filter(SharedChat.id == shared_chat_id).first()
         )
@@ -14,5 +18,3 @@ def delete_shared_chat_permanently(user_id: int, shared_chat_id: int):
         db.delete(shared_chat)
         db.commit()
         return {"detail": "Shared chat permanently deleted"}
-    finally:
-        db.close()
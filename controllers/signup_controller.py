@@ -1,46 +1,55 @@
-from db import SessionLocal
+from db import session_scope
 from models.user import User
 from sqlalchemy.exc import IntegrityError
-from utils.auth import get_password_hash
-from utils.jwt import create_access_token
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from utils.auth import get_password_hash_async
+from utils.jwt import create_access_token, user_token_claims
 from fastapi import HTTPException
 from datetime import datetime
 
-def signup_user(name: str, email: str, password: str):
-    db = SessionLocal()
-    try:
-        # Check if user already exists
-        existing_user = db.query(User).filter(User.email == email).first()
-        if existing_user:
-            raise HTTPException(status_code=400, detail="Email already registered")
+def _email_taken(email: str, db: Session = None):
+    with session_scope(db) as db:
+        taken = db.query(User.id).filter(User.email == email).first() is not None
+        # End the read transaction so no connection is held while bcrypt runs
+        db.commit()
+        return taken
 
-        # Create new user
-        now = datetime.utcnow()
-        hashed_password = get_password_hash(password)
-        user = User(
-            name=name,
-            email=email,
-            password=hashed_password,
-            created_at=now,
-            last_login=now
-        )
+def _create_user(name: str, email: str, hashed_password: str, db: Session = None):
+    with session_scope(db) as db:
+        try:
+            # Create new user
+            now = datetime.utcnow()
+            user = User(
+                name=name,
+                email=email,
+                password=hashed_password,
+                created_at=now,
+                last_login=now
+            )
         
-        db.add(user)
-        db.commit()
-        db.refresh(user)
+            db.add(user)
+            db.commit()
+            db.refresh(user)
         
-        # Create a token for the new user, just like in login
-        access_token = create_access_token(data={"sub": user.email})
-        return {
-            "access_token": access_token,
-            "token_type": "bearer",
-            "user": {"id": user.id, "name": user.name, "email": user.email}
-        }
-    except Exception as e:
-        db.rollback()
-        # Check for specific integrity error for existing user
-        if isinstance(e, IntegrityError):
-             raise HTTPException(status_code=400, detail="Email already registered")
-        raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        db.close()
\ No newline at end of file
+            # Create a token for the new user, just like in login
+            access_token = create_access_token(data=user_token_claims(user))
+            return {
+                "access_token": access_token,
+                "token_type": "bearer",
+                "user": {"id": user.id, "name": user.name, "email": user.email}
+            }
+        except Exception as e:
+            db.rollback()
+            # Check for specific integrity error for existing user
+            if isinstance(e, IntegrityError):
+                 raise HTTPException(status_code=400, detail="Email already registered")
+            raise HTTPException(status_code=500, detail=str(e))
+
+async def signup_user(name: str, email: str, password: str, db: Session = None):
+    # Check if user already exists
+    if await run_in_threadpool(_email_taken, email, db):
+        raise HTTPException(status_code=400, detail="Email already registered")
+    # bcrypt runs on the hashing pool, off the request threads
+    hashed_password = await get_password_hash_async(password)
+    return await run_in_threadpool(_create_user, name, email, hashed_password, db)
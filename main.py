@@ -12,12 +12,18 @@ from db import engine
 from routers.ai_router import router as ai_router
 from routers.table_query_router import router as table_query_router
 from routers.dashboard_router import router as dashboard_router
+from routers.ingestion_job_router import router as ingestion_job_router
+from routers.chart_router import router as chart_router
+from routers.ops_router import router as ops_router
+from controllers.ingestion_job_controller import fail_orphaned_jobs
 
 
 from fastapi.openapi.utils import get_openapi
 from fastapi.security import HTTPBearer
+from utils.compression import CompressionMiddleware
+from utils.json_response import FastJSONResponse
 
-app = FastAPI()
+app = FastAPI(default_response_class=FastJSONResponse)
 
 
 # Add Bearer token security scheme to OpenAPI docs
@@ -49,7 +55,9 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Before-Cursor", "X-After-Cursor"],
 )
+app.add_middleware(CompressionMiddleware)
 
 app.include_router(router)
 app.include_router(login_router)
@@ -59,5 +67,16 @@ app.include_router(ai_router)
 app.include_router(table_query_router)
 app.include_router(dashboard_router)
 app.include_router(sharing_router)
+app.include_router(ingestion_job_router)
+app.include_router(chart_router)
+app.include_router(ops_router)
+
+
+@app.on_event("startup")
+def reconcile_ingestion_jobs():
+    # Jobs left behind by a previous process would otherwise never finish
+    fail_orphaned_jobs()
+
+
 # Uncomment to create tables (use alembic instead for production)
 # Base.metadata.create_all(bind=engine)
@@ -4,6 +4,7 @@ from .message import Message
 from .file_metadata import FileMetadata
 from .dashboard import SharedDashboard, ActivityLog, Dashboard
 from .shared_chat import SharedChat
+from .ingestion_job import IngestionJob
 
 __all__ = [
     "User",
@@ -14,4 +15,5 @@ __all__ = [
     "ActivityLog",
     "Dashboard",
     "SharedChat",
+    "IngestionJob",
 ]
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, func
+from sqlalchemy import Column, Index, Integer, String, DateTime, ForeignKey, func, text
 from db import Base
 
 
@@ -11,3 +11,19 @@ class Chat(Base):
     created_at = Column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
     )
+
+    # list_chats / list_deleted_chats: one index per state, each holding only its rows
+    __table_args__ = (
+        Index(
+            "ix_chats_user_id_created_at_active",
+            "user_id",
+            "created_at",
+            postgresql_where=text("is_active = 1"),
+        ),
+        Index(
+            "ix_chats_user_id_created_at_deleted",
+            "user_id",
+            "created_at",
+            postgresql_where=text("is_active = 0"),
+        ),
+    )
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, func
+from sqlalchemy import Column, Index, Integer, String, DateTime, ForeignKey, JSON, func
+from sqlalchemy.orm import deferred
 from db import Base
 
 
@@ -8,7 +9,12 @@ class Dashboard(Base):
     is_active = Column(Integer, default=1, nullable=False)  # 1 = active, 0 = deleted
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     dashboard_name = Column(String(255), nullable=False)
-    dashboard_json = Column(JSON, nullable=False)
+    # Only loaded when accessed, so listings never pull the layout payload
+    dashboard_json = deferred(Column(JSON, nullable=False))
+    # Uploaded datasets live in blob storage as Parquet, read in pages
+    data_path = Column(String, nullable=True)
+    data_columns = Column(JSON, nullable=True)
+    data_num_rows = Column(Integer, nullable=True)
     created_at = Column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
     )
@@ -19,6 +25,9 @@ class Dashboard(Base):
         nullable=False,
     )
 
+    # Newest-first keyset pagination of a user's dashboards
+    __table_args__ = (Index("ix_dashboards_user_id_created_at_id", "user_id", "created_at", "id"),)
+
 
 class SharedDashboard(Base):
     __tablename__ = "shared_dashboards"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, func
+from sqlalchemy import Column, Index, Integer, String, DateTime, ForeignKey, func
 from db import Base
 
 from sqlalchemy import JSON
@@ -14,11 +14,17 @@ class FileMetadata(Base):
     file_size = Column(Integer, nullable=False)
     file_type = Column(String, nullable=False)
     table_names = Column(JSON, nullable=True)  # For Excel: list of sheet names
+    sheets = Column(JSON, nullable=True)  # For Excel: {sheet: {alias, columns, ...}}
     columns = Column(JSON, nullable=True)  # [{name, type, sample_values, ...}]
     num_rows = Column(Integer, nullable=True)
     num_columns = Column(Integer, nullable=True)
     summary_stats = Column(JSON, nullable=True)  # Optional: summary statistics
     bucket_path = Column(String, nullable=True)  # Path in S3/GCS/etc.
+    columnar_path = Column(String, nullable=True)  # Parquet copy used by /table/query
+    content_hash = Column(String(64), nullable=True)  # sha256 of the raw upload
     uploaded_at = Column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
     )
+
+    # A chat's files in upload order (list_file_metadata, chat deletion)
+    __table_args__ = (Index("ix_file_metadata_chat_id_uploaded_at", "chat_id", "uploaded_at"),)
@@ -0,0 +1,32 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, func
+from db import Base
+
+
+class IngestionJob(Base):
+    __tablename__ = "ingestion_jobs"
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    chat_id = Column(
+        Integer, ForeignKey("chats.id", ondelete="SET NULL"), nullable=True
+    )
+    source = Column(String(16), nullable=False)  # 'upload' or 'link'
+    file_name = Column(String, nullable=False)
+    status = Column(
+        String(16), default="queued", nullable=False
+    )  # queued, running, done, failed
+    progress = Column(Integer, default=0, nullable=False)  # 0-100
+    error = Column(String, nullable=True)
+    # host/pid:start of the API process whose worker pool runs the job
+    owner = Column(String(128), nullable=True)
+    file_metadata_id = Column(
+        Integer, ForeignKey("file_metadata.id", ondelete="SET NULL"), nullable=True
+    )
+    created_at = Column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    updated_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+    )
@@ -1,12 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 from typing import Optional, List
-from models.user import User
-from utils.jwt import get_current_user
-from db import SessionLocal
+from utils.jwt import CurrentUser, get_current_user
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from db import get_async_db
 from models.file_metadata import FileMetadata
 from services.ai_services import ask_ai
-from controllers.chat_controller import add_message
+from services.gemini_client import AIUnavailable
+from controllers.chat_controller import add_messages
 
 router = APIRouter()
 
@@ -18,9 +20,28 @@ class AIAskRequest(BaseModel):
     chat_id: Optional[int] = None  # Added chat_id field
 
 
+def _sheet_tables(file_meta, prefix):
+    # Per-sheet metadata keyed by the table name each sheet has in SQL
+    if not file_meta.sheets:
+        return None
+    return {
+        f"{prefix}_{sheet['alias']}": {
+            "sheet_name": sheet_name,
+            "columns": sheet["columns"],
+            "num_rows": sheet["num_rows"],
+            "num_columns": sheet["num_columns"],
+            "summary_stats": sheet["summary_stats"],
+        }
+        for sheet_name, sheet in file_meta.sheets.items()
+    }
+
+
 @router.post("/ai/ask")
-def ai_ask(req: AIAskRequest, user: User = Depends(get_current_user)):
-    db = SessionLocal()
+async def ai_ask(
+    req: AIAskRequest,
+    user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
     metadata = None
     chat_id = (
         req.chat_id
@@ -30,12 +51,13 @@ def ai_ask(req: AIAskRequest, user: User = Depends(get_current_user)):
         metadata = {}
         for idx, fid in enumerate(req.file_ids):
             file_meta = (
-                db.query(FileMetadata)
-                .filter(FileMetadata.id == fid, FileMetadata.user_id == user.id)
-                .first()
-            )
+                await db.execute(
+                    select(FileMetadata).where(
+                        FileMetadata.id == fid, FileMetadata.user_id == user.id
+                    )
+                )
+            ).scalar_one_or_none()
             if not file_meta:
-                db.close()
                 raise HTTPException(status_code=404, detail=f"File {fid} not found")
             metadata[f"df{idx+1}"] = {
                 "columns": file_meta.columns,
@@ -43,15 +65,16 @@ def ai_ask(req: AIAskRequest, user: User = Depends(get_current_user)):
                 "num_columns": file_meta.num_columns,
                 "summary_stats": file_meta.summary_stats,
                 "table_names": file_meta.table_names,
+                "sheets": _sheet_tables(file_meta, f"df{idx+1}"),
             }
-        db.close()
     elif req.file_id:
         file_meta = (
-            db.query(FileMetadata)
-            .filter(FileMetadata.id == req.file_id, FileMetadata.user_id == user.id)
-            .first()
-        )
-        db.close()
+            await db.execute(
+                select(FileMetadata).where(
+                    FileMetadata.id == req.file_id, FileMetadata.user_id == user.id
+                )
+            )
+        ).scalar_one_or_none()
         if not file_meta:
             raise HTTPException(status_code=404, detail="File not found")
         metadata = {
@@ -60,13 +83,29 @@ def ai_ask(req: AIAskRequest, user: User = Depends(get_current_user)):
             "num_columns": file_meta.num_columns,
             "summary_stats": file_meta.summary_stats,
             "table_names": file_meta.table_names,
+            "sheets": _sheet_tables(file_meta, "df"),
         }
+    # End the read transaction so no pooled connection is held during the model call
+    await db.rollback()
     # If neither, metadata remains None
-    answer = ask_ai(req.question, metadata)
+    try:
+        answer = await ask_ai(req.question, metadata)
+    except AIUnavailable as e:
+        raise HTTPException(
+            status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)}
+        )
 
     # --- Save messages to chat history ---
     if chat_id:
-        add_message(user.id, chat_id, req.question, "user")
-        add_message(user.id, chat_id, answer["answer"], "bot")
+        # One ownership check, one INSERT and one commit for the pair
+        await add_messages(
+            user.id,
+            chat_id,
+            [
+                {"text": req.question, "sender": "user"},
+                {"text": answer["answer"], "sender": "bot"},
+            ],
+            db=db,
+        )
 
     return answer
@@ -1,6 +1,9 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from db import get_db
 from pydantic import BaseModel, EmailStr, constr
 from controllers.change_password_controller import change_password
+from utils.auth import PasswordHashQueueFull, PasswordHashUnavailable
 
 router = APIRouter()
 
@@ -10,15 +13,20 @@ class ChangePasswordPayload(BaseModel):
     new_password: constr(min_length=6)
 
 @router.post("/change-password")
-async def change_password_route(payload: ChangePasswordPayload):
+async def change_password_route(payload: ChangePasswordPayload, db: Session = Depends(get_db)):
     try:
-        result = change_password(
+        result = await change_password(
             payload.email, 
             payload.old_password, 
-            payload.new_password
+            payload.new_password,
+            db=db,
         )
         return result
     except HTTPException as e:
         raise e
+    except PasswordHashQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "1"})
+    except PasswordHashUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
@@ -0,0 +1,67 @@
+from contextlib import nullcontext
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel, Field
+from typing import Optional
+from utils.jwt import CurrentUser, get_current_user
+from sqlalchemy.orm import Session
+from db import get_db
+from models.file_metadata import FileMetadata
+from services.chart_data import chart_data
+from services.dataset_store import load_dataframe
+from utils.azure_blob import cached_blob_path
+from utils.json_response import FastJSONResponse
+
+router = APIRouter()
+
+
+class ChartDataRequest(BaseModel):
+    file_id: int
+    x: str
+    y: Optional[str] = None  # Optional for count
+    agg: Optional[str] = None  # count, sum, avg, min, max, median; None plots raw points
+    bins: Optional[int] = Field(None, ge=1, le=10000)  # Equal-width bins over a numeric x
+    time_bucket: Optional[str] = None  # second ... year, via date_trunc
+    max_points: int = Field(1000, ge=3, le=10000)  # Roughly the chart's width in pixels
+
+
+@router.post("/chart/data")
+def get_chart_data(
+    req: ChartDataRequest,
+    user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    file_meta = (
+        db.query(FileMetadata)
+        .filter(FileMetadata.id == req.file_id, FileMetadata.user_id == user.id)
+        .first()
+    )
+    # Release the connection before the (possibly long) aggregation
+    db.commit()
+    if not file_meta:
+        raise HTTPException(status_code=404, detail="File not found")
+    column_names = {c["name"] for c in file_meta.columns or []}
+    for column in (req.x, req.y):
+        if column is not None and column not in column_names:
+            raise HTTPException(status_code=400, detail=f"Unknown column: {column}")
+
+    try:
+        # Parquet copies are scanned in place, reading only the x and y columns
+        if file_meta.columnar_path:
+            source_ctx = cached_blob_path(file_meta.columnar_path)
+        else:
+            source_ctx = nullcontext(load_dataframe(file_meta))
+        with source_ctx as source:
+            result = chart_data(
+                source,
+                req.x,
+                req.y,
+                agg=req.agg,
+                bins=req.bins,
+                time_bucket=req.time_bucket,
+                max_points=req.max_points,
+            )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Chart error: {str(e)}")
+    return FastJSONResponse(result)
@@ -1,17 +1,26 @@
 from controllers import message_controller
 
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
-from typing import List
-from models.user import User
-from utils.jwt import get_current_user
+from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File
+from fastapi.concurrency import run_in_threadpool
+from typing import List, Optional, Union
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from db import get_async_db, get_db
+from utils.jwt import CurrentUser, get_current_user
 from pydantic import BaseModel
 from controllers import chat_controller
+from utils.json_response import FastJSONResponse
 from controllers import chat_controller_delete
-from utils.azure_blob import upload_file_to_azure
-import pandas as pd
-import io
-import math
+from controllers import ingestion_job_controller
+from services.ingestion_jobs import (
+    IngestQueueFull,
+    IngestUnavailable,
+    run_upload_job,
+    spool_upload,
+    submit_job,
+)
+import os
 
 router = APIRouter()
 
@@ -32,152 +41,155 @@ class ChatUpdate(BaseModel):
 @router.delete("/messages/permanent/{message_id}")
 def delete_message_permanently(
     message_id: int,
-    user: User = Depends(get_current_user),
+    user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db),
 ):
-    return message_controller.delete_message_permanently(user.id, message_id)
+    return message_controller.delete_message_permanently(user.id, message_id, db=db)
 
 
 @router.delete("/chats/{chat_id}/permanent", response_model=dict)
 def delete_chat_permanently(
     chat_id: int,
-    user: User = Depends(get_current_user),
+    user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db),
 ):
-    return chat_controller_delete.delete_chat_permanently(user.id, chat_id)
+    return chat_controller_delete.delete_chat_permanently(user.id, chat_id, db=db)
 
 
 @router.patch("/chats/{chat_id}", response_model=dict)
-def update_chat_is_active(
+async def update_chat_is_active(
     chat_id: int,
     chat_update: ChatUpdate,
-    user: User = Depends(get_current_user),
+    user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    return chat_controller.update_chat_is_active(
-        user.id, chat_id, chat_update.is_active
+    return await chat_controller.update_chat_is_active(
+        user.id, chat_id, chat_update.is_active, db=db
     )
 
 
 @router.post("/chats", response_model=dict)
-def create_chat(
+async def create_chat(
     chat: ChatCreate,
-    user: User = Depends(get_current_user),
+    user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    return chat_controller.create_chat(user.id, chat.title)
+    return await chat_controller.create_chat(user.id, chat.title, db=db)
 
 
 # List active chats
 @router.get("/chats", response_model=List[dict])
-def list_chats(user: User = Depends(get_current_user)):
-    return chat_controller.list_chats(user.id)
+async def list_chats(
+    user: CurrentUser = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)
+):
+    return await chat_controller.list_chats(user.id, db=db)
 
 
 # List deleted chats (for recycle bin)
 @router.get("/chats/deleted", response_model=List[dict])
-def list_deleted_chats(user: User = Depends(get_current_user)):
-    return chat_controller.list_deleted_chats(user.id)
+async def list_deleted_chats(
+    user: CurrentUser = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)
+):
+    return await chat_controller.list_deleted_chats(user.id, db=db)
+
+
+# Largest batch accepted by one POST, e.g. when importing chat history
+MAX_MESSAGES_PER_REQUEST = 1000
 
 
-@router.post("/chats/{chat_id}/messages", response_model=dict)
-def add_message(
+@router.post("/chats/{chat_id}/messages", response_model=Union[dict, List[dict]])
+async def add_message(
     chat_id: int,
-    message: MessageCreate,
-    user: User = Depends(get_current_user),
+    message: Union[MessageCreate, List[MessageCreate]],
+    user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    return chat_controller.add_message(user.id, chat_id, message.text, message.sender)
+    if isinstance(message, MessageCreate):
+        return await chat_controller.add_message(
+            user.id, chat_id, message.text, message.sender, db=db
+        )
+    if not 0 < len(message) <= MAX_MESSAGES_PER_REQUEST:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Send between 1 and {MAX_MESSAGES_PER_REQUEST} messages",
+        )
+    return await chat_controller.add_messages(
+        user.id, chat_id, [m.model_dump() for m in message], db=db
+    )
 
 
 @router.get("/chats/{chat_id}/messages", response_model=List[dict])
-def get_messages(
+async def get_messages(
     chat_id: int,
-    user: User = Depends(get_current_user),
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    before: Optional[str] = None,
+    after: Optional[str] = None,
+    user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    return chat_controller.get_messages(user.id, chat_id)
+    messages, before_cursor, after_cursor = await chat_controller.get_messages(
+        user.id, chat_id, limit, before, after, db=db
+    )
+    headers = {}
+    if before_cursor:
+        headers["X-Before-Cursor"] = before_cursor
+    if after_cursor:
+        headers["X-After-Cursor"] = after_cursor
+    # Returned as a response so orjson encodes it without a jsonable_encoder pass
+    return FastJSONResponse(messages, headers=headers)
 
 
-@router.post("/chats/{chat_id}/files", response_model=dict)
+@router.post("/chats/{chat_id}/files", response_model=dict, status_code=202)
 async def upload_file_metadata(
     chat_id: int,
     file: UploadFile = File(...),
-    user: User = Depends(get_current_user),
+    user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db),
 ):
+    if not file.filename.lower().endswith((".csv", ".xls", ".xlsx")):
+        raise HTTPException(status_code=400, detail="Unsupported file type")
+    # Only the local copy happens in the request; uploading to Azure Blob,
+    # profiling and the columnar copy run as a background ingestion job
+    local_path = await run_in_threadpool(spool_upload, file.file, file.filename)
+    job_id = await run_in_threadpool(
+        ingestion_job_controller.create_job,
+        user.id,
+        "upload",
+        file.filename,
+        chat_id=chat_id,
+        db=db,
+    )
     try:
-        # 1. Upload file to Azure Blob
-        bucket_path = upload_file_to_azure(file.file, file.filename)
-
-        # 2. Extract metadata
-        file.file.seek(0)
-        content = await file.read()
-        columns = []
-        num_rows = 0
-        num_columns = 0
-        summary_stats = {}
-        table_names = None
-
-        if file.filename.lower().endswith(".csv"):
-            df = pd.read_csv(io.BytesIO(content))
-            columns = [
-                {
-                    "name": col,
-                    "type": str(df[col].dtype),
-                    "sample_values": df[col].head(3).tolist(),
-                }
-                for col in df.columns
-            ]
-            num_rows = len(df)
-            num_columns = len(df.columns)
-            summary_stats = df.describe().to_dict()
-        elif file.filename.lower().endswith((".xls", ".xlsx")):
-            xls = pd.ExcelFile(io.BytesIO(content))
-            table_names = xls.sheet_names
-            # For simplicity, extract metadata from the first sheet
-            df = xls.parse(table_names[0])
-            columns = [
-                {
-                    "name": col,
-                    "type": str(df[col].dtype),
-                    "sample_values": df[col].head(3).tolist(),
-                }
-                for col in df.columns
-            ]
-            num_rows = len(df)
-            num_columns = len(df.columns)
-            summary_stats = df.describe().to_dict()
-        else:
-            raise HTTPException(status_code=400, detail="Unsupported file type")
-
-        def clean_nans(obj):
-            if isinstance(obj, float) and math.isnan(obj):
-                return None
-            if isinstance(obj, dict):
-                return {k: clean_nans(v) for k, v in obj.items()}
-            if isinstance(obj, list):
-                return [clean_nans(x) for x in obj]
-            return obj
-
-        # Clean NaNs before saving to DB
-        columns = clean_nans(columns)
-        summary_stats = clean_nans(summary_stats)
-
-        # 3. Save metadata in DB
-        return chat_controller.add_file_metadata(
-            user.id,
-            chat_id,
+        submit_job(
+            job_id,
+            run_upload_job,
+            local_path,
             file.filename,
-            len(content),
             file.content_type,
-            columns=columns,
-            num_rows=num_rows,
-            num_columns=num_columns,
-            summary_stats=summary_stats,
-            bucket_path=bucket_path,
-            table_names=table_names,
+            user.id,
+            chat_id,
+            spool_path=local_path,
+        )
+    except (IngestQueueFull, IngestUnavailable) as e:
+        os.remove(local_path)
+        await run_in_threadpool(
+            ingestion_job_controller.update_job,
+            job_id,
+            db=db,
+            status="failed",
+            error=str(e),
         )
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"File processing error: {str(e)}")
+        status_code = 429 if isinstance(e, IngestQueueFull) else 503
+        raise HTTPException(status_code=status_code, detail=str(e))
+    return {"job_id": job_id, "status": "queued"}
 
 
 @router.get("/chats/{chat_id}/files", response_model=List[dict])
-def list_file_metadata(
+async def list_file_metadata(
     chat_id: int,
-    user: User = Depends(get_current_user),
+    user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    return chat_controller.list_file_metadata(user.id, chat_id)
+    return FastJSONResponse(
+        await chat_controller.list_file_metadata(user.id, chat_id, db=db)
+    )
@@ -1,6 +1,8 @@
 # --- Imports ---
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Body
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Body, Query, Response, Header
+from sqlalchemy.orm import undefer
 from controllers import dashboard_controller
+from controllers import ingestion_job_controller
 
 
 
@@ -8,18 +10,26 @@ from controllers import dashboard_controller
 
 from sqlalchemy.orm import Session
 from db import get_db
-from models.user import User
-from utils.jwt import get_current_user
-from typing import List
+from utils.jwt import CurrentUser, get_current_user
+from typing import List, Optional
 from pydantic import BaseModel
 import random, string
 from models.dashboard import SharedDashboard, Dashboard
 from datetime import datetime
-import io
 import pandas as pd
-import requests
-from utils.azure_blob import upload_file_to_azure
-from models.file_metadata import FileMetadata
+from services.ingestion_jobs import (
+    IngestQueueFull,
+    IngestUnavailable,
+    run_link_job,
+    submit_job,
+)
+from utils.json_response import FastJSONResponse
+from services.dashboard_data import read_dashboard_rows, store_dashboard_data
+from services.shared_dashboard_cache import (
+    build_shared_snapshot,
+    shared_dashboard_cache,
+    snapshot_response,
+)
 
 
 class IngestLinkRequest(BaseModel):
@@ -29,8 +39,8 @@ class IngestLinkRequest(BaseModel):
 
 class IngestLinkResponse(BaseModel):
     file_name: str
-    bucket_path: str
-    file_size: int
+    job_id: int
+    status: str
     detail: str
 
 
@@ -59,11 +69,21 @@ class ShareDashboardResponse(BaseModel):
         from_attributes = True
 
 
+class DashboardSummary(BaseModel):
+    id: int
+    dashboard_name: str
+    created_at: datetime
+    updated_at: datetime
+
+
 class DashboardResponse(BaseModel):
     id: int
     user_id: int
     dashboard_name: str
     dashboard_json: list
+    # Set for uploaded datasets; rows are fetched from /dashboard/{id}/data
+    data_columns: Optional[list] = None
+    data_num_rows: Optional[int] = None
     created_at: datetime
     updated_at: datetime
 
@@ -73,134 +93,108 @@ class DashboardResponse(BaseModel):
 @router.delete("/permanent/{dashboard_id}")
 def delete_dashboard_permanently(
     dashboard_id: int,
-    user: User = Depends(get_current_user),
+    user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db),
 ):
-    return dashboard_controller.delete_dashboard_permanently(user.id, dashboard_id)
+    return dashboard_controller.delete_dashboard_permanently(
+        user.id, dashboard_id, db=db
+    )
 
 
 # SharedDashboard permanent delete
 @router.delete("/shared/permanent/{shared_dashboard_id}")
 def delete_shared_dashboard_permanently(
     shared_dashboard_id: int,
-    user: User = Depends(get_current_user),
+    user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db),
 ):
     return dashboard_controller.delete_shared_dashboard_permanently(
-        user.id, shared_dashboard_id
+        user.id, shared_dashboard_id, db=db
     )
 
-@router.post("/ingest-link", response_model=IngestLinkResponse)
+@router.post("/ingest-link", response_model=IngestLinkResponse, status_code=202)
 def ingest_file_from_link(
     payload: IngestLinkRequest,
+    user: CurrentUser = Depends(get_current_user),
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
 ):
     url = payload.url
     file_name = payload.file_name or url.split("/")[-1].split("?")[0]
+    # Download, upload to Azure Blob and metadata extraction run in the background
+    job_id = ingestion_job_controller.create_job(user.id, "link", file_name, db=db)
     try:
-        resp = requests.get(url, stream=True, timeout=60)
-        resp.raise_for_status()
-        file_bytes = resp.content
-        file_size = len(file_bytes)
-        # Upload to Azure Blob
-        bucket_path = upload_file_to_azure(io.BytesIO(file_bytes), file_name)
-
-        # Try to extract metadata (columns, rows, etc.)
-        columns = []
-        num_rows = 0
-        num_columns = 0
-        summary_stats = None
-        table_names = None
-        file_type = "unknown"
-        try:
-            if file_name.lower().endswith(".csv"):
-                df = pd.read_csv(io.BytesIO(file_bytes))
-                file_type = "csv"
-            elif file_name.lower().endswith((".xls", ".xlsx")):
-                df = pd.read_excel(io.BytesIO(file_bytes))
-                file_type = "excel"
-            else:
-                df = None
-            if df is not None:
-                columns = [
-                    {
-                        "name": col,
-                        "type": str(df[col].dtype),
-                        "sample_values": df[col].head(3).tolist(),
-                    }
-                    for col in df.columns
-                ]
-                num_rows = len(df)
-                num_columns = len(df.columns)
-                summary_stats = (
-                    df.describe(include="all").to_dict() if not df.empty else None
-                )
-        except Exception:
-            pass  # Metadata extraction is best-effort
-
-        # Save metadata in file_metadata table
-        file_meta = FileMetadata(
-            user_id=user.id,
-            chat_id=None,  # Not associated with a chat
-            file_name=file_name,
-            file_size=file_size,
-            file_type=file_type,
-            columns=columns,
-            num_rows=num_rows,
-            num_columns=num_columns,
-            summary_stats=summary_stats,
-            bucket_path=bucket_path,
-            table_names=table_names,
+        submit_job(job_id, run_link_job, url, file_name, user.id)
+    except (IngestQueueFull, IngestUnavailable) as e:
+        ingestion_job_controller.update_job(
+            job_id, db=db, status="failed", error=str(e)
         )
-        db.add(file_meta)
-        db.commit()
-        db.refresh(file_meta)
-
-        return IngestLinkResponse(
-            file_name=file_name,
-            bucket_path=bucket_path,
-            file_size=file_size,
-            detail="File ingested, uploaded to Azure Blob Storage, and metadata saved.",
-        )
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Failed to ingest file: {str(e)}")
+        status_code = 429 if isinstance(e, IngestQueueFull) else 503
+        raise HTTPException(status_code=status_code, detail=str(e))
+    return IngestLinkResponse(
+        file_name=file_name,
+        job_id=job_id,
+        status="queued",
+        detail="File queued for ingestion. Poll /jobs/{job_id} for progress.",
+    )
 
 
 @router.get("/shared/{code}")
-def get_shared_dashboard(code: str, db: Session = Depends(get_db)):
-    shared = db.query(SharedDashboard).filter(SharedDashboard.code == code).first()
-    if not shared:
+def get_shared_dashboard(
+    code: str,
+    db: Session = Depends(get_db),
+    if_none_match: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None),
+):
+    # Each worker has its own cache, so the share's existence is checked on
+    # every request: one lookup on the unique code index, not the JSON
+    shared_id = (
+        db.query(SharedDashboard.id).filter(SharedDashboard.code == code).scalar()
+    )
+    if shared_id is None:
+        shared_dashboard_cache.invalidate(code)
         raise HTTPException(status_code=404, detail="Shared dashboard not found")
-    # Return a structure compatible with frontend expectations
-    return {
-        "cleanedData": shared.dashboard_json,
-        "dashboardName": f"Shared Dashboard {code}",
-        "created_at": shared.created_at.isoformat() if shared.created_at else None,
-    }
+    # Snapshots are immutable, so they are serialized and compressed only once
+    snapshot = shared_dashboard_cache.get(code)
+    if snapshot is None or snapshot.shared_id != shared_id:
+        shared = db.query(SharedDashboard).filter(SharedDashboard.id == shared_id).first()
+        if not shared:
+            raise HTTPException(status_code=404, detail="Shared dashboard not found")
+        snapshot = build_shared_snapshot(shared)
+        shared_dashboard_cache.put(code, snapshot)
+    return snapshot_response(snapshot, if_none_match, accept_encoding)
 
 
 # --- File Upload Endpoint ---
 @router.post("/upload", response_model=DashboardResponse)
-async def upload_dashboard_file(
+def upload_dashboard_file(
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: CurrentUser = Depends(get_current_user),
 ):
-    contents = await file.read()
-    # Try to parse as CSV first
+    # A plain def: parsing, the blob upload and the commit all block, so
+    # FastAPI runs this in its threadpool instead of on the event loop.
+    # The spooled upload is parsed in place rather than copied into memory.
     try:
-        df = pd.read_csv(io.BytesIO(contents))
+        df = pd.read_csv(file.file)
     except Exception:
         # Try Excel
         try:
-            df = pd.read_excel(io.BytesIO(contents))
+            file.file.seek(0)
+            df = pd.read_excel(file.file)
         except Exception:
             raise HTTPException(
                 status_code=400,
                 detail="Unsupported file format. Please upload a valid CSV or Excel file.",
             )
-    dashboard_json = df.to_dict(orient="records")
+    # The dataset goes to blob storage as Parquet; the row keeps only the layout
+    data_path, data_columns, data_num_rows = store_dashboard_data(df, file.filename)
     dashboard = Dashboard(
-        user_id=user.id, dashboard_name=file.filename, dashboard_json=dashboard_json
+        user_id=user.id,
+        dashboard_name=file.filename,
+        dashboard_json=[],
+        data_path=data_path,
+        data_columns=data_columns,
+        data_num_rows=data_num_rows,
     )
     db.add(dashboard)
     db.commit()
@@ -212,7 +206,7 @@ async def upload_dashboard_file(
 def share_dashboard(
     payload: ShareDashboardRequest,
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: CurrentUser = Depends(get_current_user),
 ):
     # Generate a unique 6-character code
     code = "".join(random.choices(string.ascii_uppercase + string.digits, k=6))
@@ -226,6 +220,7 @@ def share_dashboard(
     db.add(shared_dashboard)
     db.commit()
     db.refresh(shared_dashboard)
+    shared_dashboard_cache.put(code, build_shared_snapshot(shared_dashboard))
     return shared_dashboard
 
 
@@ -234,7 +229,7 @@ def share_dashboard(
 def create_dashboard(
     payload: DashboardCreate,
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: CurrentUser = Depends(get_current_user),
 ):
     dashboard = Dashboard(
         user_id=user.id,
@@ -247,27 +242,32 @@ def create_dashboard(
     return dashboard
 
 
-@router.get("", response_model=List[DashboardResponse])
+# Summaries only; the full dashboard comes from GET /dashboard/{id}
+@router.get("", response_model=List[DashboardSummary])
 def get_my_dashboards(
-    db: Session = Depends(get_db), user: User = Depends(get_current_user)
+    response: Response,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db),
 ):
-    dashboards = (
-        db.query(Dashboard)
-        .filter(Dashboard.user_id == user.id)
-        .order_by(Dashboard.created_at.desc())
-        .all()
+    summaries, next_cursor = dashboard_controller.list_dashboard_summaries(
+        user.id, limit, cursor, db=db
     )
-    return dashboards
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return summaries
 
 
 @router.get("/{dashboard_id}", response_model=DashboardResponse)
 def get_dashboard(
     dashboard_id: int,
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: CurrentUser = Depends(get_current_user),
 ):
     dashboard = (
         db.query(Dashboard)
+        .options(undefer(Dashboard.dashboard_json))
         .filter(Dashboard.id == dashboard_id, Dashboard.user_id == user.id)
         .first()
     )
@@ -276,12 +276,49 @@ def get_dashboard(
     return dashboard
 
 
+@router.get("/{dashboard_id}/data")
+def get_dashboard_data(
+    dashboard_id: int,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(1000, ge=1, le=10000),
+    columns: Optional[List[str]] = Query(None),
+    db: Session = Depends(get_db),
+    user: CurrentUser = Depends(get_current_user),
+):
+    dashboard = (
+        db.query(Dashboard)
+        .filter(Dashboard.id == dashboard_id, Dashboard.user_id == user.id)
+        .first()
+    )
+    if not dashboard:
+        raise HTTPException(status_code=404, detail="Dashboard not found")
+    if not dashboard.data_path:
+        raise HTTPException(status_code=404, detail="Dashboard has no stored dataset")
+    unknown = set(columns or []) - set(dashboard.data_columns or [])
+    if unknown:
+        raise HTTPException(
+            status_code=400, detail=f"Unknown columns: {', '.join(sorted(unknown))}"
+        )
+    result_columns, rows = read_dashboard_rows(
+        dashboard.data_path, offset, limit, columns
+    )
+    return FastJSONResponse(
+        {
+            "columns": result_columns,
+            "rows": rows,
+            "offset": offset,
+            "total_rows": dashboard.data_num_rows,
+            "has_more": offset + len(rows) < dashboard.data_num_rows,
+        }
+    )
+
+
 @router.put("/{dashboard_id}", response_model=DashboardResponse)
 def update_dashboard(
     dashboard_id: int,
     payload: DashboardCreate,
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: CurrentUser = Depends(get_current_user),
 ):
     dashboard = (
         db.query(Dashboard)
@@ -301,7 +338,7 @@ def update_dashboard(
 def delete_dashboard(
     dashboard_id: int,
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: CurrentUser = Depends(get_current_user),
 ):
     dashboard = (
         db.query(Dashboard)
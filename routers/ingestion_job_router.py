@@ -0,0 +1,18 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+from db import get_db
+from utils.jwt import CurrentUser, get_current_user
+from controllers import ingestion_job_controller
+from utils.json_response import FastJSONResponse
+
+router = APIRouter()
+
+
+# Status of a background upload/link ingestion; "file" is set once it is done
+@router.get("/jobs/{job_id}", response_model=dict)
+def get_ingestion_job(
+    job_id: int,
+    user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    return FastJSONResponse(ingestion_job_controller.get_job(user.id, job_id, db=db))
@@ -1,6 +1,9 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from db import get_db
 from pydantic import BaseModel
 from controllers.login_controller import login_user
+from utils.auth import PasswordHashQueueFull, PasswordHashUnavailable
 
 router = APIRouter()
 
@@ -9,8 +12,13 @@ class LoginPayload(BaseModel):
     password: str
 
 @router.post("/login")
-def login(payload: LoginPayload):
-    result = login_user(payload.email, payload.password)
+async def login(payload: LoginPayload, db: Session = Depends(get_db)):
+    try:
+        result = await login_user(payload.email, payload.password, db=db)
+    except PasswordHashQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "1"})
+    except PasswordHashUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     if "error" in result:
         raise HTTPException(status_code=400, detail=result["error"])
     return result
\ No newline at end of file
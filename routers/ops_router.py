@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Depends
+from db import pool_metrics, async_pool_metrics
+from services.ai_services import gemini_client
+from services.dataset_cache import dataset_cache
+from services.query_engine import result_cache
+from utils.azure_blob import blob_disk_cache
+from utils.jwt import CurrentUser, get_ops_user
+
+# Process diagnostics, readable only by the accounts in OPS_ADMIN_EMAILS
+router = APIRouter(prefix="/ops", tags=["ops"])
+
+
+# Connection pool checkouts, for sizing DB_POOL_SIZE/DB_MAX_OVERFLOW per worker
+@router.get("/db/pool-stats")
+def db_pool_stats(user: CurrentUser = Depends(get_ops_user)):
+    return {"sync": pool_metrics.stats(), "async": async_pool_metrics.stats()}
+
+
+# Per-key state of the Gemini key pool: closed / cooldown / open / half-open
+@router.get("/ai/key-stats")
+def ai_key_stats(user: CurrentUser = Depends(get_ops_user)):
+    return gemini_client.stats()
+
+
+# Hit/miss/eviction counters for the DataFrame, local blob and query result caches
+@router.get("/cache-stats")
+def cache_stats(user: CurrentUser = Depends(get_ops_user)):
+    return {
+        "datasets": dataset_cache.stats(),
+        "blobs": blob_disk_cache.stats(),
+        "results": result_cache.stats(),
+    }
@@ -1,28 +1,28 @@
 from controllers import shared_chat_controller
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from db import SessionLocal
+from db import get_db
 from models.chat import Chat
 from models.shared_chat import SharedChat
-from models.user import User
-from utils.jwt import get_current_user
+from utils.jwt import CurrentUser, get_current_user
 
 router = APIRouter()
 
 @router.delete("/chats/shared/permanent/{shared_chat_id}")
 def delete_shared_chat_permanently(
     shared_chat_id: int,
-    user: User = Depends(get_current_user),
+    user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db),
 ):
     return shared_chat_controller.delete_shared_chat_permanently(
-        user.id, shared_chat_id
+        user.id, shared_chat_id, db=db
     )
 
 @router.post("/chats/{chat_id}/share")
 def share_chat(
     chat_id: int,
-    db: Session = Depends(SessionLocal),
-    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     chat = (
         db.query(Chat)
@@ -40,7 +40,7 @@ def share_chat(
 
 
 @router.get("/chats/shared/{share_code}")
-def get_shared_chat(share_code: str, db: Session = Depends(SessionLocal)):
+def get_shared_chat(share_code: str, db: Session = Depends(get_db)):
     shared_chat = (
         db.query(SharedChat).filter(SharedChat.share_code == share_code).first()
     )
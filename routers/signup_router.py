@@ -1,6 +1,9 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from db import get_db
 from pydantic import BaseModel, EmailStr, constr
 from controllers.signup_controller import signup_user
+from utils.auth import PasswordHashQueueFull, PasswordHashUnavailable
 
 router = APIRouter()
 
@@ -10,11 +13,15 @@ class SignupPayload(BaseModel):
     password: constr(min_length=6)
 
 @router.post("/signup")
-async def signup(payload: SignupPayload):
+async def signup(payload: SignupPayload, db: Session = Depends(get_db)):
     try:
-        result = signup_user(payload.name, payload.email, payload.password)
+        result = await signup_user(payload.name, payload.email, payload.password, db=db)
         return result
     except HTTPException as e:
         raise e
+    except PasswordHashQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "1"})
+    except PasswordHashUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
@@ -1,14 +1,32 @@
 from controllers import file_controller
-from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, HTTPException, Header
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
 from typing import Optional, List
-from models.user import User
-from utils.jwt import get_current_user
-from db import SessionLocal
+import re
+from utils.jwt import CurrentUser, get_current_user
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from db import get_async_db, get_db
 from models.file_metadata import FileMetadata
-from utils.azure_blob import download_file_from_azure
-import pandas as pd
-import io
+from services.dataset_store import load_dataframe
+from services.query_engine import (
+    cached_page,
+    run_paged_query,
+    encode_cursor,
+    decode_cursor,
+    open_query_stream,
+    query_fingerprint,
+)
+from services.result_stream import (
+    NDJSON_MEDIA_TYPE,
+    ARROW_STREAM_MEDIA_TYPE,
+    ndjson_chunks,
+    arrow_ipc_chunks,
+)
+from utils.json_response import FastJSONResponse
 
 router = APIRouter()
 
@@ -16,58 +34,145 @@ router = APIRouter()
 @router.delete("/file/permanent/{file_id}")
 def delete_file_permanently(
     file_id: int,
-    user: User = Depends(get_current_user),
+    user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db),
 ):
-    return file_controller.delete_file_permanently(user.id, file_id)
+    return file_controller.delete_file_permanently(user.id, file_id, db=db)
+
+
 class TableQueryRequest(BaseModel):
     file_ids: Optional[List[int]] = None  # For joins
     file_id: Optional[int] = None  # For single file
     sql: str
+    page_size: int = Field(100, ge=1, le=1000)
+    cursor: Optional[str] = None  # next_cursor from the previous page
+    format: Optional[str] = None  # "json" (default), "ndjson" or "arrow"
 
 
-@router.post("/table/query")
-def table_query(req: TableQueryRequest, user: User = Depends(get_current_user)):
-    db = SessionLocal()
-    dfs = {}
-    # Support both single and multi-file (for joins)
-    file_ids = req.file_ids or ([req.file_id] if req.file_id else [])
-    if not file_ids:
-        raise HTTPException(status_code=400, detail="No file_id(s) provided.")
+STREAM_FORMATS = {
+    "ndjson": (NDJSON_MEDIA_TYPE, ndjson_chunks),
+    "arrow": (ARROW_STREAM_MEDIA_TYPE, arrow_ipc_chunks),
+}
 
-    for idx, fid in enumerate(file_ids):
-        file_meta = (
-            db.query(FileMetadata)
-            .filter(FileMetadata.id == fid, FileMetadata.user_id == user.id)
-            .first()
-        )
-        if not file_meta:
-            db.close()
-            raise HTTPException(status_code=404, detail=f"File {fid} not found")
-        file_bytes = download_file_from_azure(file_meta.bucket_path)
-        if file_meta.file_name.lower().endswith(".csv"):
-            df = pd.read_csv(io.BytesIO(file_bytes))
-        elif file_meta.file_name.lower().endswith((".xls", ".xlsx")):
-            df = pd.read_excel(io.BytesIO(file_bytes))
-        else:
-            db.close()
+
+def _negotiate_format(requested, accept):
+    if requested:
+        if requested != "json" and requested not in STREAM_FORMATS:
+            raise HTTPException(status_code=400, detail=f"Unknown format: {requested}")
+        return requested
+    accept = accept or ""
+    if ARROW_STREAM_MEDIA_TYPE in accept:
+        return "arrow"
+    if NDJSON_MEDIA_TYPE in accept:
+        return "ndjson"
+    return "json"
+
+
+def _mentions(sql, table_name):
+    # Sheets are only loaded when the query refers to them
+    return re.search(rf"\b{re.escape(table_name)}\b", sql, re.IGNORECASE) is not None
+
+
+def _load_tables(file_metas, sql):
+    # Blocking (blob cache, Parquet/Excel parsing): runs on the threadpool
+    dfs = {}
+    for idx, file_meta in enumerate(file_metas):
+        try:
+            dfs[f"df{idx+1}"] = load_dataframe(file_meta)
+            # Every Excel sheet is a table of its own: df1_Sheet2 (or df_Sheet2)
+            prefixes = [f"df{idx+1}"] + (["df"] if len(file_metas) == 1 else [])
+            for sheet_name, sheet in (file_meta.sheets or {}).items():
+                names = [f"{prefix}_{sheet['alias']}" for prefix in prefixes]
+                if any(_mentions(sql, name) for name in names):
+                    sheet_df = load_dataframe(file_meta, sheet_name)
+                    for name in names:
+                        dfs[name] = sheet_df
+        except ValueError:
             raise HTTPException(status_code=400, detail="Unsupported file type")
-        dfs[f"df{idx+1}"] = df
-    db.close()
+    return dfs
 
-    # Use pandasql to run the SQL
-    import pandasql
 
+def _execute(sql, dfs, single_file, result_format, page_size, offset, fingerprint):
+    """Returns a StreamingResponse for streamed formats, else (page_df, has_more)."""
     try:
         # If only one file, allow 'df' as alias for convenience
-        if len(dfs) == 1:
-            dfs["df"] = list(dfs.values())[0]
+        if single_file:
+            dfs["df"] = dfs["df1"]
             # Safety net: replace 'your_table' with 'df' in SQL
-            if req.sql:
-                req.sql = req.sql.replace("your_table", "df")
-        result = pandasql.sqldf(req.sql, dfs)
+            if sql:
+                sql = sql.replace("your_table", "df")
+        if result_format in STREAM_FORMATS:
+            # Streamed formats return the whole result, batch by batch
+            reader, close = open_query_stream(sql, dfs, offset)
+            media_type, chunks = STREAM_FORMATS[result_format]
+            return StreamingResponse(chunks(reader, close), media_type=media_type)
+        # Every page is sliced from one result materialized per fingerprint
+        return run_paged_query(sql, dfs, page_size, offset, fingerprint)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"SQL error: {str(e)}")
 
-    # Limit to 100 rows for safety
-    result = result.head(100)
-    return {"columns": list(result.columns), "rows": result.to_dict(orient="records")}
+
+@router.post("/table/query")
+async def table_query(
+    req: TableQueryRequest,
+    accept: Optional[str] = Header(None),
+    user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    result_format = _negotiate_format(req.format, accept)
+    # Support both single and multi-file (for joins)
+    file_ids = req.file_ids or ([req.file_id] if req.file_id else [])
+    if not file_ids:
+        raise HTTPException(status_code=400, detail="No file_id(s) provided.")
+    offset = 0
+    if req.cursor:
+        try:
+            offset = decode_cursor(req.cursor, req.sql, file_ids)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    rows = await db.execute(
+        select(FileMetadata).where(
+            FileMetadata.id.in_(file_ids), FileMetadata.user_id == user.id
+        )
+    )
+    by_id = {f.id: f for f in rows.scalars()}
+    # Release the connection before the (possibly long) query runs
+    await db.close()
+    for fid in file_ids:
+        if fid not in by_id:
+            raise HTTPException(status_code=404, detail=f"File {fid} not found")
+
+    fingerprint = query_fingerprint(req.sql, file_ids)
+    page = None
+    if result_format == "json":
+        page = cached_page(fingerprint, req.page_size, offset)
+    if page is None:
+        dfs = await run_in_threadpool(
+            _load_tables, [by_id[fid] for fid in file_ids], req.sql
+        )
+        page = await run_in_threadpool(
+            _execute,
+            req.sql,
+            dfs,
+            len(file_ids) == 1,
+            result_format,
+            req.page_size,
+            offset,
+            fingerprint,
+        )
+        if isinstance(page, StreamingResponse):
+            return page
+    result, has_more = page
+
+    next_cursor = (
+        encode_cursor(req.sql, file_ids, offset + req.page_size) if has_more else None
+    )
+    # Rendered straight by orjson: NaN becomes null, no per-value encoder pass
+    return FastJSONResponse(
+        {
+            "columns": list(result.columns),
+            "rows": result.to_dict(orient="records"),
+            "next_cursor": next_cursor,
+        }
+    )
@@ -0,0 +1,99 @@
+"""Drive GeminiClient against a local fake model to check key-pool behaviour.
+
+No network or API keys needed. Each fake key answers after ``--latency``
+seconds; ``--dead-keys`` of them always fail (tripping their circuit
+breakers) and ``--quota`` caps how many requests any key serves before it
+answers 429. ``--requests`` concurrent asks run on one event loop:
+
+    python scripts/bench_ai_client.py --keys 4 --dead-keys 1 --quota 40 --requests 200
+
+The script prints latency percentiles, how many asks got AIUnavailable, and
+the per-key stats the client reports at GET /ops/ai/key-stats.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from google.api_core import exceptions as google_exceptions
+
+from services.gemini_client import AIUnavailable, GeminiClient
+
+
+class FakeModel:
+    def __init__(self, api_key, latency, quota, dead):
+        self.api_key = api_key
+        self.latency = latency
+        self.quota = quota
+        self.dead = dead
+        self.served = 0
+
+    async def generate(self, prompt, timeout):
+        await asyncio.sleep(self.latency)
+        if self.dead:
+            raise google_exceptions.ServiceUnavailable("fake outage")
+        if self.quota is not None and self.served >= self.quota:
+            raise google_exceptions.ResourceExhausted("fake quota exceeded")
+        self.served += 1
+        return f"answer from {self.api_key}"
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def run(args):
+    keys = [f"fake-key-{n}" for n in range(args.keys)]
+    dead = set(keys[: args.dead_keys])
+    client = GeminiClient(
+        keys,
+        model_factory=lambda key: FakeModel(key, args.latency, args.quota, key in dead),
+        max_concurrency=args.concurrency,
+        cooldown=args.cooldown,
+    )
+
+    latencies = []
+    unavailable = 0
+
+    async def ask(n):
+        nonlocal unavailable
+        started = time.perf_counter()
+        try:
+            await client.generate(f"question {n}")
+        except AIUnavailable:
+            unavailable += 1
+            return
+        latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(ask(n) for n in range(args.requests)))
+    elapsed = time.perf_counter() - started
+
+    print(f"{args.requests} asks in {elapsed:.2f}s over {args.keys} keys ({len(dead)} dead)")
+    if latencies:
+        print(
+            f"  answered {len(latencies)}: p50 {percentile(latencies, 50) * 1000:.0f} ms"
+            f"  p99 {percentile(latencies, 99) * 1000:.0f} ms"
+        )
+    print(f"  AIUnavailable: {unavailable}")
+    for key_stats in client.stats():
+        print(f"  {key_stats}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--keys", type=int, default=4)
+    parser.add_argument("--dead-keys", type=int, default=1)
+    parser.add_argument("--quota", type=int, default=None, help="requests per key before 429")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--concurrency", type=int, default=4, help="in-flight requests per key")
+    parser.add_argument("--cooldown", type=float, default=30)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Measure login latency under a login storm while other API traffic runs.
+
+Run against a live server with an existing account:
+
+    python scripts/bench_login.py --url http://localhost:8000 \
+        --email user@example.com --password secret --logins 32 --duration 20
+
+``--logins`` threads hammer POST /login while ``--background`` threads call
+an authenticated read endpoint (GET /chats). The script reports
+p50/p99 for both, plus how many logins were shed with 429.
+"""
+import argparse
+import statistics
+import threading
+import time
+
+import requests
+
+
+def percentile(samples, pct):
+    if not samples:
+        return float("nan")
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def worker(fn, stop, latencies, statuses, lock):
+    session = requests.Session()
+    while not stop.is_set():
+        started = time.perf_counter()
+        try:
+            status = fn(session)
+        except requests.RequestException:
+            status = "error"
+        elapsed = time.perf_counter() - started
+        with lock:
+            statuses[status] = statuses.get(status, 0) + 1
+            if status == 200:
+                latencies.append(elapsed)
+
+
+def report(name, latencies, statuses, duration):
+    print(f"{name}: {sum(statuses.values()) / duration:.1f} req/s, statuses {statuses}")
+    if latencies:
+        print(
+            f"  p50 {percentile(latencies, 50) * 1000:.0f} ms"
+            f"  p99 {percentile(latencies, 99) * 1000:.0f} ms"
+            f"  mean {statistics.mean(latencies) * 1000:.0f} ms"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--logins", type=int, default=32)
+    parser.add_argument("--background", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=20)
+    args = parser.parse_args()
+
+    credentials = {"email": args.email, "password": args.password}
+    token = requests.post(f"{args.url}/login", json=credentials).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    def login(session):
+        return session.post(f"{args.url}/login", json=credentials).status_code
+
+    def read(session):
+        return session.get(f"{args.url}/chats", headers=headers).status_code
+
+    stop = threading.Event()
+    lock = threading.Lock()
+    results = {"login": ([], {}), "background": ([], {})}
+    threads = [
+        threading.Thread(target=worker, args=(login, stop, *results["login"], lock))
+        for _ in range(args.logins)
+    ] + [
+        threading.Thread(target=worker, args=(read, stop, *results["background"], lock))
+        for _ in range(args.background)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    for name, (latencies, statuses) in results.items():
+        report(name, latencies, statuses, args.duration)
+
+
+if __name__ == "__main__":
+    main()
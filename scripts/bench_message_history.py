@@ -0,0 +1,158 @@
+"""Compare full-history loads with keyset pages on one very long chat.
+
+Seeds a throwaway user and chat with ``--messages`` rows in the database
+configured by DATABASE_URL / ASYNC_DATABASE_URL (run ``alembic upgrade head``
+first), then times chat_controller.get_messages:
+
+    python scripts/bench_message_history.py --messages 100000 --page 50
+
+Reported cases: the whole history, the newest page, a page from the middle
+reached with a ``before`` cursor, and the same middle page fetched with
+LIMIT/OFFSET for contrast. The seeded rows are deleted afterwards unless
+``--keep`` is given.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sqlalchemy import delete, insert, select
+
+from controllers import chat_controller
+from controllers.chat_controller import _encode_message_cursor
+from db import AsyncSessionLocal, async_engine
+from models.chat import Chat
+from models.message import Message
+from models.user import User
+
+SEED_BATCH = 5000
+
+
+async def seed(num_messages):
+    async with AsyncSessionLocal() as db:
+        user = User(name="bench", email=f"bench-{uuid.uuid4()}@example.com", password="x")
+        db.add(user)
+        await db.flush()
+        chat = Chat(user_id=user.id, title="bench")
+        db.add(chat)
+        await db.flush()
+        # Explicit, strictly increasing timestamps, two messages per second
+        start = datetime.now(timezone.utc) - timedelta(seconds=num_messages)
+        for offset in range(0, num_messages, SEED_BATCH):
+            await db.execute(
+                insert(Message),
+                [
+                    {
+                        "chat_id": chat.id,
+                        "sender": "user" if n % 2 == 0 else "bot",
+                        "text": f"message {n}",
+                        "created_at": start + timedelta(seconds=n // 2),
+                    }
+                    for n in range(offset, min(offset + SEED_BATCH, num_messages))
+                ],
+            )
+        await db.commit()
+        return user.id, chat.id
+
+
+async def cleanup(user_id, chat_id):
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(Message).where(Message.chat_id == chat_id))
+        await db.execute(delete(Chat).where(Chat.id == chat_id))
+        await db.execute(delete(User).where(User.id == user_id))
+        await db.commit()
+
+
+async def timed(fn, repeats):
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        rows = await fn()
+        samples.append(time.perf_counter() - started)
+    return samples, rows
+
+
+def report(name, samples, rows):
+    print(
+        f"{name:<28} {len(rows):>7} rows"
+        f"  median {statistics.median(samples) * 1000:8.1f} ms"
+        f"  max {max(samples) * 1000:8.1f} ms"
+    )
+
+
+async def run(args):
+    user_id, chat_id = await seed(args.messages)
+    try:
+        async with AsyncSessionLocal() as db:
+            middle = (
+                await db.execute(
+                    select(Message.id, Message.created_at)
+                    .where(Message.chat_id == chat_id)
+                    .order_by(Message.created_at, Message.id)
+                    .offset(args.messages // 2)
+                    .limit(1)
+                )
+            ).one()
+        middle_cursor = _encode_message_cursor(middle.created_at, middle.id)
+
+        async def full_history():
+            async with AsyncSessionLocal() as db:
+                return (await chat_controller.get_messages(user_id, chat_id, db=db))[0]
+
+        async def newest_page():
+            async with AsyncSessionLocal() as db:
+                return (
+                    await chat_controller.get_messages(user_id, chat_id, args.page, db=db)
+                )[0]
+
+        async def keyset_middle_page():
+            async with AsyncSessionLocal() as db:
+                return (
+                    await chat_controller.get_messages(
+                        user_id, chat_id, args.page, before=middle_cursor, db=db
+                    )
+                )[0]
+
+        async def offset_middle_page():
+            async with AsyncSessionLocal() as db:
+                return (
+                    await db.execute(
+                        select(Message.id, Message.sender, Message.text, Message.created_at)
+                        .where(Message.chat_id == chat_id)
+                        .order_by(Message.created_at.desc(), Message.id.desc())
+                        .offset(args.messages // 2)
+                        .limit(args.page)
+                    )
+                ).all()
+
+        print(f"{args.messages} messages in one chat, page size {args.page}")
+        for name, fn in [
+            ("full history", full_history),
+            ("newest page", newest_page),
+            ("middle page (before cursor)", keyset_middle_page),
+            ("middle page (OFFSET)", offset_middle_page),
+        ]:
+            samples, rows = await timed(fn, args.repeats)
+            report(name, samples, rows)
+    finally:
+        if not args.keep:
+            await cleanup(user_id, chat_id)
+        await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=100_000)
+    parser.add_argument("--page", type=int, default=50)
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--keep", action="store_true")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
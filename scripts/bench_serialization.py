@@ -0,0 +1,104 @@
+"""Compare JSON rendering and response compression on the API's largest payloads.
+
+Builds payloads shaped like /table/query rows, uploaded dashboard records,
+chat message lists and file summary_stats, then times FastAPI's default
+path (jsonable_encoder + JSONResponse) against FastJSONResponse, and the
+size/CPU cost of each available Content-Encoding.
+
+    python scripts/bench_serialization.py [--rows 100000] [--repeat 3]
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import numpy as np
+import pandas as pd
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from services.profiler import profile_dataframe
+from utils.compression import ENCODINGS
+from utils.json_response import FastJSONResponse
+
+
+def build_payloads(rows):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(
+        {
+            "order_id": np.arange(rows),
+            "region": rng.choice(["North", "South", "East", "West"], rows),
+            "product": rng.choice([f"SKU-{i:04d}" for i in range(500)], rows),
+            "quantity": rng.integers(1, 50, rows),
+            "unit_price": rng.random(rows) * 100,
+            "discount": np.where(rng.random(rows) < 0.1, np.nan, rng.random(rows)),
+        }
+    )
+    records = df.to_dict(orient="records")
+    start = datetime(2024, 1, 1)
+    messages = [
+        {
+            "id": i,
+            "chat_id": 1,
+            "sender": "user" if i % 2 else "ai",
+            "content": "Show total quantity by region for the last quarter " * 4,
+            "created_at": start + timedelta(seconds=i),
+        }
+        for i in range(rows // 10)
+    ]
+    return {
+        "table_query": {"columns": list(df.columns), "rows": records, "next_cursor": None},
+        "dashboard_records": records,
+        "messages": messages,
+        "summary_stats": profile_dataframe(df),
+    }
+
+
+def _clean(payload):
+    # The default JSONResponse refuses NaN, so it is only timed on cleaned data
+    return jsonable_encoder(payload, custom_encoder={float: lambda v: None if v != v else v})
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for name, payload in build_payloads(args.rows).items():
+        default_s, default_body = best_of(
+            lambda: JSONResponse(_clean(payload)).body, args.repeat
+        )
+        fast_s, fast_body = best_of(lambda: FastJSONResponse(payload).body, args.repeat)
+        print(f"\n{name}: {len(fast_body) / 1e6:.2f} MB of JSON")
+        print(f"  default encoder+render {default_s * 1000:9.1f} ms")
+        print(
+            f"  FastJSONResponse       {fast_s * 1000:9.1f} ms"
+            f"  ({default_s / fast_s:.1f}x, {len(default_body) / 1e6:.2f} MB before)"
+        )
+        for encoding, stream_cls in ENCODINGS.items():
+
+            def compress():
+                stream = stream_cls()
+                return stream.compress(fast_body) + stream.finish()
+
+            seconds, compressed = best_of(compress, args.repeat)
+            print(
+                f"  {encoding:<5} {len(compressed) / 1e6:9.2f} MB"
+                f"  ({len(fast_body) / len(compressed):.1f}x smaller, {seconds * 1000:.1f} ms)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+"""EXPLAIN ANALYZE the controllers' per-user listing queries on a seeded database.
+
+Seeds throwaway users with chats, messages, files and dashboards in the
+Postgres database configured by DATABASE_URL / ASYNC_DATABASE_URL (run
+``alembic upgrade head`` first), runs the real controller calls while
+recording the SQL they send, then explains each recorded query twice: once
+with the lookup indexes dropped inside a rolled-back transaction, once as
+deployed.
+
+    python scripts/explain_hot_queries.py --users 2000 --chats 10 --messages 20
+
+Use a development database: the indexes are only dropped inside the
+explaining transaction, but that holds an exclusive lock on each table until
+it rolls back. Seeded rows are deleted afterwards unless ``--keep`` is given.
+"""
+import argparse
+import asyncio
+import os
+import random
+import re
+import sys
+import uuid
+from datetime import datetime, timedelta, timezone
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sqlalchemy import delete, event, insert, select
+
+from controllers import chat_controller, dashboard_controller
+from db import AsyncSessionLocal, SessionLocal, async_engine, engine
+from models.chat import Chat
+from models.dashboard import Dashboard
+from models.file_metadata import FileMetadata
+from models.message import Message
+from models.user import User
+
+# Dropped for the "without" plans; see the migrations that add them
+LOOKUP_INDEXES = [
+    "ix_chats_user_id_created_at_active",
+    "ix_chats_user_id_created_at_deleted",
+    "ix_file_metadata_chat_id_uploaded_at",
+    "ix_messages_chat_id_created_at_id",
+    "ix_dashboards_user_id_created_at_id",
+]
+SEED_BATCH = 5000
+
+
+def _batched_insert(db, model, rows):
+    for start in range(0, len(rows), SEED_BATCH):
+        db.execute(insert(model), rows[start : start + SEED_BATCH])
+
+
+def seed(args, email_prefix):
+    rng = random.Random(0)
+    now = datetime.now(timezone.utc)
+
+    def when():
+        return now - timedelta(seconds=rng.randrange(365 * 24 * 3600))
+
+    with SessionLocal() as db:
+        _batched_insert(
+            db,
+            User,
+            [
+                {"name": "explain", "email": f"{email_prefix}{n}@example.com", "password": "x"}
+                for n in range(args.users)
+            ],
+        )
+        user_ids = db.scalars(
+            select(User.id).where(User.email.like(f"{email_prefix}%")).order_by(User.id)
+        ).all()
+        _batched_insert(
+            db,
+            Chat,
+            [
+                {
+                    "user_id": user_id,
+                    "title": "chat",
+                    # Roughly one chat in five sits in the recycle bin
+                    "is_active": 0 if rng.random() < 0.2 else 1,
+                    "created_at": when(),
+                }
+                for user_id in user_ids
+                for _ in range(args.chats)
+            ],
+        )
+        chats = db.execute(
+            select(Chat.id, Chat.user_id).where(Chat.user_id.in_(user_ids))
+        ).all()
+        _batched_insert(
+            db,
+            Message,
+            [
+                {
+                    "chat_id": chat.id,
+                    "sender": "user" if n % 2 == 0 else "bot",
+                    "text": f"message {n}",
+                    "created_at": when(),
+                }
+                for chat in chats
+                for n in range(args.messages)
+            ],
+        )
+        _batched_insert(
+            db,
+            FileMetadata,
+            [
+                {
+                    "chat_id": chat.id,
+                    "user_id": chat.user_id,
+                    "file_name": f"file{n}.csv",
+                    "file_size": 1024,
+                    "file_type": "text/csv",
+                    "uploaded_at": when(),
+                }
+                for chat in chats
+                for n in range(args.files)
+            ],
+        )
+        _batched_insert(
+            db,
+            Dashboard,
+            [
+                {
+                    "user_id": user_id,
+                    "dashboard_name": f"dashboard {n}",
+                    "dashboard_json": [],
+                    "created_at": when(),
+                }
+                for user_id in user_ids
+                for n in range(args.dashboards)
+            ],
+        )
+        db.commit()
+    with engine.connect() as conn:
+        # Fresh statistics, so the planner sees the seeded distribution
+        for table in ("users", "chats", "messages", "file_metadata", "dashboards"):
+            conn.exec_driver_sql(f"ANALYZE {table}")
+        conn.commit()
+    return user_ids
+
+
+def cleanup(email_prefix):
+    with SessionLocal() as db:
+        user_ids = select(User.id).where(User.email.like(f"{email_prefix}%"))
+        chat_ids = select(Chat.id).where(Chat.user_id.in_(user_ids))
+        db.execute(delete(Message).where(Message.chat_id.in_(chat_ids)))
+        db.execute(delete(FileMetadata).where(FileMetadata.user_id.in_(user_ids)))
+        db.execute(delete(Chat).where(Chat.user_id.in_(user_ids)))
+        db.execute(delete(Dashboard).where(Dashboard.user_id.in_(user_ids)))
+        db.execute(delete(User).where(User.id.in_(user_ids)))
+        db.commit()
+
+
+class QueryRecorder:
+    """Collects the SELECTs sent through an engine while ``recording`` is set."""
+
+    def __init__(self, *engines):
+        self.recording = False
+        self.queries = []
+        for sync_engine in engines:
+            event.listen(sync_engine, "before_cursor_execute", self._record)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        if self.recording and statement.lstrip().upper().startswith("SELECT"):
+            self.queries.append((conn.engine, statement, parameters))
+
+    async def last_select(self, call):
+        self.queries = []
+        self.recording = True
+        try:
+            result = call()
+            if asyncio.iscoroutine(result):
+                await result
+        finally:
+            self.recording = False
+        # The listing query is the controller's last one, after ownership checks
+        return self.queries[-1]
+
+
+def _explain_sync(statement, parameters, drop_indexes):
+    with engine.connect() as conn:
+        try:
+            if drop_indexes:
+                for index in LOOKUP_INDEXES:
+                    conn.exec_driver_sql(f"DROP INDEX IF EXISTS {index}")
+            return [
+                row[0]
+                for row in conn.exec_driver_sql(
+                    "EXPLAIN (ANALYZE, BUFFERS) " + statement, parameters
+                )
+            ]
+        finally:
+            conn.rollback()
+
+
+async def _explain_async(statement, parameters, drop_indexes):
+    async with async_engine.connect() as conn:
+        try:
+            if drop_indexes:
+                for index in LOOKUP_INDEXES:
+                    await conn.exec_driver_sql(f"DROP INDEX IF EXISTS {index}")
+            result = await conn.exec_driver_sql(
+                "EXPLAIN (ANALYZE, BUFFERS) " + statement, parameters
+            )
+            return [row[0] for row in result]
+        finally:
+            await conn.rollback()
+
+
+async def explain(recorded, drop_indexes):
+    query_engine, statement, parameters = recorded
+    if query_engine is engine:
+        return _explain_sync(statement, parameters, drop_indexes)
+    return await _explain_async(statement, parameters, drop_indexes)
+
+
+def summarize(plan):
+    scans = re.findall(r"(Seq Scan on \w+|Index (?:Only )?Scan(?: Backward)? using \w+)", "\n".join(plan))
+    timing = next((line.strip() for line in plan if line.startswith("Execution Time")), "")
+    return f"{', '.join(dict.fromkeys(scans)) or 'no scans'}; {timing}"
+
+
+async def run(args):
+    if engine.dialect.name != "postgresql":
+        sys.exit("EXPLAIN ANALYZE needs Postgres; point DATABASE_URL at one")
+    email_prefix = f"explain-{uuid.uuid4().hex[:8]}-"
+    print(
+        f"Seeding {args.users} users x {args.chats} chats x {args.messages} messages, "
+        f"{args.files} files per chat, {args.dashboards} dashboards per user"
+    )
+    user_ids = seed(args, email_prefix)
+    try:
+        user_id = user_ids[len(user_ids) // 2]
+        with SessionLocal() as db:
+            chat_id = db.scalars(
+                select(Chat.id).where(Chat.user_id == user_id, Chat.is_active == 1).limit(1)
+            ).first()
+
+        recorder = QueryRecorder(engine, async_engine.sync_engine)
+
+        async def with_session(fn, *call_args):
+            async with AsyncSessionLocal() as db:
+                return await fn(*call_args, db=db)
+
+        cases = [
+            ("list_chats", lambda: with_session(chat_controller.list_chats, user_id)),
+            (
+                "list_deleted_chats",
+                lambda: with_session(chat_controller.list_deleted_chats, user_id),
+            ),
+            (
+                "get_messages (newest page)",
+                lambda: with_session(chat_controller.get_messages, user_id, chat_id, 50),
+            ),
+            (
+                "list_file_metadata",
+                lambda: with_session(chat_controller.list_file_metadata, user_id, chat_id),
+            ),
+            (
+                "list_dashboard_summaries",
+                lambda: dashboard_controller.list_dashboard_summaries(user_id, 50),
+            ),
+        ]
+        for name, call in cases:
+            recorded = await recorder.last_select(call)
+            without = await explain(recorded, drop_indexes=True)
+            with_indexes = await explain(recorded, drop_indexes=False)
+            print(f"\n=== {name}")
+            print(f"  without lookup indexes: {summarize(without)}")
+            print(f"  with lookup indexes:    {summarize(with_indexes)}")
+            if args.verbose:
+                print("\n".join("    " + line for line in with_indexes))
+    finally:
+        if not args.keep:
+            cleanup(email_prefix)
+        await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--chats", type=int, default=10, help="chats per user")
+    parser.add_argument("--messages", type=int, default=20, help="messages per chat")
+    parser.add_argument("--files", type=int, default=2, help="files per chat")
+    parser.add_argument("--dashboards", type=int, default=10, help="dashboards per user")
+    parser.add_argument("--keep", action="store_true")
+    parser.add_argument("--verbose", action="store_true", help="print full plans")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
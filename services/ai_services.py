@@ -1,8 +1,8 @@
 import os
-import random
-import google.generativeai as genai
 import re
 
+from services.gemini_client import GeminiClient
+
 SYSTEM_PROMPT = """
 If you do not receive any metadata, respond as a helpful AI assistant: introduce yourself, explain your capabilities, and answer general questions. If the user asks about data or requests data analysis, politely explain that you need a file to provide data-specific answers. Do not attempt to answer data-specific questions without metadata.
 
@@ -24,6 +24,7 @@ How to Respond
 - If the user explicitly asks for SQL code, provide the SQL in a code block.
 - For general questions about the data, columns, summary statistics, or chart recommendations, answer in plain text and **do not** provide SQL code unless the user requests it.
 - For all SQL queries, always use 'df' as the table name for a single file, and 'df1', 'df2', etc. for multiple files (joins).
+- For Excel workbooks with several sheets, the metadata lists each sheet under "sheets" by its table name (e.g. 'df_Sheet2' or 'df1_Sheet2'); use that name to query a sheet other than the first.
 - **Always use only the exact column names as provided in the metadata for each file (df, df1, df2, etc.). Never guess or invent column names.**
 - Do NOT say "you can run this code" or "would you like to see the result?".
 - If the user’s question is ambiguous, ask for clarification using the metadata context.
@@ -92,119 +93,116 @@ General Guidelines
 GEMINI_API_KEYS = os.getenv("GEMINI_API_KEYS", "")
 if not GEMINI_API_KEYS:
     raise RuntimeError("GEMINI_API_KEYS environment variable is not set!")
-GEMINI_API_KEYS = GEMINI_API_KEYS.split(",")
-
-
-def ask_ai(question, metadata=None):
-    last_exception = None
-    for _ in range(len(GEMINI_API_KEYS)):
-        api_key = random.choice(GEMINI_API_KEYS)
-        try:
-            genai.configure(api_key=api_key)
-            model = genai.GenerativeModel("gemini-2.5-pro")
-            if metadata:
-                prompt = f"{SYSTEM_PROMPT}\n\nMetadata:\n{metadata}\n\nUser question: {question}"
-            else:
-                prompt = f"{SYSTEM_PROMPT}\n\nUser question: {question}"
-            response = model.generate_content(prompt)
-            text = response.text
-
-            # Always extract SQL code block if present, regardless of question wording
-            sql_match = re.search(r"```sql\s*(.*?)```", text, re.DOTALL)
-            sql = sql_match.group(1).strip() if sql_match else None
-
-            # Always remove SQL code block from the answer text
-            text = re.sub(r"```sql.*?```", "", text, flags=re.DOTALL).strip()
-
-            # If SQL is present and the answer is empty or just repeats the question, provide a professional description
-            if sql:
-                blank_or_unhelpful = not text or text.strip().lower() in [
-                    question.strip().lower(),
-                    "here is the sql query to join the two tables and display the combined data.",
-                    "of course.",
-                    "",
-                ]
-                if blank_or_unhelpful:
-                    sql_lower = sql.lower()
-                    # Try to extract filter from WHERE clause
-                    where_match = re.search(
-                        r"where (.+?)(?: group by| order by| limit|$)",
-                        sql_lower,
-                        re.IGNORECASE,
+GEMINI_API_KEYS = [key.strip() for key in GEMINI_API_KEYS.split(",") if key.strip()]
+
+gemini_client = GeminiClient(GEMINI_API_KEYS)
+
+
+def build_prompt(question, metadata=None):
+    if metadata:
+        return f"{SYSTEM_PROMPT}\n\nMetadata:\n{metadata}\n\nUser question: {question}"
+    return f"{SYSTEM_PROMPT}\n\nUser question: {question}"
+
+
+def parse_answer(text, question):
+    """Split a model reply into ``{"answer", "sql"}``."""
+    # Always extract SQL code block if present, regardless of question wording
+    sql_match = re.search(r"```sql\s*(.*?)```", text, re.DOTALL)
+    sql = sql_match.group(1).strip() if sql_match else None
+
+    # Always remove SQL code block from the answer text
+    text = re.sub(r"```sql.*?```", "", text, flags=re.DOTALL).strip()
+
+    # If SQL is present and the answer is empty or just repeats the question, provide a professional description
+    if sql:
+        blank_or_unhelpful = not text or text.strip().lower() in [
+            question.strip().lower(),
+            "here is the sql query to join the two tables and display the combined data.",
+            "of course.",
+            "",
+        ]
+        if blank_or_unhelpful:
+            sql_lower = sql.lower()
+            # Try to extract filter from WHERE clause
+            where_match = re.search(
+                r"where (.+?)(?: group by| order by| limit|$)",
+                sql_lower,
+                re.IGNORECASE,
+            )
+            filter_desc = None
+            if where_match:
+                filter_text = where_match.group(1).strip()
+                # Try to make a human-friendly filter description
+                if "like" in filter_text:
+                    # e.g., Name LIKE 'R%'
+                    col, val = re.findall(
+                        r"(\w+) like '([^']+)'", filter_text, re.IGNORECASE
+                    )[0]
+                    filter_desc = (
+                        f"{col} starting with '{val.rstrip('%')}" + "'"
                     )
-                    filter_desc = None
-                    if where_match:
-                        filter_text = where_match.group(1).strip()
-                        # Try to make a human-friendly filter description
-                        if "like" in filter_text:
-                            # e.g., Name LIKE 'R%'
-                            col, val = re.findall(
-                                r"(\w+) like '([^']+)'", filter_text, re.IGNORECASE
-                            )[0]
-                            filter_desc = (
-                                f"{col} starting with '{val.rstrip('%')}" + "'"
-                            )
-                        elif "=" in filter_text:
-                            # e.g., Age = 20
-                            col, val = [s.strip() for s in filter_text.split("=", 1)]
-                            filter_desc = f"{col} equal to {val}"
-                        else:
-                            filter_desc = filter_text
-                    if "join" in sql_lower:
-                        if filter_desc:
-                            text = f"This table combines columns from both tables based on the join and filters for {filter_desc}."
-                        else:
-                            text = "This table combines the relevant columns from both tables based on the Student_ID, so you can see student details alongside their enrollments."
-                    elif "union" in sql_lower:
-                        text = "This table lists all unique student IDs found in both tables."
-                    elif "select" in sql_lower and "from" in sql_lower:
-                        if filter_desc:
-                            text = f"This table displays the selected columns where {filter_desc}."
-                        else:
-                            text = "This table displays the selected columns from your data as requested."
-                    else:
-                        text = "Here is the result based on your request."
-
-            # Final fallback: if answer is still blank, provide a generic but professional description
-            if (not text or not text.strip()) and sql:
-                sql_lower = sql.lower()
-                where_match = re.search(
-                    r"where (.+?)(?: group by| order by| limit|$)",
-                    sql_lower,
-                    re.IGNORECASE,
-                )
-                filter_desc = None
-                if where_match:
-                    filter_text = where_match.group(1).strip()
-                    if "like" in filter_text:
-                        col, val = re.findall(
-                            r"(\w+) like '([^']+)'", filter_text, re.IGNORECASE
-                        )[0]
-                        filter_desc = f"{col} starting with '{val.rstrip('%')}" + "'"
-                    elif "=" in filter_text:
-                        col, val = [s.strip() for s in filter_text.split("=", 1)]
-                        filter_desc = f"{col} equal to {val}"
-                    else:
-                        filter_desc = filter_text
-                if "join" in sql_lower:
-                    if filter_desc:
-                        text = f"This table shows the combined data from both tables, joined on the relevant columns and filtered for {filter_desc}."
-                    else:
-                        text = "This table shows the combined data from both tables, joined on the relevant columns."
-                elif "union" in sql_lower:
-                    text = "This table lists all unique values from both tables."
-                elif "select" in sql_lower and "from" in sql_lower:
-                    if filter_desc:
-                        text = f"This table displays the selected columns where {filter_desc}."
-                    else:
-                        text = (
-                            "This table displays the selected columns from your data."
-                        )
+                elif "=" in filter_text:
+                    # e.g., Age = 20
+                    col, val = [s.strip() for s in filter_text.split("=", 1)]
+                    filter_desc = f"{col} equal to {val}"
                 else:
-                    text = "Here is the result based on your request."
-            return {"answer": text, "sql": sql}
-        except Exception as e:
-            last_exception = e
-            continue
-    # If all keys fail, raise the last exception
-    raise RuntimeError(f"All Gemini API keys failed. Last error: {last_exception}")
+                    filter_desc = filter_text
+            if "join" in sql_lower:
+                if filter_desc:
+                    text = f"This table combines columns from both tables based on the join and filters for {filter_desc}."
+                else:
+                    text = "This table combines the relevant columns from both tables based on the Student_ID, so you can see student details alongside their enrollments."
+            elif "union" in sql_lower:
+                text = "This table lists all unique student IDs found in both tables."
+            elif "select" in sql_lower and "from" in sql_lower:
+                if filter_desc:
+                    text = f"This table displays the selected columns where {filter_desc}."
+                else:
+                    text = "This table displays the selected columns from your data as requested."
+            else:
+                text = "Here is the result based on your request."
+
+    # Final fallback: if answer is still blank, provide a generic but professional description
+    if (not text or not text.strip()) and sql:
+        sql_lower = sql.lower()
+        where_match = re.search(
+            r"where (.+?)(?: group by| order by| limit|$)",
+            sql_lower,
+            re.IGNORECASE,
+        )
+        filter_desc = None
+        if where_match:
+            filter_text = where_match.group(1).strip()
+            if "like" in filter_text:
+                col, val = re.findall(
+                    r"(\w+) like '([^']+)'", filter_text, re.IGNORECASE
+                )[0]
+                filter_desc = f"{col} starting with '{val.rstrip('%')}" + "'"
+            elif "=" in filter_text:
+                col, val = [s.strip() for s in filter_text.split("=", 1)]
+                filter_desc = f"{col} equal to {val}"
+            else:
+                filter_desc = filter_text
+        if "join" in sql_lower:
+            if filter_desc:
+                text = f"This table shows the combined data from both tables, joined on the relevant columns and filtered for {filter_desc}."
+            else:
+                text = "This table shows the combined data from both tables, joined on the relevant columns."
+        elif "union" in sql_lower:
+            text = "This table lists all unique values from both tables."
+        elif "select" in sql_lower and "from" in sql_lower:
+            if filter_desc:
+                text = f"This table displays the selected columns where {filter_desc}."
+            else:
+                text = (
+                    "This table displays the selected columns from your data."
+                )
+        else:
+            text = "Here is the result based on your request."
+    return {"answer": text, "sql": sql}
+
+
+async def ask_ai(question, metadata=None):
+    """Ask Gemini through the shared key pool; AIUnavailable when no key can serve it."""
+    text = await gemini_client.generate(build_prompt(question, metadata))
+    return parse_answer(text, question)
@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+
+from services.profiler import clean_nans
+from services.query_engine import quote_identifier, run_query
+
+AGGREGATIONS = {
+    "count": "COUNT({y})",
+    "sum": "SUM({y})",
+    "avg": "AVG({y})",
+    "min": "MIN({y})",
+    "max": "MAX({y})",
+    "median": "MEDIAN({y})",
+}
+TIME_BUCKETS = ("second", "minute", "hour", "day", "week", "month", "quarter", "year")
+
+
+def lttb(x, y, threshold):
+    """Largest-Triangle-Three-Buckets: indices of ``threshold`` points that keep the line's shape."""
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    keep = np.empty(threshold, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    # threshold - 2 buckets between the fixed first and last points
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start, next_end = (edges[i + 1], edges[i + 2]) if i + 2 < len(edges) else (n - 1, n)
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(area))
+        keep[i + 1] = a
+    return keep
+
+
+def _x_kind(series):
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return "temporal"
+    if pd.api.types.is_numeric_dtype(series):
+        return "numeric"
+    return "categorical"
+
+
+def chart_data(source, x, y=None, agg=None, bins=None, time_bucket=None, max_points=1000):
+    """Aggregate ``source`` (DataFrame or Parquet path) into at most ``max_points`` chart points.
+
+    With ``agg`` the rows are grouped by ``x`` (optionally into ``bins`` equal-width
+    numeric bins or a ``time_bucket``); without it the raw (x, y) pairs are used.
+    Ordered x axes are downsampled with LTTB; categorical ones keep the top groups.
+    """
+    if time_bucket and time_bucket not in TIME_BUCKETS:
+        raise ValueError(f"time_bucket must be one of {', '.join(TIME_BUCKETS)}")
+    if agg and agg not in AGGREGATIONS:
+        raise ValueError(f"agg must be one of {', '.join(AGGREGATIONS)}")
+    if (bins or time_bucket) and not agg:
+        agg = "count"
+    if not agg and y is None:
+        raise ValueError("y is required without an aggregation")
+
+    qx = f"d.{quote_identifier(x)}"
+    qy = f"d.{quote_identifier(y)}" if y is not None else "*"
+    from_clause = "data AS d"
+    if time_bucket:
+        x_expr = f"date_trunc('{time_bucket}', CAST({qx} AS TIMESTAMP))"
+    elif bins:
+        n = int(bins)
+        x_expr = (
+            f"b.lo + COALESCE(LEAST(FLOOR(({qx} - b.lo) / NULLIF((b.hi - b.lo) / {n}, 0)), {n - 1}), 0)"
+            f" * (b.hi - b.lo) / {n}"
+        )
+        from_clause += f", (SELECT MIN({quote_identifier(x)}) AS lo, MAX({quote_identifier(x)}) AS hi FROM data) AS b"
+    else:
+        x_expr = qx
+
+    if agg:
+        y_expr = AGGREGATIONS[agg].format(y=qy)
+        sql = (
+            f"SELECT {x_expr} AS x, {y_expr} AS y FROM {from_clause} "
+            f"WHERE {qx} IS NOT NULL GROUP BY 1 ORDER BY 1"
+        )
+    else:
+        sql = (
+            f"SELECT {x_expr} AS x, {qy} AS y FROM {from_clause} "
+            f"WHERE {qx} IS NOT NULL AND {qy} IS NOT NULL ORDER BY 1"
+        )
+    result = run_query(sql, {"data": source})
+
+    x_kind = _x_kind(result["x"])
+    num_groups = len(result)
+    if num_groups > max_points:
+        if x_kind == "categorical":
+            # Bars beyond the largest groups would not be legible anyway
+            result = result.nlargest(max_points, "y") if agg else result.head(max_points)
+        else:
+            xs = result["x"].to_numpy()
+            xs = xs.astype("datetime64[ns]").astype(np.int64) if x_kind == "temporal" else xs
+            keep = lttb(xs.astype("float64"), result["y"].to_numpy(dtype="float64"), max_points)
+            result = result.iloc[keep]
+
+    xs = result["x"]
+    if x_kind == "temporal":
+        xs = xs.map(lambda v: v.isoformat())
+    return {
+        "x": clean_nans(xs.tolist()),
+        "y": clean_nans(result["y"].tolist()),
+        "x_type": x_kind,
+        "num_points": len(result),
+        "num_groups": num_groups,
+        "downsampled": len(result) < num_groups,
+    }
@@ -0,0 +1,24 @@
+from services.dataset_store import write_columnar_copy
+from services.query_engine import quote_identifier, run_query
+from utils.azure_blob import cached_blob_path
+
+
+def store_dashboard_data(df, file_name):
+    """Upload ``df`` as Parquet; returns (data_path, data_columns, data_num_rows)."""
+    data_path = write_columnar_copy(df, file_name)
+    return data_path, [str(c) for c in df.columns], len(df)
+
+
+def read_dashboard_rows(data_path, offset, limit, columns=None):
+    """Read rows ``offset``..``offset + limit`` of the selected ``columns``.
+
+    Only the requested columns and the row groups covering the range are
+    scanned from the (locally cached) Parquet file.
+    """
+    select = ", ".join(quote_identifier(c) for c in columns) if columns else "*"
+    with cached_blob_path(data_path) as path:
+        result = run_query(
+            f"SELECT {select} FROM data LIMIT {int(limit)} OFFSET {int(offset)}",
+            {"data": path},
+        )
+    return list(result.columns), result.to_dict(orient="records")
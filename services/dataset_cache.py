@@ -0,0 +1,67 @@
+import os
+import threading
+from collections import OrderedDict
+
+DATASET_CACHE_MAX_BYTES = int(
+    os.getenv("DATASET_CACHE_MAX_BYTES", str(512 * 1024 * 1024))
+)
+
+
+class DatasetCache:
+    """LRU cache of parsed DataFrames bounded by their in-memory size."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # (file_id, content_hash) -> (df, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, file_id, content_hash):
+        key = (file_id, content_hash)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, file_id, content_hash, df):
+        size = int(df.memory_usage(deep=True).sum())
+        if size > self.max_bytes:
+            return  # Would evict everything else and still not fit
+        key = (file_id, content_hash)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (df, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def invalidate(self, file_id):
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == file_id]:
+                _, size = self._entries.pop(key)
+                self._bytes -= size
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+dataset_cache = DatasetCache(DATASET_CACHE_MAX_BYTES)
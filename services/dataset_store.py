@@ -0,0 +1,137 @@
+import io
+import os
+import re
+import tempfile
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from services.dataset_cache import dataset_cache
+from services.profiler import PROFILE_CHUNK_ROWS
+from utils.azure_blob import upload_file_to_azure, cached_blob_path
+
+
+def sheet_alias(sheet_name):
+    # SQL-safe suffix for a sheet: queries address it as df1_<alias>
+    return re.sub(r"\W+", "_", str(sheet_name)).strip("_") or "sheet"
+
+
+def sheet_aliases(sheet_names):
+    """Map each sheet name to a distinct alias, suffixing _2, _3... on collisions."""
+    aliases = {}
+    taken = set()  # Lower-cased: SQL identifiers are case-insensitive
+    for sheet_name in sheet_names:
+        base = alias = sheet_alias(sheet_name)
+        n = 2
+        while alias.lower() in taken:
+            alias = f"{base}_{n}"
+            n += 1
+        taken.add(alias.lower())
+        aliases[sheet_name] = alias
+    return aliases
+
+
+def read_raw_file(source, file_name, sheet_name=0):
+    # source: a local path or a binary file object
+    if file_name.lower().endswith(".csv"):
+        return pd.read_csv(source)
+    if file_name.lower().endswith((".xls", ".xlsx")):
+        return pd.read_excel(source, sheet_name=sheet_name)
+    raise ValueError("Unsupported file type")
+
+
+def _to_parquet_bytes(df):
+    # Parquet needs string column names and a single type per column
+    df = df.copy()
+    df.columns = [str(c) for c in df.columns]
+    buf = io.BytesIO()
+    try:
+        df.to_parquet(buf, index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        for col in df.columns:
+            if df[col].dtype == object:
+                df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+        buf = io.BytesIO()
+        df.to_parquet(buf, index=False)
+    buf.seek(0)
+    return buf
+
+
+def write_columnar_copy(df, file_name, name_suffix=""):
+    """Store a Parquet copy of ``df`` next to the raw upload and return its path.
+
+    The blob is named after ``file_name`` without its extension, plus
+    ``name_suffix`` (e.g. ``_<sheet alias>``) and ``.parquet``.
+    """
+    base_name = os.path.splitext(file_name)[0]
+    return upload_file_to_azure(
+        _to_parquet_bytes(df), f"{base_name}{name_suffix}.parquet"
+    )
+
+
+def _profiled_schema(columns):
+    # read_csv dtypes and the matching Arrow schema, from profile_csv's column types
+    dtypes = {}
+    fields = []
+    for column in columns:
+        dtype = pd.api.types.pandas_dtype(column["type"])
+        if isinstance(dtype, np.dtype) and dtype.kind in "iufb":
+            fields.append((column["name"], pa.from_numpy_dtype(dtype)))
+        else:
+            # Text or mixed columns are kept as strings
+            dtype = str
+            fields.append((column["name"], pa.string()))
+        dtypes[column["name"]] = dtype
+    return dtypes, pa.schema(fields)
+
+
+def write_columnar_copy_from_csv(csv_path, file_name, columns, chunk_rows=PROFILE_CHUNK_ROWS):
+    """Like write_columnar_copy, but converts a local CSV one chunk at a time.
+
+    ``columns`` is what profile_csv reported for the same file. The CSV is
+    re-read with the same pandas parser and those types, so the Parquet copy
+    has exactly the profiled columns; each chunk becomes one row group.
+    """
+    base_name = os.path.splitext(file_name)[0]
+    dtypes, schema = _profiled_schema(columns)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        parquet_path = os.path.join(tmp_dir, "data.parquet")
+        with pq.ParquetWriter(parquet_path, schema) as writer:
+            for chunk in pd.read_csv(csv_path, chunksize=chunk_rows, dtype=dtypes):
+                writer.write_table(
+                    pa.Table.from_pandas(chunk, schema=schema, preserve_index=False)
+                )
+        with open(parquet_path, "rb") as f:
+            return upload_file_to_azure(f, f"{base_name}.parquet")
+
+
+def cache_key(file_meta):
+    # Rows created before content hashing fall back to their (unique) blob path
+    return file_meta.content_hash or file_meta.columnar_path or file_meta.bucket_path
+
+
+def load_dataframe(file_meta, sheet_name=None):
+    """Load a file (or one Excel sheet) for querying, preferring its columnar copy."""
+    columnar_path = file_meta.columnar_path
+    key = cache_key(file_meta)
+    if sheet_name is not None:
+        columnar_path = (file_meta.sheets or {}).get(sheet_name, {}).get("columnar_path")
+        key = f"{key}:{sheet_name}"
+    df = dataset_cache.get(file_meta.id, key)
+    if df is not None:
+        return df
+    # Blobs are read from the local disk cache; only changed blobs are re-fetched
+    if columnar_path:
+        with cached_blob_path(columnar_path) as path:
+            df = pd.read_parquet(path)
+    else:
+        with cached_blob_path(file_meta.bucket_path) as path:
+            df = read_raw_file(
+                path,
+                file_meta.file_name,
+                sheet_name=0 if sheet_name is None else sheet_name,
+            )
+    dataset_cache.put(file_meta.id, key, df)
+    return df
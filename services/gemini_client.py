@@ -0,0 +1,238 @@
+import asyncio
+import itertools
+import os
+import time
+
+from google.api_core import exceptions as google_exceptions
+
+AI_MODEL_NAME = os.getenv("AI_MODEL_NAME", "gemini-2.5-pro")
+# Generations in flight per API key
+AI_KEY_CONCURRENCY = int(os.getenv("AI_KEY_CONCURRENCY", "4"))
+# Seconds to wait for a free key slot, and for one generation
+AI_QUEUE_TIMEOUT = float(os.getenv("AI_QUEUE_TIMEOUT", "15"))
+AI_REQUEST_TIMEOUT = float(os.getenv("AI_REQUEST_TIMEOUT", "90"))
+# A key that answers 429 / quota exceeded is skipped for this long
+AI_KEY_COOLDOWN = float(os.getenv("AI_KEY_COOLDOWN", "30"))
+# Consecutive failures that open a key's circuit, and how long it stays open
+AI_BREAKER_FAILURES = int(os.getenv("AI_BREAKER_FAILURES", "3"))
+AI_BREAKER_RESET = float(os.getenv("AI_BREAKER_RESET", "60"))
+
+
+class AIUnavailable(Exception):
+    """No key could serve the request; retry after ``retry_after`` seconds."""
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class GeminiModel:
+    """Generates text for one API key through the public async GAPIC client."""
+
+    def __init__(self, api_key, model_name=AI_MODEL_NAME):
+        from google.ai import generativelanguage as glm
+
+        self._glm = glm
+        # One client per key, instead of genai.configure() swapping the process-wide one
+        self._client = glm.GenerativeServiceAsyncClient(
+            client_options={"api_key": api_key}
+        )
+        self._model = f"models/{model_name}"
+
+    async def generate(self, prompt, timeout):
+        glm = self._glm
+        request = glm.GenerateContentRequest(
+            model=self._model,
+            contents=[glm.Content(role="user", parts=[glm.Part(text=prompt)])],
+        )
+        response = await self._client.generate_content(request, timeout=timeout)
+        return _response_text(response)
+
+
+def _response_text(response):
+    # A blocked prompt or answer is a ValueError, not a key failure
+    if not response.candidates:
+        reason = response.prompt_feedback.block_reason.name
+        raise ValueError(f"Gemini returned no answer (prompt blocked: {reason})")
+    candidate = response.candidates[0]
+    if not candidate.content.parts:
+        reason = candidate.finish_reason.name
+        raise ValueError(f"Gemini returned no answer (finish reason: {reason})")
+    return "".join(part.text for part in candidate.content.parts)
+
+
+def _is_rate_limited(exc):
+    return isinstance(
+        exc, (google_exceptions.ResourceExhausted, google_exceptions.TooManyRequests)
+    )
+
+
+def _is_key_failure(exc):
+    # The key or the service is at fault, so another key may succeed
+    if isinstance(exc, google_exceptions.InvalidArgument):
+        return "API key" in str(exc)
+    return isinstance(
+        exc, (google_exceptions.GoogleAPIError, asyncio.TimeoutError, OSError)
+    )
+
+
+class _KeyState:
+    def __init__(self, api_key, max_concurrency):
+        self.api_key = api_key
+        self.slots = asyncio.Semaphore(max_concurrency)
+        self.model = None
+        self.unavailable_until = 0.0
+        self.failures = 0
+        self.probing = False  # Half-open circuit: one trial request in flight
+        self.in_flight = 0
+        self.requests = 0
+        self.errors = 0
+        self.rate_limited = 0
+
+    def state(self, now, breaker_failures):
+        if now < self.unavailable_until:
+            return "cooldown" if self.failures < breaker_failures else "open"
+        if self.failures >= breaker_failures:
+            return "half-open"
+        return "closed"
+
+
+class GeminiClient:
+    """Long-lived async Gemini client over a pool of API keys.
+
+    Keys are tried round-robin, each with at most ``max_concurrency``
+    generations in flight. A key answering 429 cools down for ``cooldown``
+    seconds; ``breaker_failures`` consecutive errors open its circuit for
+    ``breaker_reset`` seconds, after which a single trial request decides
+    whether it closes. ``model_factory(api_key)`` returns an object whose
+    ``await generate(prompt, timeout)`` returns the answer text, so a local
+    fake can stand in for Gemini.
+    """
+
+    def __init__(
+        self,
+        api_keys,
+        model_factory=GeminiModel,
+        max_concurrency=AI_KEY_CONCURRENCY,
+        queue_timeout=AI_QUEUE_TIMEOUT,
+        request_timeout=AI_REQUEST_TIMEOUT,
+        cooldown=AI_KEY_COOLDOWN,
+        breaker_failures=AI_BREAKER_FAILURES,
+        breaker_reset=AI_BREAKER_RESET,
+    ):
+        if not api_keys:
+            raise ValueError("GeminiClient needs at least one API key")
+        self._keys = [_KeyState(api_key, max_concurrency) for api_key in api_keys]
+        self._rotation = itertools.cycle(range(len(self._keys)))
+        self._model_factory = model_factory
+        self.queue_timeout = queue_timeout
+        self.request_timeout = request_timeout
+        self.cooldown = cooldown
+        self.breaker_failures = breaker_failures
+        self.breaker_reset = breaker_reset
+
+    def _usable_keys(self, tried):
+        start = next(self._rotation)
+        now = time.monotonic()
+        ordered = self._keys[start:] + self._keys[:start]
+        return [
+            key
+            for key in ordered
+            if key not in tried and now >= key.unavailable_until and not key.probing
+        ]
+
+    async def _acquire(self, tried):
+        deadline = time.monotonic() + self.queue_timeout
+        while True:
+            keys = self._usable_keys(tried)
+            if not keys:
+                return None
+            # Take the first key with a free slot; queue on the first one otherwise
+            key = next((k for k in keys if not k.slots.locked()), keys[0])
+            try:
+                await asyncio.wait_for(
+                    key.slots.acquire(), max(deadline - time.monotonic(), 0)
+                )
+            except asyncio.TimeoutError:
+                raise AIUnavailable("All AI keys are busy, retry later", retry_after=1)
+            # The key may have cooled down or tripped while this request queued
+            if time.monotonic() < key.unavailable_until or key.probing:
+                key.slots.release()
+                continue
+            if key.failures >= self.breaker_failures:
+                key.probing = True
+            key.in_flight += 1
+            return key
+
+    def _release(self, key):
+        key.in_flight -= 1
+        key.probing = False
+        key.slots.release()
+
+    def _record_failure(self, key, exc):
+        key.errors += 1
+        now = time.monotonic()
+        if _is_rate_limited(exc):
+            # Quota, not health: cool down without counting towards the breaker
+            key.rate_limited += 1
+            key.unavailable_until = now + self.cooldown
+            return
+        key.failures += 1
+        if key.failures >= self.breaker_failures:
+            key.unavailable_until = now + self.breaker_reset
+
+    def _retry_after(self):
+        now = time.monotonic()
+        waits = [key.unavailable_until - now for key in self._keys]
+        return max(1, int(min(waits)) + 1)
+
+    async def generate(self, prompt):
+        """Return the text Gemini generates for ``prompt``, trying each usable key once."""
+        tried = set()
+        last_error = None
+        while True:
+            key = await self._acquire(tried)
+            if key is None:
+                break
+            tried.add(key)
+            key.requests += 1
+            try:
+                if key.model is None:
+                    key.model = self._model_factory(key.api_key)
+                text = await asyncio.wait_for(
+                    key.model.generate(prompt, self.request_timeout),
+                    self.request_timeout,
+                )
+            except Exception as exc:
+                if not _is_key_failure(exc):
+                    # A bad request or a blocked answer: no other key would do better
+                    key.failures = 0
+                    raise
+                self._record_failure(key, exc)
+                last_error = exc
+                continue
+            finally:
+                self._release(key)
+            key.failures = 0
+            return text
+        if last_error is None:
+            raise AIUnavailable(
+                "Every AI key is cooling down, retry later", self._retry_after()
+            )
+        raise AIUnavailable(
+            f"All AI keys failed. Last error: {last_error!r}", self._retry_after()
+        )
+
+    def stats(self):
+        now = time.monotonic()
+        return [
+            {
+                "key": index,
+                "state": key.state(now, self.breaker_failures),
+                "in_flight": key.in_flight,
+                "requests": key.requests,
+                "errors": key.errors,
+                "rate_limited": key.rate_limited,
+            }
+            for index, key in enumerate(self._keys)
+        ]
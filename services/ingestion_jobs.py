@@ -0,0 +1,214 @@
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import requests
+
+from controllers import chat_controller
+from controllers.ingestion_job_controller import update_job
+from services.profiler import profile_csv
+from services.upload_pipeline import (
+    UPLOAD_CHUNK_SIZE,
+    IngestTooLarge,
+    describe_ingested_file,
+    ingest_stream,
+)
+
+# Worker processes for CPU-bound parsing/profiling, and how many jobs may wait
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", str(max((os.cpu_count() or 2) // 2, 1))))
+INGEST_MAX_PENDING = int(os.getenv("INGEST_MAX_PENDING", "32"))
+INGEST_SPOOL_DIR = os.getenv("INGEST_SPOOL_DIR") or tempfile.gettempdir()
+# Largest file accepted from a shared link
+INGEST_MAX_BYTES = int(os.getenv("INGEST_MAX_BYTES", str(2 * 1024**3)))
+
+_executor = None
+_executor_lock = threading.Lock()
+_pending = threading.BoundedSemaphore(INGEST_MAX_PENDING)
+
+
+class IngestQueueFull(Exception):
+    pass
+
+
+class IngestUnavailable(Exception):
+    pass
+
+
+def _get_executor(broken=None):
+    """The shared pool; ``broken`` (a pool that lost a worker) is replaced first."""
+    global _executor
+    with _executor_lock:
+        if broken is not None and _executor is broken:
+            broken.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+        if _executor is None:
+            # spawn: workers must not inherit the parent's DB connections and threads
+            _executor = ProcessPoolExecutor(
+                max_workers=INGEST_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _executor
+
+
+def _submit_to_pool(fn, *args):
+    executor = _get_executor()
+    try:
+        return executor.submit(fn, *args)
+    except BrokenProcessPool:
+        # A worker died (OOM kill, parser crash): start a fresh pool, retry once
+        pass
+    try:
+        return _get_executor(broken=executor).submit(fn, *args)
+    except BrokenProcessPool as exc:
+        raise IngestUnavailable("Ingestion workers are unavailable, retry later") from exc
+
+
+def submit_job(job_id, fn, *args, spool_path=None):
+    """Queue ``fn(job_id, *args)`` on the ingestion pool.
+
+    Raises IngestQueueFull when saturated and IngestUnavailable when the pool
+    cannot be restarted. ``spool_path`` is removed if the worker dies before
+    the job could remove it itself.
+    """
+    if not _pending.acquire(blocking=False):
+        raise IngestQueueFull("Too many ingestion jobs in progress, retry later")
+
+    def on_done(future):
+        _pending.release()
+        exc = future.exception()
+        if exc is not None:
+            # The worker died before it could record the failure itself
+            update_job(job_id, status="failed", error=str(exc) or repr(exc))
+            if spool_path and os.path.exists(spool_path):
+                os.remove(spool_path)
+
+    try:
+        future = _submit_to_pool(fn, job_id, *args)
+    except BaseException:
+        _pending.release()
+        raise
+    future.add_done_callback(on_done)
+
+
+def spool_upload(file_obj, file_name):
+    """Copy an incoming upload to a local file that outlives the request."""
+    suffix = os.path.splitext(file_name)[1]
+    with tempfile.NamedTemporaryFile(
+        dir=INGEST_SPOOL_DIR, suffix=suffix, delete=False
+    ) as spool:
+        shutil.copyfileobj(file_obj, spool)
+    return spool.name
+
+
+def _file_type(file_name):
+    if file_name.lower().endswith(".csv"):
+        return "csv"
+    if file_name.lower().endswith((".xls", ".xlsx")):
+        return "excel"
+    return "unknown"
+
+
+# --- Job bodies: these run inside the worker processes ---
+
+
+def run_upload_job(job_id, local_path, file_name, content_type, user_id, chat_id):
+    try:
+        update_job(job_id, status="running", progress=10)
+        is_csv = _file_type(file_name) == "csv"
+        with open(local_path, "rb") as f:
+            ingest = ingest_stream(f.read, file_name, profile_csv if is_csv else None)
+        ingest.local_path = local_path
+        update_job(job_id, progress=60)
+        metadata = describe_ingested_file(ingest, file_name)
+        update_job(job_id, progress=90)
+        file_meta = chat_controller.add_file_metadata(
+            user_id,
+            chat_id,
+            file_name,
+            ingest.file_size,
+            content_type,
+            columns=metadata["columns"],
+            num_rows=metadata["num_rows"],
+            num_columns=metadata["num_columns"],
+            summary_stats=metadata["summary_stats"],
+            bucket_path=ingest.bucket_path,
+            table_names=metadata["table_names"],
+            sheets=metadata["sheets"],
+            columnar_path=metadata["columnar_path"],
+            content_hash=ingest.content_hash,
+        )
+        update_job(
+            job_id, status="done", progress=100, file_metadata_id=file_meta["id"]
+        )
+    except Exception as e:
+        update_job(job_id, status="failed", error=str(e))
+    finally:
+        os.remove(local_path)
+
+
+def run_link_job(job_id, url, file_name, user_id):
+    try:
+        update_job(job_id, status="running", progress=10)
+        file_type = _file_type(file_name)
+        with requests.get(url, stream=True, timeout=60) as resp:
+            resp.raise_for_status()
+            declared_size = int(resp.headers.get("Content-Length") or 0)
+            if declared_size > INGEST_MAX_BYTES:
+                raise IngestTooLarge(
+                    f"File exceeds the {INGEST_MAX_BYTES} byte ingestion limit"
+                )
+            # Upload to Azure Blob as the bytes arrive, profiling CSVs on the way
+            chunks = resp.iter_content(chunk_size=UPLOAD_CHUNK_SIZE)
+            ingest = ingest_stream(
+                lambda size: next(chunks, b""),
+                file_name,
+                profile_csv if file_type == "csv" else None,
+                local_copy=True,
+                max_bytes=INGEST_MAX_BYTES,
+            )
+        update_job(job_id, progress=60)
+
+        # Try to extract metadata (columns, rows, etc.)
+        metadata = {
+            "columns": [],
+            "num_rows": 0,
+            "num_columns": 0,
+            "summary_stats": None,
+            "table_names": None,
+            "sheets": None,
+            "columnar_path": None,
+        }
+        try:
+            if file_type != "unknown":
+                metadata = describe_ingested_file(ingest, file_name)
+        except Exception:
+            pass  # Metadata extraction is best-effort
+        finally:
+            os.remove(ingest.local_path)
+        update_job(job_id, progress=90)
+
+        file_meta = chat_controller.add_file_metadata(
+            user_id,
+            None,  # Not associated with a chat
+            file_name,
+            ingest.file_size,
+            file_type,
+            columns=metadata["columns"],
+            num_rows=metadata["num_rows"],
+            num_columns=metadata["num_columns"],
+            summary_stats=metadata["summary_stats"] or None,
+            bucket_path=ingest.bucket_path,
+            table_names=metadata["table_names"],
+            sheets=metadata["sheets"],
+            columnar_path=metadata["columnar_path"],
+            content_hash=ingest.content_hash,
+        )
+        update_job(
+            job_id, status="done", progress=100, file_metadata_id=file_meta["id"]
+        )
+    except Exception as e:
+        update_job(job_id, status="failed", error=str(e))
@@ -0,0 +1,221 @@
+import datetime
+import math
+import os
+
+import numpy as np
+import pandas as pd
+
+# Rows parsed per chunk; peak memory is bounded by this, not the file size
+PROFILE_CHUNK_ROWS = int(os.getenv("PROFILE_CHUNK_ROWS", "100000"))
+# Values kept per column to approximate the 25%/50%/75% quantiles
+PROFILE_QUANTILE_SAMPLE = int(os.getenv("PROFILE_QUANTILE_SAMPLE", "10000"))
+# Distinct values tracked per non-numeric column for top/freq, and value hashes
+# kept to estimate its unique count; both are exact below these sizes
+PROFILE_TOP_VALUES = int(os.getenv("PROFILE_TOP_VALUES", "1000"))
+PROFILE_DISTINCT_SAMPLE = int(os.getenv("PROFILE_DISTINCT_SAMPLE", "4096"))
+
+
+def _is_numeric(dtype):
+    return dtype.kind in "iuf"
+
+
+def _promote(current, new):
+    # Mirror what a single pd.read_csv over the whole file would infer
+    if current is None or current == new:
+        return new
+    if _is_numeric(current) and _is_numeric(new):
+        return np.promote_types(current, new)
+    return np.dtype(object)
+
+
+class ColumnStats:
+    """Running count/mean/std/min/max for one column, mergeable across chunks."""
+
+    def __init__(self, seed=0):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        # Bottom-k by random key: a uniform sample that survives merging
+        self._rng = np.random.default_rng(seed)
+        self._sample_keys = np.empty(0)
+        self._sample_values = np.empty(0)
+
+    def update(self, values):
+        values = np.asarray(values, dtype="float64")
+        values = values[~np.isnan(values)]
+        n = len(values)
+        if not n:
+            return
+        chunk_mean = values.mean()
+        chunk_m2 = ((values - chunk_mean) ** 2).sum()
+        self._combine(n, chunk_mean, chunk_m2, values.min(), values.max())
+        self._add_sample(self._rng.random(n), values)
+
+    def merge(self, other):
+        if other.count:
+            self._combine(other.count, other.mean, other.m2, other.min, other.max)
+            self._add_sample(other._sample_keys, other._sample_values)
+
+    def _combine(self, n, mean, m2, lo, hi):
+        # Chan et al. pairwise update of Welford's running moments
+        total = self.count + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta**2 * self.count * n / total
+        self.count = total
+        self.min = min(self.min, lo)
+        self.max = max(self.max, hi)
+
+    def _add_sample(self, keys, values):
+        keys = np.concatenate([self._sample_keys, keys])
+        values = np.concatenate([self._sample_values, values])
+        if len(keys) > PROFILE_QUANTILE_SAMPLE:
+            keep = np.argpartition(keys, PROFILE_QUANTILE_SAMPLE)[:PROFILE_QUANTILE_SAMPLE]
+            keys, values = keys[keep], values[keep]
+        self._sample_keys, self._sample_values = keys, values
+
+    def summary(self):
+        """Same keys as one column of ``DataFrame.describe().to_dict()``."""
+        if not self.count:
+            return None
+        q25, q50, q75 = np.quantile(self._sample_values, [0.25, 0.5, 0.75])
+        return {
+            "count": float(self.count),
+            "mean": float(self.mean),
+            "std": math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else None,
+            "min": float(self.min),
+            "25%": float(q25),
+            "50%": float(q50),
+            "75%": float(q75),
+            "max": float(self.max),
+        }
+
+
+class CategoryStats:
+    """Running count/unique/top/freq for one column, mergeable across chunks.
+
+    ``top``/``freq`` come from the PROFILE_TOP_VALUES most frequent values seen
+    so far, and ``unique`` from the smallest PROFILE_DISTINCT_SAMPLE value
+    hashes (a k-minimum-values estimate), so memory stays bounded on
+    high-cardinality columns.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self._counts = {}  # value -> [count, first seen order]
+        self._seen = 0
+        self._hashes = np.empty(0, dtype="uint64")
+
+    def update(self, series):
+        series = series.dropna()
+        if not len(series):
+            return
+        self.count += len(series)
+        # sort=False keeps first-appearance order, which breaks ties like describe()
+        counts = series.value_counts(sort=False)
+        if len(counts) > PROFILE_TOP_VALUES:
+            keep = np.argsort(-counts.to_numpy(), kind="stable")[:PROFILE_TOP_VALUES]
+            counts = counts.iloc[np.sort(keep)]
+        for value, n in counts.items():
+            entry = self._counts.get(value)
+            if entry is None:
+                self._counts[value] = [n, self._seen]
+                self._seen += 1
+            else:
+                entry[0] += n
+        if len(self._counts) > PROFILE_TOP_VALUES:
+            ranked = sorted(self._counts.items(), key=lambda kv: (-kv[1][0], kv[1][1]))
+            self._counts = dict(ranked[:PROFILE_TOP_VALUES])
+        hashes = pd.util.hash_array(series.to_numpy(dtype=object))
+        # np.unique sorts, so the k smallest distinct hashes are a prefix
+        self._hashes = np.unique(np.concatenate([self._hashes, hashes]))[
+            :PROFILE_DISTINCT_SAMPLE
+        ]
+
+    def unique(self):
+        k = len(self._hashes)
+        if k < PROFILE_DISTINCT_SAMPLE:
+            return k
+        # The k-th smallest of n uniform hashes sits near k / n of the range
+        return int(round((k - 1) * 2.0**64 / float(self._hashes[-1])))
+
+    def summary(self):
+        """Same keys as one non-numeric column of ``DataFrame.describe().to_dict()``."""
+        if not self.count:
+            return None
+        top, (freq, _) = min(self._counts.items(), key=lambda kv: (-kv[1][0], kv[1][1]))
+        return {"count": self.count, "unique": self.unique(), "top": top, "freq": freq}
+
+
+def clean_nans(obj):
+    """Make profile output JSON-native: NumPy scalars become Python values, NaN and NaT None."""
+    if obj is pd.NaT:
+        return None
+    if isinstance(obj, np.generic):
+        obj = obj.item()
+    if isinstance(obj, float) and math.isnan(obj):
+        return None
+    if isinstance(obj, (pd.Timestamp, datetime.datetime, datetime.date)):
+        return obj.isoformat()
+    if isinstance(obj, dict):
+        return {k: clean_nans(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [clean_nans(x) for x in obj]
+    return obj
+
+
+def profile_chunks(chunks):
+    """Build FileMetadata columns/num_rows/num_columns/summary_stats from DataFrame chunks."""
+    columns = None
+    dtypes = {}
+    stats = {}
+    category_stats = {}
+    num_rows = 0
+    for chunk in chunks:
+        if columns is None:
+            columns = [
+                {"name": col, "sample_values": chunk[col].head(3).tolist()}
+                for col in chunk.columns
+            ]
+        num_rows += len(chunk)
+        for col in chunk.columns:
+            dtypes[col] = _promote(dtypes.get(col), chunk[col].dtype)
+            if _is_numeric(chunk[col].dtype):
+                stats.setdefault(col, ColumnStats()).update(chunk[col].to_numpy())
+            if not _is_numeric(dtypes[col]):
+                # Only needed if no column ends up numeric, as in describe()
+                category_stats.setdefault(col, CategoryStats()).update(chunk[col])
+    columns = columns or []
+    for column in columns:
+        column["type"] = str(dtypes[column["name"]])
+    summary_stats = {
+        col: col_stats.summary()
+        for col, col_stats in stats.items()
+        if _is_numeric(dtypes[col]) and col_stats.count
+    }
+    if not summary_stats:
+        # describe() falls back to count/unique/top/freq when nothing is numeric
+        summary_stats = {
+            column["name"]: category_stats[column["name"]].summary()
+            for column in columns
+            if column["name"] in category_stats and category_stats[column["name"]].count
+        }
+    return {
+        "columns": clean_nans(columns),
+        "num_rows": num_rows,
+        "num_columns": len(columns),
+        "summary_stats": clean_nans(summary_stats),
+    }
+
+
+def profile_csv(source, chunk_rows=PROFILE_CHUNK_ROWS):
+    """Profile a CSV path or binary stream without loading it whole."""
+    return profile_chunks(pd.read_csv(source, chunksize=chunk_rows))
+
+
+def profile_dataframe(df, chunk_rows=PROFILE_CHUNK_ROWS):
+    return profile_chunks(
+        df.iloc[start : start + chunk_rows] for start in range(0, max(len(df), 1), chunk_rows)
+    )
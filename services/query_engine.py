@@ -0,0 +1,147 @@
+import base64
+import hashlib
+import json
+import os
+
+import duckdb
+import pyarrow.dataset
+
+from utils.ttl_cache import TTLCache
+
+# DuckDB parallelises scans, aggregates and joins across this many threads
+QUERY_ENGINE_THREADS = int(os.getenv("QUERY_ENGINE_THREADS", os.cpu_count() or 1))
+# Rows per Arrow record batch when streaming results
+STREAM_BATCH_ROWS = int(os.getenv("QUERY_STREAM_BATCH_ROWS", "10000"))
+# Hard cap on rows a streamed result may return
+STREAM_MAX_ROWS = int(os.getenv("QUERY_STREAM_MAX_ROWS", "1000000"))
+# A paged result is materialized once and every page is sliced from it; this
+# many results (and at most this many Arrow bytes) are kept, for this many seconds
+QUERY_RESULT_CACHE_ENTRIES = int(os.getenv("QUERY_RESULT_CACHE_ENTRIES", "16"))
+QUERY_RESULT_CACHE_MAX_BYTES = int(
+    os.getenv("QUERY_RESULT_CACHE_MAX_BYTES", str(256 * 1024 * 1024))
+)
+QUERY_RESULT_CACHE_TTL = float(os.getenv("QUERY_RESULT_CACHE_TTL", "300"))
+# Rows a materialized paged result may hold; deeper reads need a streamed format
+PAGED_MAX_ROWS = int(os.getenv("QUERY_PAGED_MAX_ROWS", "100000"))
+
+result_cache = TTLCache(
+    QUERY_RESULT_CACHE_ENTRIES,
+    QUERY_RESULT_CACHE_TTL,
+    max_bytes=QUERY_RESULT_CACHE_MAX_BYTES,
+    sizeof=lambda table: table.nbytes,
+)
+
+
+def _connect(tables):
+    con = duckdb.connect(database=":memory:")
+    con.execute(f"SET threads TO {QUERY_ENGINE_THREADS}")
+    for name, source in tables.items():
+        if isinstance(source, str):
+            # A local Parquet file, scanned in place through Arrow so the
+            # engine itself never needs file access
+            source = pyarrow.dataset.dataset(source, format="parquet")
+        # DataFrames are scanned in place, no copy into the engine
+        con.register(name, source)
+    # User SQL runs next: no files, extensions, or Python variables besides the
+    # registered tables, and no way to switch any of that back on
+    con.execute("SET python_enable_replacements = false")
+    con.execute("SET enable_external_access = false")
+    con.execute("SET lock_configuration = true")
+    return con
+
+
+def quote_identifier(name):
+    """Quote a column or table name for use in generated SQL."""
+    return '"' + name.replace('"', '""') + '"'
+
+
+def run_query(sql, tables):
+    """Run ``sql`` against ``tables`` ({alias: DataFrame or Parquet path})."""
+    con = _connect(tables)
+    try:
+        return con.execute(sql).df()
+    finally:
+        con.close()
+
+
+def query_fingerprint(sql, file_ids):
+    raw = json.dumps({"sql": sql, "file_ids": list(file_ids)})
+    return hashlib.sha256(raw.encode()).hexdigest()[:16]
+
+
+def encode_cursor(sql, file_ids, offset):
+    payload = {"q": query_fingerprint(sql, file_ids), "o": offset}
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def decode_cursor(cursor, sql, file_ids):
+    """Return the row offset stored in ``cursor``; ValueError if it is not for this query."""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        offset = int(payload["o"])
+    except Exception as exc:
+        raise ValueError("Malformed cursor") from exc
+    if payload.get("q") != query_fingerprint(sql, file_ids) or offset < 0:
+        raise ValueError("Cursor does not belong to this query")
+    return offset
+
+
+def _slice_page(table, limit, offset):
+    page = table.slice(offset, limit).to_pandas()
+    return page, offset + limit < table.num_rows
+
+
+def cached_page(fingerprint, limit, offset):
+    """``(page_df, has_more)`` from a result materialized earlier, or None."""
+    table = result_cache.get(fingerprint)
+    if table is None:
+        return None
+    return _slice_page(table, limit, offset)
+
+
+def run_paged_query(sql, tables, limit, offset=0, fingerprint=None):
+    """Run ``sql`` and return ``(page_df, has_more)``.
+
+    With a ``fingerprint`` the result is materialized once (up to PAGED_MAX_ROWS
+    rows) and cached under it, and every page, the first included, is sliced
+    from that one Arrow table, so pages never overlap or skip rows even when the
+    query has no ORDER BY. Without one, only the requested page is fetched, plus
+    one row to detect a next page.
+    """
+    inner = sql.strip().rstrip(";")
+    if fingerprint is None:
+        paged_sql = f"SELECT * FROM ({inner}) AS _page LIMIT {int(limit) + 1} OFFSET {int(offset)}"
+        result = run_query(paged_sql, tables)
+        return result.head(limit), len(result) > limit
+    if offset >= PAGED_MAX_ROWS:
+        raise ValueError(
+            f"Paged results stop at {PAGED_MAX_ROWS} rows; use format=ndjson or arrow"
+        )
+    con = _connect(tables)
+    try:
+        table = (
+            con.execute(f"SELECT * FROM ({inner}) AS _page LIMIT {PAGED_MAX_ROWS}")
+            .fetch_record_batch(STREAM_BATCH_ROWS)
+            .read_all()
+        )
+    finally:
+        con.close()
+    result_cache.put(fingerprint, table)
+    return _slice_page(table, limit, offset)
+
+
+def open_query_stream(sql, tables, offset=0):
+    """Execute ``sql`` and return ``(reader, close)`` for streaming the result.
+
+    ``reader`` is a pyarrow RecordBatchReader producing STREAM_BATCH_ROWS-row
+    batches; SQL errors are raised here, before any bytes are sent.
+    """
+    inner = sql.strip().rstrip(";")
+    capped_sql = f"SELECT * FROM ({inner}) AS _stream LIMIT {STREAM_MAX_ROWS} OFFSET {int(offset)}"
+    con = _connect(tables)
+    try:
+        reader = con.execute(capped_sql).fetch_record_batch(STREAM_BATCH_ROWS)
+    except Exception:
+        con.close()
+        raise
+    return reader, con.close
@@ -0,0 +1,40 @@
+import io
+
+import pyarrow as pa
+
+from utils.json_response import dumps
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+
+def ndjson_chunks(reader, close):
+    """Yield one NDJSON chunk per record batch, then release the query."""
+    try:
+        for batch in reader:
+            # Same encoder as the JSON endpoints, so dates and NaN (null) match
+            lines = [dumps(row) for row in batch.to_pylist()]
+            if lines:
+                yield b"\n".join(lines) + b"\n"
+    finally:
+        close()
+
+
+def _drain(sink):
+    data = sink.getvalue()
+    sink.seek(0)
+    sink.truncate()
+    return data
+
+
+def arrow_ipc_chunks(reader, close):
+    """Yield the result as an Arrow IPC stream, one message per record batch."""
+    sink = io.BytesIO()
+    try:
+        with pa.ipc.new_stream(sink, reader.schema) as writer:
+            for batch in reader:
+                writer.write_batch(batch)
+                yield _drain(sink)
+        yield _drain(sink)  # Schema (if nothing was written) and end-of-stream marker
+    finally:
+        close()
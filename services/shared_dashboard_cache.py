@@ -0,0 +1,69 @@
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+
+from fastapi import Response
+
+from utils.compression import ENCODINGS, compress, negotiate_encoding
+from utils.ttl_cache import TTLCache
+
+SHARED_DASHBOARD_CACHE_TTL = int(os.getenv("SHARED_DASHBOARD_CACHE_TTL", "300"))
+SHARED_DASHBOARD_CACHE_ENTRIES = int(os.getenv("SHARED_DASHBOARD_CACHE_ENTRIES", "256"))
+
+
+@dataclass
+class SharedSnapshot:
+    shared_id: int  # The row it was built from; a reissued code gets a new one
+    body: bytes
+    encoded_bodies: dict  # Content-Encoding -> body, for every encoding offered
+    etag: str
+
+    def representation(self, accept_encoding):
+        """``(encoding, body, etag)`` for the client; encoding None means identity."""
+        encoding = negotiate_encoding(accept_encoding) if accept_encoding else None
+        if encoding is None:
+            return None, self.body, self.etag
+        # Each encoded body is a different representation, so its strong ETag differs
+        return encoding, self.encoded_bodies[encoding], f'{self.etag[:-1]}-{encoding}"'
+
+
+def build_shared_snapshot(shared):
+    """Serialize and compress a SharedDashboard once, for every later viewer."""
+    body = json.dumps(
+        {
+            "cleanedData": shared.dashboard_json,
+            "dashboardName": f"Shared Dashboard {shared.code}",
+            "created_at": shared.created_at.isoformat() if shared.created_at else None,
+        },
+        separators=(",", ":"),
+        default=str,
+    ).encode()
+    etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+    # Precompressed in every encoding CompressionMiddleware negotiates, so it
+    # never has to recompress a snapshot per request
+    return SharedSnapshot(
+        shared_id=shared.id,
+        body=body,
+        encoded_bodies={encoding: compress(body, encoding) for encoding in ENCODINGS},
+        etag=etag,
+    )
+
+
+def snapshot_response(snapshot, if_none_match=None, accept_encoding=None):
+    encoding, body, etag = snapshot.representation(accept_encoding)
+    headers = {
+        "ETag": etag,
+        # Clients revalidate every time, so a deleted share stops being served
+        "Cache-Control": "no-cache",
+        "Vary": "Accept-Encoding",
+    }
+    if if_none_match and etag in [t.strip() for t in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    return Response(body, media_type="application/json", headers=headers)
+
+
+# code -> SharedSnapshot
+shared_dashboard_cache = TTLCache(SHARED_DASHBOARD_CACHE_ENTRIES, SHARED_DASHBOARD_CACHE_TTL)
@@ -0,0 +1,212 @@
+import hashlib
+import io
+import os
+import queue
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Optional
+
+import pandas as pd
+
+from services.dataset_store import (
+    sheet_aliases,
+    write_columnar_copy,
+    write_columnar_copy_from_csv,
+)
+from services.profiler import profile_dataframe
+from utils.azure_blob import BlockBlobUploader
+
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(4 * 1024 * 1024)))
+# Chunks buffered between the reader and the profiler before the reader waits
+UPLOAD_PIPE_DEPTH = int(os.getenv("UPLOAD_PIPE_DEPTH", "4"))
+# Sheets of one workbook parsed and profiled concurrently, inside its ingestion worker
+WORKBOOK_SHEET_WORKERS = int(os.getenv("WORKBOOK_SHEET_WORKERS", "4"))
+
+
+class ChunkPipe(io.RawIOBase):
+    """Readable stream fed chunk by chunk from another thread."""
+
+    def __init__(self, max_chunks=UPLOAD_PIPE_DEPTH):
+        self._queue = queue.Queue(maxsize=max_chunks)
+        self._current = memoryview(b"")
+        self._eof = False
+        self._abandoned = threading.Event()
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        while not len(self._current) and not self._eof:
+            chunk = self._queue.get()
+            if chunk is None:
+                self._eof = True
+            else:
+                self._current = memoryview(chunk)
+        n = min(len(b), len(self._current))
+        b[:n] = self._current[:n]
+        self._current = self._current[n:]
+        return n
+
+    def feed(self, chunk):
+        # Stop waiting once the reader has given up, e.g. on a parse error
+        while not self._abandoned.is_set():
+            try:
+                self._queue.put(chunk, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def finish(self):
+        self.feed(None)
+
+    def abandon(self):
+        self._abandoned.set()
+
+
+class IngestTooLarge(Exception):
+    pass
+
+
+@dataclass
+class IngestResult:
+    bucket_path: str
+    file_size: int
+    content_hash: str
+    profile: Any
+    local_path: Optional[str] = None
+
+
+def ingest_stream(read_chunk, file_name, profile=None, local_copy=False, max_bytes=None):
+    """Read an upload once, teeing each chunk to blob storage and a profiler.
+
+    ``read_chunk(size)`` returns the next chunk (empty at EOF). ``profile``, if
+    given, is called in a worker thread with a binary stream of the same bytes
+    and its return value is passed back as ``IngestResult.profile``. With
+    ``local_copy`` the bytes are also written to a temp file, returned as
+    ``IngestResult.local_path``; the caller removes it. Streams longer than
+    ``max_bytes`` are abandoned with IngestTooLarge.
+    """
+    uploader = BlockBlobUploader(file_name)
+    hasher = hashlib.sha256()
+    pipe = ChunkPipe()
+    file_size = 0
+    local_file = None
+    if local_copy:
+        local_file = tempfile.NamedTemporaryFile(
+            suffix=os.path.splitext(file_name)[1], delete=False
+        )
+
+    def run_profile():
+        try:
+            return profile(io.BufferedReader(pipe, UPLOAD_CHUNK_SIZE))
+        finally:
+            pipe.abandon()
+
+    try:
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            profile_future = executor.submit(run_profile) if profile else None
+            try:
+                while True:
+                    chunk = read_chunk(UPLOAD_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    file_size += len(chunk)
+                    if max_bytes is not None and file_size > max_bytes:
+                        raise IngestTooLarge(
+                            f"File exceeds the {max_bytes} byte ingestion limit"
+                        )
+                    uploader.stage(chunk)
+                    hasher.update(chunk)
+                    if profile_future:
+                        pipe.feed(chunk)
+                    if local_file:
+                        local_file.write(chunk)
+            finally:
+                pipe.finish()
+            profile_result = profile_future.result() if profile_future else None
+        bucket_path = uploader.commit()
+    except BaseException:
+        uploader.abort()
+        if local_file:
+            local_file.close()
+            os.remove(local_file.name)
+        raise
+    if local_file:
+        local_file.close()
+
+    return IngestResult(
+        bucket_path=bucket_path,
+        file_size=file_size,
+        content_hash=hasher.hexdigest(),
+        profile=profile_result,
+        local_path=local_file.name if local_file else None,
+    )
+
+
+def _describe_sheet(local_path, file_name, sheet_name, alias):
+    # Each sheet gets its own read-only handle: openpyxl workbooks are not
+    # safe to share between threads, and a lazy handle only parses this sheet
+    with pd.ExcelFile(local_path) as book:
+        df = book.parse(sheet_name)
+    metadata = dict(profile_dataframe(df), alias=alias)
+    try:
+        metadata["columnar_path"] = write_columnar_copy(
+            df, file_name, name_suffix=f"_{alias}"
+        )
+    except Exception:
+        metadata["columnar_path"] = None  # Queries fall back to the raw upload
+    return metadata
+
+
+def describe_workbook(local_path, file_name):
+    """Profile every sheet of a workbook; returns {sheet_name: metadata}.
+
+    Runs inside an ingestion worker; sheets are parsed, profiled and written
+    out on up to WORKBOOK_SHEET_WORKERS threads there, in workbook order.
+    """
+    with pd.ExcelFile(local_path) as book:
+        aliases = sheet_aliases(book.sheet_names)
+    workers = max(1, min(WORKBOOK_SHEET_WORKERS, len(aliases)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            sheet_name: executor.submit(
+                _describe_sheet, local_path, file_name, sheet_name, alias
+            )
+            for sheet_name, alias in aliases.items()
+        }
+        return {sheet_name: future.result() for sheet_name, future in futures.items()}
+
+
+def describe_ingested_file(ingest, file_name):
+    """Finish an upload ingested with ``local_copy=True``.
+
+    Returns the FileMetadata fields (columns, num_rows, num_columns,
+    summary_stats, table_names, sheets, columnar_path). CSVs use the profile
+    computed while streaming; Excel workbooks are parsed from the local copy,
+    and the top-level fields describe their first sheet.
+    """
+    lower_name = file_name.lower()
+    if lower_name.endswith(".csv"):
+        metadata = dict(ingest.profile, table_names=None, sheets=None)
+        try:
+            metadata["columnar_path"] = write_columnar_copy_from_csv(
+                ingest.local_path, file_name, ingest.profile["columns"]
+            )
+        except Exception:
+            metadata["columnar_path"] = None  # Queries fall back to the raw upload
+        return metadata
+    if lower_name.endswith((".xls", ".xlsx")):
+        sheets = describe_workbook(ingest.local_path, file_name)
+        first = next(iter(sheets.values()))
+        return {
+            "columns": first["columns"],
+            "num_rows": first["num_rows"],
+            "num_columns": first["num_columns"],
+            "summary_stats": first["summary_stats"],
+            "columnar_path": first["columnar_path"],
+            "table_names": list(sheets),
+            "sheets": sheets,
+        }
+    raise ValueError("Unsupported file type")
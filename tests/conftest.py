@@ -0,0 +1,13 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Module-level clients are built at import time; nothing is contacted in tests
+os.environ.setdefault(
+    "AZURE_STORAGE_CONNECTION_STRING",
+    "DefaultEndpointsProtocol=https;AccountName=test;AccountKey=dGVzdA==;"
+    "EndpointSuffix=core.windows.net",
+)
+os.environ.setdefault("AZURE_CONTAINER_NAME", "test")
+os.environ.setdefault("GEMINI_API_KEYS", "test-key")
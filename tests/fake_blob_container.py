@@ -0,0 +1,55 @@
+import hashlib
+import os
+from types import SimpleNamespace
+
+
+class FakeBlobContainer:
+    """Filesystem-backed stand-in for a ContainerClient.
+
+    Blobs are files under ``root``; a blob's ETag is the hash of its bytes.
+    ``fail_downloads`` makes the next download write half the blob and raise.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.downloads = 0
+        self.fail_downloads = False
+        os.makedirs(root, exist_ok=True)
+
+    def put(self, name, data):
+        with open(os.path.join(self.root, name), "wb") as f:
+            f.write(data)
+
+    def get_blob_client(self, name):
+        return FakeBlobClient(self, os.path.join(self.root, name))
+
+
+class FakeBlobClient:
+    def __init__(self, container, path):
+        self._container = container
+        self._path = path
+
+    def _read(self):
+        with open(self._path, "rb") as f:
+            return f.read()
+
+    def get_blob_properties(self):
+        return SimpleNamespace(etag=f'"{hashlib.md5(self._read()).hexdigest()}"')
+
+    def download_blob(self, max_concurrency=1):
+        self._container.downloads += 1
+        return FakeDownloader(self._read(), self._container.fail_downloads)
+
+
+class FakeDownloader:
+    def __init__(self, data, fail):
+        self.size = len(data)
+        self._data = data
+        self._fail = fail
+
+    def readinto(self, stream):
+        if self._fail:
+            stream.write(self._data[: self.size // 2])
+            raise ConnectionError("fake connection reset")
+        stream.write(self._data)
+        return self.size
@@ -0,0 +1,96 @@
+import os
+
+import pytest
+
+from tests.fake_blob_container import FakeBlobContainer
+from utils.azure_blob import BlobDiskCache
+
+
+@pytest.fixture
+def container(tmp_path):
+    return FakeBlobContainer(str(tmp_path / "container"))
+
+
+def make_cache(container, tmp_path, max_bytes=1024**2):
+    return BlobDiskCache(container, str(tmp_path / "cache"), max_bytes)
+
+
+def read(cache, name):
+    with cache.checkout(name) as path:
+        with open(path, "rb") as f:
+            return f.read()
+
+
+def cached_entries(cache):
+    return sorted(name for name in os.listdir(cache.cache_dir) if name.endswith(".blob"))
+
+
+def test_second_read_is_a_hit(container, tmp_path):
+    container.put("a.csv", b"x,y\n1,2\n")
+    cache = make_cache(container, tmp_path)
+
+    assert read(cache, "a.csv") == b"x,y\n1,2\n"
+    assert read(cache, "a.csv") == b"x,y\n1,2\n"
+
+    assert container.downloads == 1
+    assert cache.stats() == {"hits": 1, "misses": 1, "evictions": 0}
+    # Leases are gone once the blocks exit
+    assert os.listdir(cache.lease_dir) == []
+
+
+def test_etag_change_refetches_and_drops_old_copy(container, tmp_path):
+    container.put("a.csv", b"old")
+    cache = make_cache(container, tmp_path)
+    read(cache, "a.csv")
+
+    container.put("a.csv", b"new contents")
+    assert read(cache, "a.csv") == b"new contents"
+
+    assert container.downloads == 2
+    assert len(cached_entries(cache)) == 1
+
+
+def test_eviction_keeps_total_under_cap(container, tmp_path):
+    for name in ("a", "b", "c"):
+        container.put(name, name.encode() * 400)
+    cache = make_cache(container, tmp_path, max_bytes=1000)
+
+    read(cache, "a")
+    read(cache, "b")
+    read(cache, "a")  # Touch "a" so "b" is the least recently used
+    read(cache, "c")
+
+    sizes = [os.path.getsize(os.path.join(cache.cache_dir, n)) for n in cached_entries(cache)]
+    assert sum(sizes) <= 1000
+    assert cache.evictions == 1
+    downloads = container.downloads
+    read(cache, "a")
+    assert container.downloads == downloads
+    read(cache, "b")
+    assert container.downloads == downloads + 1
+
+
+def test_checked_out_copy_survives_eviction(container, tmp_path):
+    container.put("a", b"a" * 600)
+    container.put("b", b"b" * 600)
+    cache = make_cache(container, tmp_path, max_bytes=1000)
+
+    with cache.checkout("a") as path:
+        read(cache, "b")  # Evicts "a"
+        with open(path, "rb") as f:
+            assert f.read() == b"a" * 600
+
+
+def test_failed_download_leaves_nothing_behind(container, tmp_path):
+    container.put("a.csv", b"x" * 1000)
+    cache = make_cache(container, tmp_path)
+    container.fail_downloads = True
+
+    with pytest.raises(ConnectionError):
+        read(cache, "a.csv")
+
+    assert [name for name in os.listdir(cache.cache_dir) if name != "leases"] == []
+    assert os.listdir(cache.lease_dir) == []
+
+    container.fail_downloads = False
+    assert read(cache, "a.csv") == b"x" * 1000
@@ -0,0 +1,43 @@
+import io
+
+import pyarrow.parquet as pq
+
+from services import dataset_store
+from services.profiler import profile_csv
+
+# Duplicate and blank headers, an int column that gains a NaN in a later
+# chunk, and a column that is numeric until its last row
+CSV = (
+    "a,a,,n,mixed\n"
+    + "".join(f"{i},{i},x,{i},{i}\n" for i in range(7))
+    + "1,2,y,,text\n"
+)
+
+
+def test_csv_copy_matches_profile(tmp_path, monkeypatch):
+    csv_path = tmp_path / "data.csv"
+    csv_path.write_text(CSV)
+    uploaded = {}
+
+    def fake_upload(file_obj, filename):
+        uploaded["data"] = file_obj.read()
+        return filename
+
+    monkeypatch.setattr(dataset_store, "upload_file_to_azure", fake_upload)
+    profile = profile_csv(str(csv_path), chunk_rows=3)
+
+    dataset_store.write_columnar_copy_from_csv(
+        str(csv_path), "data.csv", profile["columns"], chunk_rows=3
+    )
+
+    parquet = pq.ParquetFile(io.BytesIO(uploaded["data"]))
+    assert parquet.metadata.num_row_groups == 3
+    table = parquet.read()
+    assert table.column_names == [c["name"] for c in profile["columns"]]
+    assert table.num_rows == profile["num_rows"]
+    for column in profile["columns"]:
+        arrow_type = table.schema.field(column["name"]).type
+        if column["type"] in ("int64", "float64"):
+            assert str(arrow_type) == column["type"].replace("float64", "double")
+        else:
+            assert str(arrow_type) == "string"
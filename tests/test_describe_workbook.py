@@ -0,0 +1,49 @@
+import threading
+
+import pandas as pd
+
+from services import upload_pipeline
+
+
+class FakeExcelFile:
+    """Stands in for pd.ExcelFile over a dict of sheets, recording open handles."""
+
+    sheets = {
+        "Sales 2023": pd.DataFrame({"amount": [1.0, 2.0]}),
+        "Sales-2023": pd.DataFrame({"amount": [3.0]}),
+        "Notes": pd.DataFrame({"text": ["a", "b", "c"]}),
+    }
+    parsed_on = {}
+
+    def __init__(self, path):
+        self.sheet_names = list(self.sheets)
+        self.parsed = []
+
+    def parse(self, sheet_name):
+        assert not self.parsed, "a handle is shared between sheets"
+        self.parsed.append(sheet_name)
+        self.parsed_on[sheet_name] = threading.get_ident()
+        return self.sheets[sheet_name]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+def test_sheets_are_described_in_workbook_order(monkeypatch):
+    monkeypatch.setattr(upload_pipeline.pd, "ExcelFile", FakeExcelFile)
+    monkeypatch.setattr(
+        upload_pipeline,
+        "write_columnar_copy",
+        lambda df, file_name, name_suffix: f"copies/{file_name}{name_suffix}.parquet",
+    )
+
+    sheets = upload_pipeline.describe_workbook("book.xlsx", "book.xlsx")
+
+    assert list(sheets) == ["Sales 2023", "Sales-2023", "Notes"]
+    assert [s["alias"] for s in sheets.values()] == ["Sales_2023", "Sales_2023_2", "Notes"]
+    assert [s["num_rows"] for s in sheets.values()] == [2, 1, 3]
+    assert sheets["Notes"]["columnar_path"] == "copies/book.xlsx_Notes.parquet"
+    assert threading.get_ident() not in FakeExcelFile.parsed_on.values()
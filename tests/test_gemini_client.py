@@ -0,0 +1,202 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from google.api_core import exceptions as google_exceptions
+
+from routers import ai_router
+from services import gemini_client
+from services.gemini_client import AIUnavailable, GeminiClient
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeModel:
+    """Answers with its key, or raises the next queued error for that key."""
+
+    def __init__(self, api_key, calls, errors):
+        self.api_key = api_key
+        self.calls = calls
+        self.errors = errors
+
+    async def generate(self, prompt, timeout):
+        self.calls.append(self.api_key)
+        queued = self.errors.get(self.api_key)
+        if queued:
+            raise queued.pop(0)
+        return f"answer from {self.api_key}"
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(gemini_client.time, "monotonic", clock)
+    return clock
+
+
+def make_client(keys, errors=None, **kwargs):
+    calls = []
+    errors = errors if errors is not None else {}
+    client = GeminiClient(
+        keys,
+        model_factory=lambda key: FakeModel(key, calls, errors),
+        cooldown=30,
+        breaker_failures=2,
+        breaker_reset=60,
+        **kwargs,
+    )
+    return client, calls, errors
+
+
+def states(client):
+    return [key["state"] for key in client.stats()]
+
+
+def test_keys_rotate_round_robin(clock):
+    client, calls, _ = make_client(["a", "b", "c"])
+
+    async def scenario():
+        return [await client.generate("q") for _ in range(4)]
+
+    assert asyncio.run(scenario()) == [
+        "answer from a",
+        "answer from b",
+        "answer from c",
+        "answer from a",
+    ]
+
+
+def test_rate_limited_key_cools_down_and_returns(clock):
+    client, calls, errors = make_client(
+        ["a", "b"], {"a": [google_exceptions.ResourceExhausted("quota")]}
+    )
+
+    async def scenario():
+        first = await client.generate("q")
+        assert states(client) == ["cooldown", "closed"]
+        during = [await client.generate("q") for _ in range(2)]
+        clock.now += 31
+        after = [await client.generate("q") for _ in range(2)]
+        return first, during, after
+
+    first, during, after = asyncio.run(scenario())
+    assert first == "answer from b"  # The 429 fell through to the next key
+    assert during == ["answer from b", "answer from b"]
+    assert sorted(after) == ["answer from a", "answer from b"]
+    # Rate limiting is not a health failure: the breaker never opened
+    assert client.stats()[0]["rate_limited"] == 1
+    assert states(client) == ["closed", "closed"]
+
+
+def test_breaker_opens_then_half_open_probe_decides(clock):
+    unavailable = google_exceptions.ServiceUnavailable
+    client, calls, errors = make_client(
+        ["a", "b"], {"a": [unavailable("down"), unavailable("down"), unavailable("down")]}
+    )
+
+    async def scenario():
+        # Two consecutive failures on "a" open its circuit
+        await client.generate("q")
+        await client.generate("q")
+        assert states(client) == ["open", "closed"]
+        calls.clear()
+        await client.generate("q")
+        assert calls == ["b"]
+
+        # After the reset "a" is half-open; a failed probe re-opens it
+        clock.now += 61
+        assert states(client) == ["half-open", "closed"]
+        calls.clear()
+        while "a" not in calls:
+            await client.generate("q")
+        assert states(client) == ["open", "closed"]
+
+        # The next probe succeeds and closes the circuit
+        clock.now += 61
+        calls.clear()
+        while "a" not in calls:
+            await client.generate("q")
+        assert states(client) == ["closed", "closed"]
+
+    asyncio.run(scenario())
+
+
+def test_only_one_probe_is_in_flight_while_half_open(clock):
+    class SlowModel:
+        def __init__(self, api_key):
+            self.api_key = api_key
+
+        async def generate(self, prompt, timeout):
+            await gate.wait()
+            return f"answer from {self.api_key}"
+
+    client = GeminiClient(["a"], model_factory=SlowModel, breaker_failures=1)
+    client._keys[0].failures = 1  # As if the circuit opened and its reset passed
+    assert states(client) == ["half-open"]
+
+    async def scenario():
+        probe = asyncio.ensure_future(client.generate("q"))
+        await asyncio.sleep(0)
+        with pytest.raises(AIUnavailable):
+            await client.generate("q")  # No second trial while the probe runs
+        gate.set()
+        return await probe
+
+    gate = asyncio.Event()
+    assert asyncio.run(scenario()) == "answer from a"
+    assert states(client) == ["closed"]
+
+
+def test_unavailable_when_every_key_is_out(clock):
+    client, calls, errors = make_client(
+        ["a", "b"],
+        {
+            "a": [google_exceptions.ResourceExhausted("quota")],
+            "b": [google_exceptions.ResourceExhausted("quota")],
+        },
+    )
+
+    async def scenario():
+        with pytest.raises(AIUnavailable) as failed:
+            await client.generate("q")
+        with pytest.raises(AIUnavailable) as cooling:
+            await client.generate("q")
+        return failed.value, cooling.value
+
+    failed, cooling = asyncio.run(scenario())
+    assert "All AI keys failed" in str(failed)
+    assert "cooling down" in str(cooling)
+    assert cooling.retry_after == 31
+    assert calls == ["a", "b"]  # The second call never reached a model
+
+
+def test_bad_request_is_not_retried_on_other_keys(clock):
+    client, calls, errors = make_client(["a", "b"], {"a": [ValueError("blocked")]})
+
+    with pytest.raises(ValueError):
+        asyncio.run(client.generate("q"))
+    assert calls == ["a"]
+    assert states(client) == ["closed", "closed"]
+
+
+def test_ask_route_answers_503_with_retry_after(monkeypatch):
+    async def unavailable(question, metadata=None):
+        raise AIUnavailable("Every AI key is cooling down, retry later", retry_after=7)
+
+    class Session:
+        async def rollback(self):
+            pass
+
+    monkeypatch.setattr(ai_router, "ask_ai", unavailable)
+    req = ai_router.AIAskRequest(question="hello")
+
+    with pytest.raises(HTTPException) as raised:
+        asyncio.run(ai_router.ai_ask(req, user=None, db=Session()))
+    assert raised.value.status_code == 503
+    assert raised.value.headers == {"Retry-After": "7"}
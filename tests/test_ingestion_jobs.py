@@ -0,0 +1,60 @@
+import os
+import threading
+
+import pytest
+
+from services import ingestion_jobs
+
+
+def crash(job_id):
+    os._exit(1)  # Like an OOM kill or a segfault in a parser
+
+
+def succeed(job_id, path):
+    with open(path, "w") as f:
+        f.write(str(job_id))
+
+
+@pytest.fixture
+def jobs(monkeypatch):
+    updates = []
+    done = threading.Event()
+
+    def fake_update_job(job_id, **fields):
+        updates.append((job_id, fields))
+        done.set()
+
+    monkeypatch.setattr(ingestion_jobs, "update_job", fake_update_job)
+    monkeypatch.setattr(ingestion_jobs, "INGEST_WORKERS", 1)
+    monkeypatch.setattr(ingestion_jobs, "_executor", None)
+    yield updates, done
+    if ingestion_jobs._executor is not None:
+        ingestion_jobs._executor.shutdown()
+
+
+def test_dead_worker_fails_its_job_and_pool_recovers(jobs, tmp_path):
+    updates, done = jobs
+    spool = tmp_path / "upload.csv"
+    spool.write_text("a\n1\n")
+
+    ingestion_jobs.submit_job(1, crash, spool_path=str(spool))
+    assert done.wait(60)
+    assert updates[0][0] == 1 and updates[0][1]["status"] == "failed"
+    assert not spool.exists()
+    broken = ingestion_jobs._executor
+
+    out = tmp_path / "out"
+    ingestion_jobs.submit_job(2, succeed, str(out))
+    ingestion_jobs._executor.shutdown(wait=True)
+    assert ingestion_jobs._executor is not broken
+    assert out.read_text() == "2"
+
+
+def test_pending_slot_is_released_when_submit_fails(jobs, monkeypatch):
+    def unavailable(*args):
+        raise ingestion_jobs.IngestUnavailable("down")
+
+    monkeypatch.setattr(ingestion_jobs, "_submit_to_pool", unavailable)
+    for _ in range(ingestion_jobs.INGEST_MAX_PENDING + 1):
+        with pytest.raises(ingestion_jobs.IngestUnavailable):
+            ingestion_jobs.submit_job(1, succeed, "unused")
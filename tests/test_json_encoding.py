@@ -0,0 +1,32 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from services.profiler import clean_nans
+from services.result_stream import ndjson_chunks
+from utils.json_response import FastJSONResponse, dumps
+
+
+def test_numpy_and_pandas_values_encode():
+    body = FastJSONResponse(
+        {"n": np.int64(3), "f": np.float32(1.5), "nan": np.nan, "t": pd.Timestamp("2024-01-02")}
+    ).body
+    assert body == b'{"n":3,"f":1.5,"nan":null,"t":"2024-01-02T00:00:00"}'
+
+
+def test_ndjson_rows_match_json_endpoint_encoding():
+    table = pa.table(
+        {"d": [datetime.datetime(2024, 1, 2, 3, 4, 5)], "f": [float("nan")], "x": [1]}
+    )
+    ndjson = b"".join(ndjson_chunks(iter(table.to_batches()), lambda: None))
+    records = table.to_pandas().to_dict(orient="records")
+    assert ndjson == dumps(records[0]) + b"\n"
+    assert ndjson == b'{"d":"2024-01-02T03:04:05","f":null,"x":1}\n'
+
+
+def test_profile_output_is_json_native():
+    cleaned = clean_nans({"count": np.int64(2), "values": [np.float64("nan"), pd.NaT]})
+    assert cleaned == {"count": 2, "values": [None, None]}
+    assert type(cleaned["count"]) is int
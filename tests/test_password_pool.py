@@ -0,0 +1,41 @@
+import asyncio
+import os
+
+import pytest
+
+from utils import auth
+
+
+def crash(*args):
+    os._exit(1)  # Like an OOM kill
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    monkeypatch.setattr(auth, "PASSWORD_HASH_WORKERS", 1)
+    monkeypatch.setattr(auth, "_executor", None)
+    yield
+    if auth._executor is not None:
+        auth._executor.shutdown()
+
+
+def test_hashing_recovers_after_a_worker_dies(pool):
+    async def scenario():
+        with pytest.raises(auth.PasswordHashUnavailable):
+            await auth._run(crash)
+        hashed = await auth.get_password_hash_async("secret")
+        return await auth.verify_password_async("secret", hashed)
+
+    assert asyncio.run(scenario()) is True
+    # Every pending slot taken along the way was given back
+    assert auth._pending._value == auth.PASSWORD_HASH_MAX_PENDING
+
+
+def test_pending_slot_is_released_when_submit_raises(pool, monkeypatch):
+    def no_pool(broken=None):
+        raise RuntimeError("cannot schedule new futures after shutdown")
+
+    monkeypatch.setattr(auth, "_get_executor", no_pool)
+    for _ in range(auth.PASSWORD_HASH_MAX_PENDING + 1):
+        with pytest.raises(RuntimeError):
+            auth._submit(auth.get_password_hash, "secret")
@@ -0,0 +1,48 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.profiler import profile_csv, profile_dataframe
+
+
+def test_numeric_moments_and_quartiles_match_describe():
+    rng = np.random.default_rng(7)
+    df = pd.DataFrame(
+        {
+            "a": rng.normal(50, 10, 2500),
+            "b": rng.integers(-1000, 1000, 2500),
+            "label": rng.choice(["x", "y"], 2500),
+        }
+    )
+    df.loc[::17, "a"] = np.nan
+
+    stats = profile_dataframe(df, chunk_rows=300)["summary_stats"]
+
+    expected = df.describe().to_dict()
+    assert stats.keys() == expected.keys() == {"a", "b"}
+    for col, column_stats in expected.items():
+        assert stats[col] == pytest.approx(column_stats, rel=1e-9)
+
+
+def test_text_only_csv_keeps_describe_shape():
+    df = pd.DataFrame(
+        {
+            "city": ["Tokyo", "Osaka", None, "Osaka", "Kyoto", "Tokyo", "Osaka"] * 40,
+            "code": [f"c{i}" for i in range(280)],
+        }
+    )
+    source = io.BytesIO(df.to_csv(index=False).encode())
+
+    stats = profile_csv(source, chunk_rows=50)["summary_stats"]
+
+    assert stats == df.describe().to_dict()
+
+
+def test_top_ties_break_by_first_appearance_across_chunks():
+    df = pd.DataFrame({"v": ["b", "a", "a", "b", "c"]})
+
+    stats = profile_dataframe(df, chunk_rows=2)["summary_stats"]
+
+    assert stats == df.describe().to_dict()
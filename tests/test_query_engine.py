@@ -0,0 +1,78 @@
+import duckdb
+import pandas as pd
+import pytest
+
+from services.query_engine import cached_page, result_cache, run_paged_query, run_query
+from utils.ttl_cache import TTLCache
+
+
+@pytest.fixture
+def parquet_path(tmp_path):
+    path = tmp_path / "data.parquet"
+    pd.DataFrame({"a": [1, 2, 3], "b": ["x", "y", "z"]}).to_parquet(path)
+    return str(path)
+
+
+def test_parquet_and_dataframe_sources_are_queryable(parquet_path):
+    other = pd.DataFrame({"b": ["y", "z"], "c": [10, 20]})
+    result = run_query(
+        "SELECT SUM(a * c) AS total FROM data JOIN other USING (b)",
+        {"data": parquet_path, "other": other},
+    )
+    assert result["total"].tolist() == [80]
+
+
+@pytest.mark.parametrize(
+    "sql",
+    [
+        "SELECT * FROM read_csv('/etc/hostname')",
+        "SELECT * FROM read_text('/etc/hostname')",
+        "COPY (SELECT 1) TO '{tmp}/out.csv'",
+        "ATTACH '{tmp}/other.db'",
+        "INSTALL httpfs",
+        "SELECT * FROM '{parquet}'",
+    ],
+)
+def test_file_access_is_rejected(sql, tmp_path, parquet_path):
+    with pytest.raises(duckdb.PermissionException):
+        run_query(sql.format(tmp=tmp_path, parquet=parquet_path), {"data": parquet_path})
+    assert not (tmp_path / "out.csv").exists()
+
+
+def test_settings_cannot_be_reenabled(parquet_path):
+    for sql in ("SET enable_external_access = true", "SET lock_configuration = false"):
+        with pytest.raises(duckdb.InvalidInputException):
+            run_query(sql, {"data": parquet_path})
+
+
+def test_python_variables_are_not_visible(parquet_path):
+    secret = pd.DataFrame({"s": [42]})  # noqa: F841 - what a replacement scan would find
+    with pytest.raises(duckdb.CatalogException):
+        run_query("SELECT * FROM secret", {"data": parquet_path})
+
+
+def test_every_page_is_sliced_from_one_materialized_result():
+    fingerprint = "paged-test"
+    result_cache.invalidate(fingerprint)
+    tables = {"data": pd.DataFrame({"a": range(25)})}
+    page, has_more = run_paged_query("SELECT a FROM data", tables, 10, 0, fingerprint)
+    pages = [page]
+    offset = 10
+    while has_more:
+        # Served from the table the first page was cut from, without re-running
+        page, has_more = cached_page(fingerprint, 10, offset)
+        pages.append(page)
+        offset += 10
+    assert sorted(pd.concat(pages)["a"].tolist()) == list(range(25))
+
+
+def test_ttl_cache_is_bounded_by_bytes():
+    cache = TTLCache(10, 60, max_bytes=100, sizeof=len)
+    cache.put("a", b"x" * 60)
+    cache.put("b", b"x" * 30)
+    cache.put("c", b"x" * 30)  # Pushes the total past 100: "a" goes
+    assert cache.get("a") is None
+    assert cache.get("b") is not None and cache.get("c") is not None
+    cache.put("huge", b"x" * 101)  # Never fits, and evicts nothing
+    assert cache.get("huge") is None
+    assert cache.stats()["bytes"] == 60
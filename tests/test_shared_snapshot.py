@@ -0,0 +1,59 @@
+import datetime
+import gzip
+from types import SimpleNamespace
+
+import pytest
+
+from services.shared_dashboard_cache import build_shared_snapshot, snapshot_response
+from utils.compression import ENCODINGS
+
+DECOMPRESS = {"gzip": gzip.decompress}
+try:
+    import brotli
+
+    DECOMPRESS["br"] = brotli.decompress
+except ImportError:
+    pass
+try:
+    import zstandard
+
+    # Streamed frames carry no content size, so decode them as a stream
+    DECOMPRESS["zstd"] = lambda data: zstandard.ZstdDecompressor().decompressobj().decompress(data)
+except ImportError:
+    pass
+
+
+@pytest.fixture
+def snapshot():
+    shared = SimpleNamespace(
+        id=1,
+        code="abc",
+        dashboard_json=[{"chart": "bar", "values": list(range(500))}],
+        created_at=datetime.datetime(2024, 1, 1),
+    )
+    return build_shared_snapshot(shared)
+
+
+@pytest.mark.parametrize("encoding", list(ENCODINGS))
+def test_every_negotiated_encoding_is_precompressed(snapshot, encoding):
+    response = snapshot_response(snapshot, accept_encoding=encoding)
+
+    assert response.headers["Content-Encoding"] == encoding
+    assert response.headers["Vary"] == "Accept-Encoding"
+    assert DECOMPRESS[encoding](response.body) == snapshot.body
+
+
+def test_etag_differs_by_encoding(snapshot):
+    etags = {
+        snapshot_response(snapshot, accept_encoding=encoding).headers["ETag"]
+        for encoding in [None, *ENCODINGS]
+    }
+    assert len(etags) == len(ENCODINGS) + 1
+
+
+def test_revalidation_matches_only_the_same_representation(snapshot):
+    gzip_etag = snapshot_response(snapshot, accept_encoding="gzip").headers["ETag"]
+
+    assert snapshot_response(snapshot, gzip_etag, "gzip").status_code == 304
+    # Same snapshot, but the cached gzip body is not what an identity client gets
+    assert snapshot_response(snapshot, gzip_etag, None).status_code == 200
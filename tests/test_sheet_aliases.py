@@ -0,0 +1,13 @@
+from services.dataset_store import sheet_aliases
+
+
+def test_colliding_sheet_names_get_distinct_aliases():
+    aliases = sheet_aliases(["Sales 2023", "Sales-2023", "sales_2023", "Sales_2023_2", "!!"])
+
+    assert aliases == {
+        "Sales 2023": "Sales_2023",
+        "Sales-2023": "Sales_2023_2",
+        "sales_2023": "sales_2023_3",
+        "Sales_2023_2": "Sales_2023_2_2",
+        "!!": "sheet",
+    }
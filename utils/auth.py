@@ -1,9 +1,92 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
 from passlib.context import CryptContext
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt runs in its own processes so a login storm cannot starve request threads
+PASSWORD_HASH_WORKERS = int(
+    os.getenv("PASSWORD_HASH_WORKERS", str(max((os.cpu_count() or 2) // 2, 1)))
+)
+# Hashes queued or running before new ones are turned away
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))
+
+_executor = None
+_executor_lock = threading.Lock()
+_pending = threading.BoundedSemaphore(PASSWORD_HASH_MAX_PENDING)
+
+
+class PasswordHashQueueFull(Exception):
+    pass
+
+
+class PasswordHashUnavailable(Exception):
+    pass
+
+
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
 
 def get_password_hash(plain_password):
-    return pwd_context.hash(plain_password)
\ No newline at end of file
+    return pwd_context.hash(plain_password)
+
+
+def _get_executor(broken=None):
+    """The shared pool; ``broken`` (a pool that lost a worker) is replaced first."""
+    global _executor
+    with _executor_lock:
+        if broken is not None and _executor is broken:
+            broken.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=PASSWORD_HASH_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _executor
+
+
+def _submit(fn, *args):
+    if not _pending.acquire(blocking=False):
+        raise PasswordHashQueueFull("Too many sign-in attempts in progress, retry later")
+    try:
+        executor = _get_executor()
+        try:
+            future = executor.submit(fn, *args)
+        except BrokenProcessPool:
+            # A worker died: start a fresh pool instead of failing until restart
+            future = _get_executor(broken=executor).submit(fn, *args)
+    except BrokenProcessPool as exc:
+        _pending.release()
+        raise PasswordHashUnavailable("Password hashing is unavailable, retry later") from exc
+    except BaseException:
+        _pending.release()
+        raise
+    future.add_done_callback(lambda _: _pending.release())
+    return asyncio.wrap_future(future)
+
+
+async def _run(fn, *args):
+    try:
+        return await _submit(fn, *args)
+    except BrokenProcessPool:
+        pass  # The worker died under this call; hashing is pure, so run it again
+    try:
+        return await _submit(fn, *args)
+    except BrokenProcessPool as exc:
+        raise PasswordHashUnavailable("Password hashing is unavailable, retry later") from exc
+
+
+async def verify_password_async(plain_password, hashed_password):
+    """verify_password on the hashing pool; PasswordHashQueueFull when saturated."""
+    return await _run(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(plain_password):
+    """get_password_hash on the hashing pool; PasswordHashQueueFull when saturated."""
+    return await _run(get_password_hash, plain_password)
@@ -1,25 +1,264 @@
+import base64
+import hashlib
 import os
-from azure.storage.blob import BlobServiceClient
+import tempfile
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from azure.core.pipeline.transport import RequestsTransport
+from azure.storage.blob import BlobBlock, BlobServiceClient
 from dotenv import load_dotenv
+import requests
 import uuid
 
+from utils.process import pid_alive
+
 load_dotenv()
 
 AZURE_CONNECTION_STRING = os.getenv("AZURE_STORAGE_CONNECTION_STRING")
 AZURE_CONTAINER_NAME = os.getenv("AZURE_CONTAINER_NAME")
+# Keep-alive connections shared by every request in this process
+AZURE_POOL_SIZE = int(os.getenv("AZURE_POOL_SIZE", "32"))
+# Parallel ranged GETs per download and the size of each range
+AZURE_DOWNLOAD_CONCURRENCY = int(os.getenv("AZURE_DOWNLOAD_CONCURRENCY", "8"))
+AZURE_CHUNK_SIZE = int(os.getenv("AZURE_CHUNK_SIZE", str(4 * 1024 * 1024)))
+# Blocks uploaded in parallel (and held in memory) per upload
+AZURE_UPLOAD_CONCURRENCY = int(os.getenv("AZURE_UPLOAD_CONCURRENCY", "4"))
+# Local disk cache in front of blob storage
+BLOB_CACHE_DIR = os.getenv(
+    "BLOB_CACHE_DIR", os.path.join(tempfile.gettempdir(), "vizora-blob-cache")
+)
+BLOB_CACHE_MAX_BYTES = int(os.getenv("BLOB_CACHE_MAX_BYTES", str(10 * 1024**3)))
+
+_session = requests.Session()
+_adapter = requests.adapters.HTTPAdapter(
+    pool_connections=AZURE_POOL_SIZE, pool_maxsize=AZURE_POOL_SIZE
+)
+_session.mount("https://", _adapter)
+_session.mount("http://", _adapter)
 
-blob_service_client = BlobServiceClient.from_connection_string(AZURE_CONNECTION_STRING)
+blob_service_client = BlobServiceClient.from_connection_string(
+    AZURE_CONNECTION_STRING,
+    transport=RequestsTransport(session=_session, session_owner=False),
+    max_single_get_size=AZURE_CHUNK_SIZE,
+    max_chunk_get_size=AZURE_CHUNK_SIZE,
+)
 container_client = blob_service_client.get_container_client(AZURE_CONTAINER_NAME)
 
+
+class BlobDiskCache:
+    """Content-addressed local copies of blobs, revalidated by ETag.
+
+    ``container`` is anything with ``get_blob_client(name)`` returning an object
+    that supports ``get_blob_properties()`` and ``download_blob()``, so the real
+    ContainerClient or a filesystem-backed fake both work.
+
+    Callers get a hardlink to the cached entry that they own until their
+    ``checkout`` block exits, so eviction or a newer ETag never removes a file
+    that is still being read.
+    """
+
+    def __init__(self, container, cache_dir, max_bytes):
+        self.container = container
+        self.cache_dir = cache_dir
+        self.lease_dir = os.path.join(cache_dir, "leases")
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(self.lease_dir, exist_ok=True)
+        self._drop_orphaned_leases()
+
+    @staticmethod
+    def _path_prefix(bucket_path):
+        return hashlib.sha256(bucket_path.encode()).hexdigest()[:32]
+
+    def _entry_path(self, bucket_path, etag):
+        etag_hash = hashlib.sha256(etag.strip('"').encode()).hexdigest()[:16]
+        return os.path.join(
+            self.cache_dir, f"{self._path_prefix(bucket_path)}_{etag_hash}.blob"
+        )
+
+    def _new_lease_path(self):
+        # The pid lets a restarted worker drop leases its predecessor leaked
+        return os.path.join(self.lease_dir, f"{os.getpid()}_{uuid.uuid4().hex}")
+
+    @contextmanager
+    def checkout(self, bucket_path):
+        """Yield a local path to the current contents of ``bucket_path``.
+
+        The path is a private hardlink, removed when the block exits.
+        """
+        lease_path = self._lease(bucket_path)
+        try:
+            yield lease_path
+        finally:
+            try:
+                os.remove(lease_path)
+            except FileNotFoundError:
+                pass
+
+    def _lease(self, bucket_path):
+        blob_client = self.container.get_blob_client(bucket_path)
+        # A properties call is a HEAD request: cheap compared to re-downloading
+        etag = blob_client.get_blob_properties().etag
+        entry_path = self._entry_path(bucket_path, etag)
+        lease_path = self._new_lease_path()
+        with self._lock:
+            try:
+                os.link(entry_path, lease_path)
+                os.utime(entry_path)  # Mark as recently used
+            except FileNotFoundError:
+                # Never cached, or evicted (possibly by another worker) just now
+                self.misses += 1
+            else:
+                self.hits += 1
+                return lease_path
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                stream = blob_client.download_blob(
+                    max_concurrency=AZURE_DOWNLOAD_CONCURRENCY
+                )
+                stream.readinto(f)
+            # The caller's link is taken before the entry becomes evictable
+            os.link(tmp_path, lease_path)
+            # Readers only ever see complete files
+            os.replace(tmp_path, entry_path)
+        except BaseException:
+            for path in (tmp_path, lease_path):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            raise
+        with self._lock:
+            self._drop_stale(bucket_path, keep=entry_path)
+            self._evict(keep=entry_path)
+        return lease_path
+
+    def invalidate(self, bucket_path):
+        with self._lock:
+            self._drop_stale(bucket_path, keep=None)
+
+    def _drop_stale(self, bucket_path, keep):
+        prefix = self._path_prefix(bucket_path)
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if name.startswith(prefix) and name.endswith(".blob") and path != keep:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+    def _evict(self, keep):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".blob"):
+                continue
+            try:
+                st = os.stat(os.path.join(self.cache_dir, name))
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, name))
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path = os.path.join(self.cache_dir, name)
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            self.evictions += 1
+
+    def _drop_orphaned_leases(self):
+        for name in os.listdir(self.lease_dir):
+            pid = name.split("_", 1)[0]
+            if pid.isdigit() and not pid_alive(int(pid)):
+                try:
+                    os.remove(os.path.join(self.lease_dir, name))
+                except FileNotFoundError:
+                    pass
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+
+blob_disk_cache = BlobDiskCache(container_client, BLOB_CACHE_DIR, BLOB_CACHE_MAX_BYTES)
+
+
 def upload_file_to_azure(file_obj, filename):
     unique_filename = f"{uuid.uuid4()}_{filename}"
     blob_client = container_client.get_blob_client(unique_filename)
-    blob_client.upload_blob(file_obj, overwrite=True)
+    blob_client.upload_blob(
+        file_obj, overwrite=True, max_concurrency=AZURE_UPLOAD_CONCURRENCY
+    )
     return unique_filename  # Save this as bucket_path in your DB
 
-def download_file_from_azure(bucket_path):
-    blob_service_client = BlobServiceClient.from_connection_string(os.getenv("AZURE_STORAGE_CONNECTION_STRING"))
-    container_client = blob_service_client.get_container_client(os.getenv("AZURE_CONTAINER_NAME"))
-    blob_client = container_client.get_blob_client(bucket_path)
-    stream = blob_client.download_blob()
-    return stream.readall()
\ No newline at end of file
+
+class BlockBlobUploader:
+    """Uploads a new blob as staged blocks, one chunk at a time.
+
+    Up to ``max_concurrency`` blocks are staged in parallel; ``stage`` blocks
+    once that many are in flight, so memory stays bounded on large uploads.
+    """
+
+    def __init__(self, filename, max_concurrency=AZURE_UPLOAD_CONCURRENCY):
+        self.bucket_path = f"{uuid.uuid4()}_{filename}"
+        self._blob_client = container_client.get_blob_client(self.bucket_path)
+        self._block_ids = []
+        self._futures = []
+        self._error = None
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency)
+
+    def stage(self, chunk):
+        if self._error is not None:
+            raise self._error
+        # Block ids must all have the same length within a blob
+        block_id = base64.b64encode(f"{len(self._block_ids):08d}".encode()).decode()
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(self._stage_block, block_id, chunk)
+        except BaseException:
+            self._slots.release()
+            raise
+        self._block_ids.append(block_id)
+        self._futures.append(future)
+
+    def _stage_block(self, block_id, chunk):
+        try:
+            self._blob_client.stage_block(block_id, chunk)
+        except Exception as e:
+            self._error = e
+            raise
+        finally:
+            self._slots.release()
+
+    def commit(self):
+        try:
+            for future in self._futures:
+                future.result()
+            self._blob_client.commit_block_list(
+                [BlobBlock(block_id=block_id) for block_id in self._block_ids]
+            )
+        finally:
+            self._executor.shutdown()
+        return self.bucket_path
+
+    def abort(self):
+        # Uncommitted blocks are discarded by the service after a week
+        self._executor.shutdown(cancel_futures=True)
+
+
+def cached_blob_path(bucket_path):
+    """Context manager yielding a local copy of ``bucket_path`` from the disk cache."""
+    return blob_disk_cache.checkout(bucket_path)
+
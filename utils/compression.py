@@ -0,0 +1,158 @@
+import os
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+
+# brotli and zstandard are optional; without them only gzip is offered
+try:
+    import brotli
+except ImportError:
+    brotli = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Responses smaller than this are sent as-is: compressing them costs more than it saves
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+COMPRESSION_ZSTD_LEVEL = int(os.getenv("COMPRESSION_ZSTD_LEVEL", "3"))
+
+
+class _GzipStream:
+    def __init__(self):
+        self._obj = zlib.compressobj(COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        return self._obj.compress(data)
+
+    def flush(self):
+        return self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._obj.flush()
+
+
+class _BrotliStream:
+    def __init__(self):
+        self._obj = brotli.Compressor(quality=COMPRESSION_BROTLI_QUALITY)
+
+    def compress(self, data):
+        return self._obj.process(data)
+
+    def flush(self):
+        return self._obj.flush()
+
+    def finish(self):
+        return self._obj.finish()
+
+
+class _ZstdStream:
+    def __init__(self):
+        self._obj = zstandard.ZstdCompressor(level=COMPRESSION_ZSTD_LEVEL).compressobj()
+
+    def compress(self, data):
+        return self._obj.compress(data)
+
+    def flush(self):
+        return self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self):
+        return self._obj.flush()
+
+
+# Preferred first when the client weighs several encodings equally
+ENCODINGS = {"gzip": _GzipStream}
+if brotli is not None:
+    ENCODINGS = {"br": _BrotliStream, **ENCODINGS}
+if zstandard is not None:
+    ENCODINGS = {"zstd": _ZstdStream, **ENCODINGS}
+
+
+def compress(data, encoding):
+    """Compress a whole body with ``encoding``, exactly as the middleware would."""
+    stream = ENCODINGS[encoding]()
+    return stream.compress(data) + stream.finish()
+
+
+def negotiate_encoding(accept_encoding):
+    """Pick the best supported encoding from an Accept-Encoding header, or None."""
+    weights = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        weights[name.strip().lower()] = q
+    candidates = [
+        (weights.get(name, weights.get("*", 0.0)), -rank, name)
+        for rank, name in enumerate(ENCODINGS)
+    ]
+    q, _, name = max(candidates)
+    return name if q > 0 else None
+
+
+class CompressionMiddleware:
+    """Negotiated zstd/br/gzip compression for whole and streamed responses.
+
+    Responses that already carry a Content-Encoding (e.g. precompressed
+    snapshots) and whole bodies under ``minimum_size`` pass through untouched.
+    """
+
+    def __init__(self, app, minimum_size=COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        stream = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start_message, stream, passthrough
+            if message["type"] == "http.response.start":
+                start_message = message  # Sent once the first body chunk decides
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if stream is None:
+                headers = MutableHeaders(raw=start_message["headers"])
+                if "content-encoding" in headers or (
+                    not more_body and len(body) < self.minimum_size
+                ):
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+                stream = ENCODINGS[encoding]()
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                if more_body:
+                    del headers["Content-Length"]
+                    data = stream.compress(body) + stream.flush()
+                else:
+                    data = stream.compress(body) + stream.finish()
+                    headers["Content-Length"] = str(len(data))
+                await send(start_message)
+                await send({"type": "http.response.body", "body": data, "more_body": more_body})
+                return
+            # Later chunks of a streamed response: flush so each reaches the client
+            data = stream.compress(body) + (stream.flush() if more_body else stream.finish())
+            await send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
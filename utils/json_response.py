@@ -0,0 +1,48 @@
+import datetime
+import decimal
+
+import numpy as np
+import orjson
+import pandas as pd
+from fastapi.responses import JSONResponse
+
+
+def _default(obj):
+    # orjson handles dicts/lists/str/int/float/datetime and ndarrays natively
+    if obj is pd.NaT or obj is pd.NA:
+        return None
+    if isinstance(obj, (pd.Timestamp, datetime.datetime, datetime.date)):
+        return obj.isoformat()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return obj.tolist()
+    if isinstance(obj, pd.DataFrame):
+        return obj.to_dict(orient="records")
+    if isinstance(obj, (pd.Timedelta, datetime.timedelta)):
+        return str(obj)
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(content):
+    """Encode ``content`` to JSON bytes the way every API response is encoded."""
+    return orjson.dumps(
+        content,
+        default=_default,
+        option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS,
+    )
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered by orjson; NaN/inf become null, NumPy and pandas values are native.
+
+    Returning one directly from an endpoint also skips FastAPI's
+    ``jsonable_encoder`` pass, which dominates the cost of large payloads.
+    """
+
+    def render(self, content):
+        return dumps(content)
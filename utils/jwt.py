@@ -1,13 +1,29 @@
+import os
 from datetime import datetime, timedelta
+from typing import NamedTuple, Optional
 from jose import JWTError, jwt
 from fastapi import HTTPException, Depends
 from fastapi.security import OAuth2PasswordBearer
-from db import SessionLocal
+from sqlalchemy import select
+from db import AsyncSessionLocal
 from models.user import User
+from utils.ttl_cache import TTLCache
 
 SECRET_KEY = "qwerty"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+# Verified users are reused for this long instead of re-reading them per request
+AUTH_USER_CACHE_TTL = int(os.getenv("AUTH_USER_CACHE_TTL", "60"))
+AUTH_USER_CACHE_ENTRIES = int(os.getenv("AUTH_USER_CACHE_ENTRIES", "10000"))
+# Trust the signed uid/name claims and skip the database entirely. Password
+# changes then only take effect for new tokens, i.e. within ACCESS_TOKEN_EXPIRE_MINUTES.
+AUTH_STATELESS = os.getenv("AUTH_STATELESS", "false").lower() in ("1", "true", "yes")
+# Accounts allowed to read the /ops diagnostics; empty leaves them closed to everyone
+OPS_ADMIN_EMAILS = {
+    email.strip().lower()
+    for email in os.getenv("OPS_ADMIN_EMAILS", "").split(",")
+    if email.strip()
+}
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
 
@@ -19,17 +35,52 @@ def create_access_token(data: dict):
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
-def get_current_user(token: str = Depends(oauth2_scheme)):
+class CurrentUser(NamedTuple):
+    """The authenticated caller: immutable, so one instance can serve every request."""
+
+    id: int
+    email: str
+    name: Optional[str]
+
+
+# token subject (email) -> CurrentUser
+user_cache = TTLCache(AUTH_USER_CACHE_ENTRIES, AUTH_USER_CACHE_TTL)
+
+
+def user_token_claims(user):
+    return {"sub": user.email, "uid": user.id, "name": user.name}
+
+
+def invalidate_user(email: str):
+    user_cache.invalidate(email)
+
+
+async def get_current_user(token: str = Depends(oauth2_scheme)):
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email = payload.get("sub")
         if email is None:
             raise HTTPException(status_code=401, detail="Invalid token: no subject")
-        db = SessionLocal()
-        user = db.query(User).filter(User.email == email).first()
-        db.close()
+        if AUTH_STATELESS and payload.get("uid") is not None:
+            return CurrentUser(id=payload["uid"], email=email, name=payload.get("name"))
+        user = user_cache.get(email)
         if user is None:
-            raise HTTPException(status_code=401, detail="User not found")
+            async with AsyncSessionLocal() as db:
+                row = (
+                    await db.execute(
+                        select(User.id, User.email, User.name).where(User.email == email)
+                    )
+                ).first()
+            if row is None:
+                raise HTTPException(status_code=401, detail="User not found")
+            user = CurrentUser(*row)
+            user_cache.put(email, user)
         return user
     except JWTError as exc:
         raise HTTPException(status_code=401, detail="Invalid token") from exc
+
+
+async def get_ops_user(user: CurrentUser = Depends(get_current_user)):
+    if user.email.lower() not in OPS_ADMIN_EMAILS:
+        raise HTTPException(status_code=403, detail="Not an ops admin")
+    return user
@@ -0,0 +1,46 @@
+import os
+import socket
+
+
+def pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # Alive, owned by another user
+    return True
+
+
+def process_identity(pid=None):
+    """``pid:start_ticks`` for a running process, or None if it has exited.
+
+    The start time (from /proc) tells a reused pid apart from the process that
+    had it before; where /proc is missing only the pid is compared.
+    """
+    pid = pid or os.getpid()
+    if not os.path.isdir("/proc"):
+        return str(pid) if pid_alive(pid) else None
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            # Fields after the parenthesised command name; starttime is the 20th
+            start = f.read().rsplit(")", 1)[1].split()[19]
+    except (FileNotFoundError, ProcessLookupError):
+        return None
+    return f"{pid}:{start}"
+
+
+def process_owner():
+    """``host/pid:start`` naming this process, for records it must clean up after."""
+    return f"{socket.gethostname()}/{process_identity()}"
+
+
+def owner_is_gone(owner):
+    """True if ``owner`` (from process_owner) was a process on this host that has exited.
+
+    Owners on other hosts can't be checked from here and count as alive.
+    """
+    host, _, identity = owner.partition("/")
+    if host != socket.gethostname():
+        return False
+    return process_identity(int(identity.split(":")[0])) != identity
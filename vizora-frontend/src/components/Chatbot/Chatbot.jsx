@@ -9,6 +9,32 @@ import { AnimatePresence, motion } from 'framer-motion';
 import { Search, Plus, Menu, X, User, Trash2, ChevronRight, HardDrive, FileText, FileX2, ChevronsLeft, ChevronsRight, ArrowRight, Clipboard, Eye, LayoutDashboard, LifeBuoy, Paperclip, Send, AlertTriangle, Settings, MailOpen, Pencil, LogOut, Info } from 'lucide-react';
 // Note: PapaParse and XLSX are assumed to be loaded via script tags.
 
+// Messages fetched per request; older ones load on demand
+const MESSAGE_PAGE_SIZE = 100;
+
+// Stored table results are serialized into the message text
+const parseStoredMessage = (m) => {
+    if (typeof m.text === 'string' && m.text.startsWith('__TABLE__:')) {
+        try {
+            const table = JSON.parse(m.text.replace('__TABLE__:', ''));
+            return {
+                ...m,
+                table: {
+                    ...table,
+                    view: 'table',
+                    editingSql: table.sql,
+                    running: false,
+                    error: null
+                },
+                text: undefined
+            };
+        } catch {
+            return m;
+        }
+    }
+    return m;
+};
+
 const RecycleBinModal = ({ onClose, deletedChats, onRestoreChat, onDeleteChat }) => {
     return (
         <motion.div initial={{ opacity: 0 }} animate={{ opacity: 1 }} exit={{ opacity: 0 }} className="fixed inset-0 bg-black/60 z-50 flex items-center justify-center p-4" onClick={onClose}>
@@ -195,31 +221,10 @@ export default function App({ userData: externalUserData }) {
             if (!activeChatId) return;
             setChats(prev => prev.map(c => c.id === activeChatId ? { ...c, loading: true } : c));
             try {
-                const msgs = await chatApi.getMessages(activeChatId);
+                const { messages: msgs, beforeCursor } = await chatApi.getMessagesPage(activeChatId, { limit: MESSAGE_PAGE_SIZE });
                 const files = await chatApi.listFiles(activeChatId);
-                // Parse special table messages
-                const parsedMsgs = msgs.map(m => {
-                    if (typeof m.text === 'string' && m.text.startsWith('__TABLE__:')) {
-                        try {
-                            const table = JSON.parse(m.text.replace('__TABLE__:', ''));
-                            return {
-                                ...m,
-                                table: {
-                                    ...table,
-                                    view: 'table',
-                                    editingSql: table.sql,
-                                    running: false,
-                                    error: null
-                                },
-                                text: undefined
-                            };
-                        } catch {
-                            return m;
-                        }
-                    }
-                    return m;
-                });
-                setChats(prev => prev.map(c => c.id === activeChatId ? { ...c, messages: parsedMsgs, files, loaded: true, loading: false } : c));
+                const parsedMsgs = msgs.map(parseStoredMessage);
+                setChats(prev => prev.map(c => c.id === activeChatId ? { ...c, messages: parsedMsgs, earlierCursor: beforeCursor, files, loaded: true, loading: false } : c));
             } catch (e) {
                 setChats(prev => prev.map(c => c.id === activeChatId ? { ...c, loading: false } : c));
             }
@@ -228,6 +233,17 @@ export default function App({ userData: externalUserData }) {
         if (current && !current.loaded) hydrate();
     }, [activeChatId, chats]);
 
+    const loadEarlierMessages = async (chatId) => {
+        const chat = chats.find(c => c.id === chatId);
+        if (!chat?.earlierCursor) return;
+        try {
+            const { messages: older, beforeCursor } = await chatApi.getMessagesPage(chatId, { limit: MESSAGE_PAGE_SIZE, before: chat.earlierCursor });
+            setChats(prev => prev.map(c => c.id === chatId ? { ...c, messages: [...older.map(parseStoredMessage), ...(c.messages || [])], earlierCursor: beforeCursor } : c));
+        } catch (e) {
+            showToast('Failed to load earlier messages', 'error');
+        }
+    };
+
     // Handle toast timeout
     useEffect(() => {
         if (toast.show) {
@@ -850,7 +866,7 @@ export default function App({ userData: externalUserData }) {
                     </div>
                 </header>
 
-                <ChatPanel messages={activeChat?.messages || []} onPreviewFile={(file) => setShowFilePreview(file)} onDeleteFile={handleDeleteFileMessage} activeChatId={activeChatId} userData={userData} />
+                <ChatPanel messages={activeChat?.messages || []} hasEarlier={!!activeChat?.earlierCursor} onLoadEarlier={() => loadEarlierMessages(activeChatId)} onPreviewFile={(file) => setShowFilePreview(file)} onDeleteFile={handleDeleteFileMessage} activeChatId={activeChatId} userData={userData} />
                 <ChatInput onSendMessage={handleSendMessage} onUploadClick={() => fileInputRef.current?.click()} isBotReplying={isBotReplying} isSendingMessage={isSendingMessage} />
             </main>
 
@@ -1051,11 +1067,13 @@ const SidebarButton = ({ icon: Icon, text, onClick, danger = false, disabled = f
     );
 };
 
-const ChatPanel = ({ messages, onPreviewFile, onDeleteFile, activeChatId, userData }) => {
+const ChatPanel = ({ messages, hasEarlier, onLoadEarlier, onPreviewFile, onDeleteFile, activeChatId, userData }) => {
     const endOfMessagesRef = useRef(null);
+    // Follow new messages, but stay put when earlier ones are prepended
+    const lastMessageId = messages[messages.length - 1]?.id;
     useEffect(() => {
         endOfMessagesRef.current?.scrollIntoView({ behavior: 'smooth' });
-    }, [messages]);
+    }, [lastMessageId]);
 
     return (
         <div className="flex-1 overflow-y-auto p-6 space-y-6 custom-scrollbar">
@@ -1070,6 +1088,11 @@ const ChatPanel = ({ messages, onPreviewFile, onDeleteFile, activeChatId, userDa
                     <p>Start a conversation or upload a file to begin.</p>
                 </div>
             )}
+            {hasEarlier && (
+                <div className="flex justify-center">
+                    <button onClick={onLoadEarlier} className="text-sm text-gray-400 hover:text-[#14FFEC] transition-colors">Load earlier messages</button>
+                </div>
+            )}
             {messages.map((msg) => (
                 <motion.div key={msg.id} initial={{ opacity: 0, y: 20 }} animate={{ opacity: 1, y: 0 }} transition={{ duration: 0.3 }} >
                     {msg.sender === 'user' ? (
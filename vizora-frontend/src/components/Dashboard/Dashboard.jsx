@@ -302,11 +302,11 @@ const FileUploadScreen = ({ onFileProcessed, XLSX, onShowViewShared }) => {
                 { url: fetchUrl, file_name: fileName },
                 { headers: { Authorization: `Bearer ${token}` } }
             );
-            if (!ingestRes.data || !ingestRes.data.bucket_path) {
+            if (!ingestRes.data || !ingestRes.data.job_id) {
                 throw new Error('Backend failed to ingest file.');
             }
             setShowGoogleSheetModal(false);
-            setError('File ingested and metadata saved! You can now use it in your dashboards.');
+            setError('File queued for ingestion. It will be available in your dashboards shortly.');
             // Optionally: trigger dashboard list refresh or show a success modal
         } catch (err) {
             console.error('Failed to fetch Google Sheet/Drive/File:', err);
@@ -52,6 +52,17 @@ export const chatApi = {
     return response.data;
   },
 
+  // Add several messages ([{ text, sender }]) in one request
+  addMessages: async (chatId, messages) => {
+    const token = localStorage.getItem('token');
+    const response = await axios.post(
+      `${API_URL}/chats/${chatId}/messages`,
+      messages,
+      { headers: { Authorization: `Bearer ${token}` } }
+    );
+    return response.data;
+  },
+
   // Get all messages for a chat
   getMessages: async (chatId) => {
     const token = localStorage.getItem('token');
@@ -61,6 +72,20 @@ export const chatApi = {
     return response.data;
   },
 
+  // Get one page of a chat's messages: the newest `limit`, or those before/after a cursor
+  getMessagesPage: async (chatId, { limit = 100, before = null, after = null } = {}) => {
+    const token = localStorage.getItem('token');
+    const response = await axios.get(`${API_URL}/chats/${chatId}/messages`, {
+      headers: { Authorization: `Bearer ${token}` },
+      params: { limit, ...(before ? { before } : {}), ...(after ? { after } : {}) }
+    });
+    return {
+      messages: response.data,
+      beforeCursor: response.headers['x-before-cursor'] || null,
+      afterCursor: response.headers['x-after-cursor'] || null
+    };
+  },
+
   // Upload a file to a chat
   uploadFile: async (chatId, file) => {
     const token = localStorage.getItem('token');
@@ -72,7 +97,25 @@ export const chatApi = {
       body: formData
     });
     if (!response.ok) throw new Error('File upload failed');
-    return await response.json();
+    const { job_id } = await response.json();
+    // Processing runs as a background job; wait for its file metadata
+    const job = await chatApi.waitForJob(job_id);
+    if (job.status !== 'done') throw new Error(job.error || 'File upload failed');
+    return job.file;
+  },
+
+  // Poll an ingestion job until it is done or failed
+  waitForJob: async (jobId, intervalMs = 1000) => {
+    const token = localStorage.getItem('token');
+    for (;;) {
+      const response = await axios.get(`${API_URL}/jobs/${jobId}`, {
+        headers: { Authorization: `Bearer ${token}` }
+      });
+      if (response.data.status === 'done' || response.data.status === 'failed') {
+        return response.data;
+      }
+      await new Promise(resolve => setTimeout(resolve, intervalMs));
+    }
   },
 
   // List files for a chat
@@ -40,13 +40,20 @@ const dashboardApi = {
     return response.data;
   },
 
-  // Get all dashboards for the current user
+  // Get summaries (id, name, timestamps) of all dashboards for the current user
   getMyDashboards: async () => {
     const token = localStorage.getItem('token');
-    const response = await axios.get(`${API_URL}/dashboard`, {
-      headers: { Authorization: `Bearer ${token}` }
-    });
-    return response.data;
+    const dashboards = [];
+    let cursor = null;
+    do {
+      const response = await axios.get(`${API_URL}/dashboard`, {
+        headers: { Authorization: `Bearer ${token}` },
+        params: { limit: 200, ...(cursor ? { cursor } : {}) }
+      });
+      dashboards.push(...response.data);
+      cursor = response.headers['x-next-cursor'];
+    } while (cursor);
+    return dashboards;
   },
 
   // Get a single dashboard by ID
@@ -58,6 +65,17 @@ const dashboardApi = {
     return response.data;
   },
 
+  // Get a page of an uploaded dashboard's dataset, optionally only some columns
+  getDashboardData: async (dashboardId, offset = 0, limit = 1000, columns = null) => {
+    const token = localStorage.getItem('token');
+    const params = new URLSearchParams({ offset, limit });
+    (columns || []).forEach((column) => params.append('columns', column));
+    const response = await axios.get(`${API_URL}/dashboard/${dashboardId}/data?${params}`, {
+      headers: { Authorization: `Bearer ${token}` }
+    });
+    return response.data;
+  },
+
   // Update a dashboard by ID
   updateDashboard: async (dashboardId, dashboardJson, dashboardName) => {
     const token = localStorage.getItem('token');